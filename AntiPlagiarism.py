@@ -1,22 +1,491 @@
 #!/usr/bin/python
 # -*- coding: utf8 -*-
-from TextCanonization import CanonicalTextClass
+import os
+import functools
+import itertools
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from TextCanonization import (CanonicalTextClass, get_text_fingerprints, winnow_fingerprints, get_lemma_cache_info,
+                              canonize_chunks, iter_text_fingerprints, get_morph_analyzer)
 from ClassBM import BM_StringSearch
 from ClassKMP import KMP_StringSearch
-from ClassRK import RK_StringSearch
-from ReadWriteDatabase import read_json, write_json, read_txt_and_write_to_json
+from ClassRK import RK_StringSearch, RK_MultiStringSearch
+from ClassAC import AC_StringSearch
+from ShingleIndex import ShingleIndexClass
+from SuffixAutomaton import SuffixAutomatonClass
+from Vocabulary import VocabularyClass, pack_shingles
+from PackedCorpus import PackedCorpusClass
+from ReadWriteDatabase import DatabaseClass, read_txt_chunks, iter_txt_files, get_content_hash, TXT_CHUNK_SIZE
+from CanonicalCache import CanonicalCacheClass
+from Instrumentation import StatsClass, NULL_STATS, ProgressClass, NULL_PROGRESS
+
+
+def _create_numpy_rk_search(patterns: list):
+    """Создает NumpyRK_StringSearch; NumPy импортируется только при первом поиске этим методом."""
+    from ClassNumpyRK import NumpyRK_StringSearch
+    return NumpyRK_StringSearch(patterns)
+
+
+SINGLE_PATTERN_SEARCHES = {
+    "RK": (RK_StringSearch, "get_substring_rk"),
+    "KMP": (KMP_StringSearch, "get_substring_kmp"),
+    "BM_bad": (BM_StringSearch, "get_substring_bm_bad_character"),
+    "BM_good": (BM_StringSearch, "get_substring_bm_good_suffix"),
+}
+MULTI_PATTERN_SEARCHES = {
+    "AC": (AC_StringSearch, "get_substring_ac"),
+    "RK_multi": (RK_MultiStringSearch, "get_substring_rk"),
+    "RK_numpy": (_create_numpy_rk_search, "get_substring_np"),
+}
+SEARCH_METHODS = tuple(SINGLE_PATTERN_SEARCHES) + tuple(MULTI_PATTERN_SEARCHES)
+
+
+def _count_search_object(stats, search_object, collisions_before: int = 0) -> None:
+    """Переносит в статистику счетчики объекта поиска, если они у него есть."""
+    if hasattr(search_object, "collisions"):
+        stats.count("hash_collisions", search_object.collisions - collisions_before)
+    if hasattr(search_object, "shift_count"):
+        stats.count("bm_shifts", search_object.shift_count)
+
+
+def get_uniqueness(matches_count: int, shingles_count: int) -> float:
+    """
+    Вычисляет процент уникальности по числу совпадений шинглов образца.
+
+    Без presence_only один шингл дает по совпадению на каждый текст, в котором
+    он найден, поэтому совпадений может быть больше, чем шинглов; в этом
+    случае уникальность равна 0. Образец без шинглов (короче шингла) не может
+    совпасть ни с одним текстом, и его уникальность равна 100.
+
+    Args:
+        matches_count (int): Количество совпадений.
+        shingles_count (int): Количество шинглов образца.
+
+    Returns:
+        float: Процент уникальности от 0 до 100.
+    """
+    if not shingles_count:
+        return 100.0
+    return max(0.0, 1 - matches_count / shingles_count) * 100
+
+
+def get_match_limit(shingles_count: int, min_uniqueness: float) -> int:
+    """
+    Возвращает наибольшее число найденных шинглов, при котором уникальность
+    (см. get_uniqueness()) еще не ниже min_uniqueness, или -1, если порог недостижим.
+    Граница подбирается по самой get_uniqueness(), чтобы ошибки округления
+    не расходились с итоговым значением.
+    """
+    match_limit = min(shingles_count, max(-1, int(shingles_count * (1 - min_uniqueness / 100))))
+    while match_limit < shingles_count and get_uniqueness(match_limit + 1, shingles_count) >= min_uniqueness:
+        match_limit += 1
+    while match_limit >= 0 and get_uniqueness(match_limit, shingles_count) < min_uniqueness:
+        match_limit -= 1
+    return match_limit
+
+
+def _search_single(pattern_shingles: list, search_class, search_method_name: str, presence_only: bool, stats,
+                   match_limit: int, partial: bool, progress, corpus: PackedCorpusClass, indices) -> tuple:
+    """
+    Ищет каждый шингл отдельно в текстах корпуса с номерами из indices.
+    Объект поиска с предобработанным шаблоном создается один раз на шингл.
+    Если задан match_limit, поиск прекращается, как только число найденных
+    шинглов превысило его или уже не может его превысить. Если indices - лишь
+    часть корпуса (partial), остановка возможна только при превышении.
+
+    Returns:
+        tuple: Списки вхождений для каждой найденной пары (шингл, текст),
+            количество шинглов, которые не искались из-за досрочной остановки,
+            и номера шинглов в pattern_shingles для каждого списка вхождений.
+    """
+    counter = []
+    matched = []
+    searches = 0
+    undecided = len(pattern_shingles)
+    progress.add_total(len(pattern_shingles) * len(indices))
+    for shingle_number, shingle in enumerate(pattern_shingles):
+        search_object = search_class(shingle)
+        search_method = getattr(search_object, search_method_name)
+        shingle_searches = 0
+        for index in indices:
+            shingle_searches += 1
+            progress.advance()
+            search_list = search_method(corpus[index])
+            if search_list:
+                counter.append(search_list)
+                matched.append(shingle_number)
+            if presence_only and search_object.found:
+                break
+        searches += shingle_searches
+        progress.advance(len(indices) - shingle_searches)
+        undecided -= 1
+        if stats.enabled:
+            _count_search_object(stats, search_object)
+        if match_limit is not None and undecided and (len(counter) > match_limit
+                                                      or not partial and len(counter) + undecided <= match_limit):
+            stats.count("early_exits")
+            break
+    stats.count("shingle_text_searches", searches)
+    return counter, undecided, matched
+
+
+def _search_multi(pattern_shingles: list, search_object, search_method_name: str, presence_only: bool, stats,
+                  match_limit: int, progress, corpus: PackedCorpusClass, indices) -> tuple:
+    """
+    Ищет все шинглы сразу в текстах корпуса с номерами из indices,
+    просматривая каждый текст один раз. Если задан match_limit, просмотр
+    прекращается, как только число найденных шинглов превысило его: отсутствие
+    шингла становится известно только после просмотра всех текстов.
+
+    Returns:
+        tuple: Списки вхождений для каждой найденной пары (шингл, текст),
+            количество шинглов, наличие которых не установлено из-за досрочной остановки,
+            и номера шинглов в pattern_shingles для каждого списка вхождений.
+    """
+    counter = []
+    matched = []
+    found = set()
+    unique_shingles = set(pattern_shingles)
+    search_method = getattr(search_object, search_method_name)
+    collisions_before = getattr(search_object, "collisions", 0)
+    texts = 0
+    progress.add_total(len(indices))
+    for index in indices:
+        texts += 1
+        progress.advance()
+        search_dict = search_method(corpus.get_bytes(index))
+        for shingle_number, shingle in enumerate(pattern_shingles):
+            if shingle in search_dict and shingle not in found:
+                counter.append(search_dict[shingle])
+                matched.append(shingle_number)
+        if presence_only:
+            found.update(search_dict)
+            if len(found) == len(unique_shingles):
+                break
+            if match_limit is not None and len(counter) > match_limit and texts < len(indices):
+                stats.count("early_exits")
+                break
+    stats.count("texts_scanned", texts)
+    stats.count("shingle_text_searches", texts * len(unique_shingles))
+    if stats.enabled:
+        _count_search_object(stats, search_object, collisions_before)
+    undecided = len(pattern_shingles) - len(counter) if texts < len(indices) else 0
+    return counter, undecided, matched
+
+
+def create_search_function(method: str, pattern_shingles: list, presence_only: bool = False, stats=NULL_STATS,
+                           match_limit: int = None, progress=NULL_PROGRESS, partial: bool = False):
+    """
+    Подготавливает поиск шинглов образца выбранным алгоритмом.
+
+    Args:
+        method (str): Алгоритм поиска, один из SEARCH_METHODS.
+        pattern_shingles (list): Шинглы образца.
+        presence_only (bool): Учитывать только первый текст, в котором найден
+            шингл, и не искать шингл в остальных текстах.
+        stats (StatsClass): Статистика, в которую записываются счетчики поиска.
+        match_limit (int): Порог числа найденных шинглов (см. get_match_limit()),
+            после решения о превышении которого поиск прекращается. Используется
+            вместе с presence_only.
+        progress (ProgressClass): Ход проверки, отмечаемый по парам шингл-текст
+            или по просмотренным текстам.
+        partial (bool): Поиск выполняется лишь в части корпуса, поэтому по
+            match_limit решается только превышение порога.
+
+    Returns:
+        Callable: Функция (corpus, indices), возвращающая списки вхождений
+            для текстов корпуса с номерами из indices, количество шинглов,
+            оставшихся непроверенными из-за досрочной остановки, и номера
+            шинглов образца для каждого списка вхождений.
+    """
+    if method in SINGLE_PATTERN_SEARCHES:
+        search_class, search_method_name = SINGLE_PATTERN_SEARCHES[method]
+        return functools.partial(_search_single, pattern_shingles, search_class, search_method_name,
+                                 presence_only, stats, match_limit, partial, progress)
+    search_class, search_method_name = MULTI_PATTERN_SEARCHES[method]
+    search_object = search_class(pattern_shingles)
+    return functools.partial(_search_multi, pattern_shingles, search_object, search_method_name,
+                             presence_only, stats, match_limit, progress)
+
+
+_worker_corpus = None
+_worker_search_key = None
+_worker_search_function = None
+
+
+def _init_search_worker(corpus_path: str, offsets_path: str) -> None:
+    """Открывает корпус в процессе пула."""
+    global _worker_corpus
+    _worker_corpus = PackedCorpusClass(corpus_path, offsets_path, writable=False)
+
+
+def _search_shard(method: str, pattern_shingles: list, presence_only: bool, match_limit: int,
+                  start: int, stop: int) -> tuple:
+    """
+    Выполняет поиск в части корпуса в процессе пула. Поиск для образца
+    подготавливается заново, только если образец или параметры поиска изменились,
+    а корпус открывается заново, если в него добавлены тексты.
+    """
+    global _worker_corpus, _worker_search_key, _worker_search_function
+    if stop > len(_worker_corpus):
+        _worker_corpus = PackedCorpusClass(_worker_corpus.corpus_path, _worker_corpus.offsets_path, writable=False)
+    search_key = (method, presence_only, match_limit, pattern_shingles)
+    if search_key != _worker_search_key:
+        _worker_search_function = create_search_function(method, pattern_shingles, presence_only,
+                                                         match_limit=match_limit, partial=True)
+        _worker_search_key = search_key
+    counter, _, matched = _worker_search_function(_worker_corpus, range(start, stop))
+    return counter, matched
+
+
+_worker_chunk_size = None
+
+
+def _init_import_worker(chunk_size: int) -> None:
+    """Загружает словари морфологического анализатора в процессе пула импорта."""
+    global _worker_chunk_size
+    _worker_chunk_size = chunk_size
+    get_morph_analyzer()
+
+
+def _canonize_file(path: str) -> tuple:
+    """
+    Читает и канонизирует файл в процессе пула импорта.
+
+    Returns:
+        tuple: Путь, список пар (часть исходного текста, ее каноническая форма),
+            хеш исходного текста и текст ошибки (None, если файл прочитан).
+    """
+    try:
+        chunks = list(canonize_chunks(read_txt_chunks(path, _worker_chunk_size))) or [('', '')]
+    except (OSError, UnicodeDecodeError) as error:
+        return path, None, None, str(error)
+    return path, chunks, get_content_hash(text for text, _ in chunks), None
+
+
+def instrumented(search_method):
+    """
+    Собирает статистику проверки, если она включена методом
+    AntiPlagiarismClass.enable_instrumentation(). Выключенный сбор сводится
+    к одной проверке флага.
+
+    Кроме того, добавляет методу поиска необязательные именованные аргументы
+    progress - функцию (выполнено, всего), получающую ход проверки, - и
+    cancel_event - событие threading.Event, после установки которого проверка
+    прерывается исключением SearchCancelled.
+    """
+    @functools.wraps(search_method)
+    def wrapper(self, *args, progress=None, cancel_event=None, **kwargs):
+        if progress is None and cancel_event is None:
+            return _run_instrumented(search_method, self, args, kwargs)
+        self.progress = ProgressClass(progress, cancel_event)
+        try:
+            result = _run_instrumented(search_method, self, args, kwargs)
+            self.progress.finish()
+        finally:
+            self.progress = NULL_PROGRESS
+        return result
+    return wrapper
+
+
+def _run_instrumented(search_method, self, args: tuple, kwargs: dict):
+    """Выполняет метод поиска, собирая статистику, если сбор включен."""
+    if not self.instrumentation_enabled:
+        return search_method(self, *args, **kwargs)
+    stats = StatsClass()
+    stats.merge(self.pattern_stats)
+    self.stats = stats
+    try:
+        with stats.capture(self.profile_checks, self.trace_memory), stats.timer("check"):
+            result = search_method(self, *args, **kwargs)
+    finally:
+        self.stats = NULL_STATS
+    self.last_stats = stats
+    if self.export_hook is not None:
+        self.export_hook(stats)
+    return result
 
 
 class AntiPlagiarismClass():
 
-    def __init__(self) -> None:
+    SHINGLE_SIZE = 3
+
+    def __init__(self, data_directory: str = ".", winnow_window: int = 1) -> None:
         """Инициализация класса AntiPlagiarismClass.
 
-        Читает базу канонических текстов и инициализирует переменные класса.
+        Открывает базу текстов (при первом запуске переносит в нее тексты из
+        database.json и canonicaldatabase.json), дописывает недостающие тексты
+        в упакованный корпус и инициализирует переменные класса. Канонические
+        тексты читаются из корпуса через mmap и не копируются в память процесса.
+
+        Индекс шинглов и индекс MinHash-сигнатур загружаются и синхронизируются
+        при первом обращении к ним, поэтому время создания объекта не зависит от
+        размера базы. Чтобы загрузить их заранее, вызовите start_warm_up().
+
+        Args:
+            data_directory (str): Каталог с файлами базы и индекса.
+            winnow_window (int): Размер окна просеивания отпечатков для индекса
+                шинглов (по умолчанию 1 - индексируются все шинглы). При смене
+                значения индекс перестраивается.
+        """
+        self.data_directory = data_directory
+        self.winnow_window = winnow_window
+        self.database = DatabaseClass(
+            os.path.join(data_directory, "database.sqlite"))
+        self.database.migrate_from_json(
+            os.path.join(data_directory, "database.json"),
+            os.path.join(data_directory, "canonicaldatabase.json"))
+        self.text_names = self.database.get_names()
+        self.canonical_text = PackedCorpusClass(
+            os.path.join(data_directory, "canonicalcorpus.bin"),
+            os.path.join(data_directory, "canonicalcorpus.idx"))
+        if len(self.canonical_text) > len(self.text_names):
+            self.canonical_text.clear()
+        for _, canonical_text in self.database.iter_canonical_texts(len(self.canonical_text)):
+            self.canonical_text.append(canonical_text)
+        self.size_dict = len(self.canonical_text)
+        self.text_positions = {name: position for position, name in enumerate(self.text_names)}
+        self.canonical_cache = CanonicalCacheClass(
+            os.path.join(data_directory, "canonicalcache.sqlite"), self.SHINGLE_SIZE)
+        self._shingle_index = None
+        self._minhash_index = None
+        self.load_lock = threading.RLock()
+        self.shingle_index_lock = threading.Lock()
+        self.minhash_index_lock = threading.Lock()
+        self.register_lock = threading.Lock()
+        self.ready = threading.Event()
+        self.warm_up_error = None
+        self.vocabulary = VocabularyClass()
+        self.canonical_tokens = None
+        self.canonical_shingles = None
+        self.suffix_automaton = None
+        self.search_executor = None
+        self.search_executor_workers = None
+        self.instrumentation_enabled = False
+        self.export_hook = None
+        self.profile_checks = False
+        self.trace_memory = False
+        self.stats = NULL_STATS
+        self.pattern_stats = NULL_STATS
+        self.last_stats = None
+        self.progress = NULL_PROGRESS
+
+    def _iter_missing_texts(self, indexed_names):
+        """Перебирает пары (идентификатор, канонический текст) текстов базы, которых нет в indexed_names."""
+        for position, name in enumerate(self.text_names):
+            if name not in indexed_names:
+                yield name, self.canonical_text[position]
+
+    @property
+    def shingle_index(self) -> ShingleIndexClass:
+        """
+        Индекс шинглов базы. При первом обращении загружается из файла и
+        дополняется текстами базы, которых в нем нет. Тексты, добавленные во
+        время загрузки, дополняются под register_lock перед публикацией индекса,
+        поэтому добавление текста не ждет загрузки (см. _register_text()).
+        """
+        if self._shingle_index is None:
+            with self.shingle_index_lock:
+                if self._shingle_index is None:
+                    shingle_index = ShingleIndexClass(
+                        os.path.join(self.data_directory, "shingleindex.jsonl"), self.SHINGLE_SIZE, self.winnow_window)
+                    shingle_index.synchronize(self._iter_missing_texts(shingle_index.documents))
+                    with self.register_lock:
+                        shingle_index.synchronize(self._iter_missing_texts(shingle_index.documents))
+                        self._shingle_index = shingle_index
+        return self._shingle_index
+
+    @property
+    def minhash_index(self):
+        """
+        Индекс MinHash-сигнатур базы (MinHash.MinHashIndexClass). При первом
+        обращении загружается из файла и дополняется текстами базы, которых в
+        нем нет (так же, как shingle_index); NumPy импортируется только в этот момент.
+        """
+        if self._minhash_index is None:
+            with self.minhash_index_lock:
+                if self._minhash_index is None:
+                    from MinHash import MinHashIndexClass
+                    minhash_index = MinHashIndexClass(
+                        os.path.join(self.data_directory, "minhash.jsonl"), self.SHINGLE_SIZE)
+                    minhash_index.synchronize(self._iter_missing_texts(minhash_index.signatures))
+                    with self.register_lock:
+                        minhash_index.synchronize(self._iter_missing_texts(minhash_index.signatures))
+                        self._minhash_index = minhash_index
+        return self._minhash_index
+
+    def warm_up(self) -> None:
         """
-        canonical_text_dict, self.size_dict = read_json(
-            "canonicaldatabase.json")
-        self.canonical_text = [text for text in canonical_text_dict.values()]
+        Заранее выполняет то, что иначе откладывается до первой проверки:
+        загружает словари морфологического анализатора, индекс шинглов и индекс
+        MinHash-сигнатур и просит ОС прочитать файл корпуса в кэш страниц.
+        По завершении (в том числе с ошибкой) устанавливает событие ready;
+        ошибка сохраняется в атрибут warm_up_error.
+        """
+        try:
+            get_morph_analyzer()
+            self.shingle_index
+            self.minhash_index
+            self.canonical_text.prefetch()
+        except Exception as error:
+            self.warm_up_error = error
+        finally:
+            self.ready.set()
+
+    def start_warm_up(self) -> threading.Thread:
+        """
+        Запускает warm_up() в фоновом потоке. Методы класса можно вызывать, не
+        дожидаясь его завершения: данные, которые еще не загружены, загрузятся
+        при первом обращении, а одновременная загрузка одного индекса из двух
+        потоков исключена блокировкой.
+
+        Returns:
+            threading.Thread: Запущенный поток.
+        """
+        thread = threading.Thread(target=self.warm_up, name="AntiPlagiarismWarmUp", daemon=True)
+        thread.start()
+        return thread
+
+    def wait_until_ready(self, timeout: float = None) -> bool:
+        """
+        Ждет завершения фоновой загрузки, запущенной start_warm_up().
+
+        Args:
+            timeout (float): Максимальное время ожидания в секундах (None - без ограничения).
+
+        Returns:
+            bool: True, если загрузка завершена.
+        """
+        return self.ready.wait(timeout)
+
+    def enable_instrumentation(self, export_hook=None, profile: bool = False, trace_memory: bool = False) -> None:
+        """
+        Включает сбор статистики проверок.
+
+        Каждый вызов search_plagiarism_* сохраняет в атрибут last_stats объект
+        StatsClass со временем этапов (parsing, cleanup, shingling, preprocessing,
+        search, check) и счетчиками; статистика канонизации берется из последнего
+        вызова set_pattern().
+
+        Args:
+            export_hook (Callable): Функция, которой передается статистика после каждой проверки.
+            profile (bool): Профилировать каждую проверку через cProfile.
+            trace_memory (bool): Замерять пиковую память каждой проверки через tracemalloc.
+        """
+        self.instrumentation_enabled = True
+        self.export_hook = export_hook
+        self.profile_checks = profile
+        self.trace_memory = trace_memory
+
+    def disable_instrumentation(self) -> None:
+        """Выключает сбор статистики проверок."""
+        self.instrumentation_enabled = False
+        self.export_hook = None
+        self.profile_checks = False
+        self.trace_memory = False
+        self.pattern_stats = NULL_STATS
 
     def set_pattern(self, pattern: str) -> None:
         """
@@ -25,109 +494,834 @@ class AntiPlagiarismClass():
         Args:
             pattern (str): Образец для поиска.
         """
-        self.canonical_pattern_object = CanonicalTextClass(pattern, 3)
-        self.canonical_pattern_object.make_canonical()
+        if not self.instrumentation_enabled:
+            canonical_pattern, self.pattern_fingerprints = self._canonize(
+                pattern, get_content_hash((pattern,)), cache_result=True)
+        else:
+            self.pattern_stats = StatsClass()
+            lemma_cache_misses = get_lemma_cache_info().misses
+            cache_hits = self.canonical_cache.hits
+            with self.pattern_stats.timer("hashing"):
+                content_hash = get_content_hash((pattern,))
+            canonical_pattern, self.pattern_fingerprints = self._canonize(
+                pattern, content_hash, self.pattern_stats, cache_result=True)
+            self.pattern_stats.count("lemma_cache_misses", get_lemma_cache_info().misses - lemma_cache_misses)
+            self.pattern_stats.count("canonical_cache_hits", self.canonical_cache.hits - cache_hits)
+        self.canonical_pattern_object = CanonicalTextClass(canonical_pattern, self.SHINGLE_SIZE)
 
     def get_pattern(self) -> str:
         if self.canonical_pattern_object.text:
             return self.canonical_pattern_object.text
 
-    def update_database_text(self, new_text: str) -> None:
+    def _canonize(self, text: str, content_hash: str, stats=NULL_STATS, cache_result: bool = False) -> tuple:
         """
-        Обновляет базу новым текстом.
+        Канонизирует текст, используя постоянный кэш результатов канонизации.
+        В кэш сохраняются только проверяемые тексты: тексты базы канонизируются
+        один раз, и их результаты лишь вытесняли бы из кэша работы, присылаемые повторно.
+
+        Args:
+            text (str): Исходный текст.
+            content_hash (str): Хеш исходного текста (см. get_content_hash()).
+            stats (StatsClass): Статистика канонизации при промахе кэша.
+            cache_result (bool): Сохранить результат канонизации в кэш.
+
+        Returns:
+            tuple: Канонический текст и отпечатки его шинглов (array('Q')).
+        """
+        cached = self.canonical_cache.get(content_hash)
+        if cached is not None:
+            return cached
+        canonical_text = CanonicalTextClass(text, self.SHINGLE_SIZE).make_canonical(stats)
+        fingerprints = array('Q', get_text_fingerprints(canonical_text, self.SHINGLE_SIZE))
+        if cache_result:
+            self.canonical_cache.put(content_hash, canonical_text, fingerprints)
+        return canonical_text, fingerprints
+
+    def _add_canonical_text(self, new_text: str) -> str:
+        """
+        Канонизирует текст и добавляет его в базу, индексы и кэш отпечатков.
+        Текст, уже имеющийся в базе, повторно не добавляется.
 
         Args:
             new_text (str): Новый текст для добавления в базу.
+
+        Returns:
+            str: Идентификатор добавленного текста или такого же текста, уже имеющегося в базе.
+        """
+        content_hash = get_content_hash((new_text,))
+        duplicate_name = self.database.find_text_by_hash(content_hash)
+        if duplicate_name is not None:
+            return duplicate_name
+        name = self._new_text_name()
+        canonical_text, _ = self._canonize(new_text, content_hash)
+        self.database.add_text(name, new_text, canonical_text, content_hash)
+        self.canonical_text.append(canonical_text)
+        self._register_text(name)
+        return name
+
+    def _add_canonical_chunks(self, chunks) -> str:
+        """
+        Потоково канонизирует текст, поданный частями, и добавляет его в базу,
+        индексы и кэш отпечатков. Каждая часть канонизируется и записывается
+        в корпус и базу сразу после чтения, поэтому текст не собирается в памяти
+        целиком. Текст из одной части добавляется как обычно.
+
+        Args:
+            chunks (Iterable[str]): Части текста, разделенные по границам слов.
+
+        Returns:
+            str: Идентификатор добавленного текста.
+        """
+        chunks = iter(chunks)
+        first_chunk = next(chunks, '')
+        second_chunk = next(chunks, None)
+        if second_chunk is None:
+            return self._add_canonical_text(first_chunk)
+        name = self._new_text_name()
+        with self.canonical_text.appending() as write_canonical:
+            def store_chunks():
+                for text, canonical_text in canonize_chunks(itertools.chain((first_chunk, second_chunk), chunks)):
+                    write_canonical(canonical_text)
+                    yield text, canonical_text
+
+            self.database.add_text_chunks(name, store_chunks())
+        self._register_text(name)
+        return name
+
+    def _new_text_name(self, offset: int = 0) -> str:
+        """
+        Возвращает идентификатор для нового текста по числу текстов в базе.
+
+        Args:
+            offset (int): Количество текстов, которым уже выданы идентификаторы,
+                но которые еще не записаны в базу.
+
+        Returns:
+            str: Идентификатор текста.
         """
-        write_json("database.json", f"text{self.size_dict + 1}", new_text)
-        self.canonical_text.append(
-            CanonicalTextClass(new_text).make_canonical())
-        write_json("canonicaldatabase.json",
-                   f"text{self.size_dict + 1}", self.canonical_text[-1])
+        return f"text{self.database.size() + offset + 1}"
+
+    def _register_text(self, name: str) -> None:
+        """
+        Добавляет последний текст корпуса в индексы и кэши, читая его из корпуса частями.
+
+        Текст к этому моменту уже записан в базу, поэтому сначала обновляются
+        счетчики текстов. Индекс, который еще не загружен (например, во время
+        фоновой загрузки), не трогается: загрузка дополнит его этим текстом.
+        Если обновить индекс не удалось, индекс сбрасывается: при следующем
+        обращении он загрузится из файла и дополнится этим текстом.
+
+        Args:
+            name (str): Идентификатор текста.
+        """
+        position = len(self.text_names)
+        self.text_positions[name] = position
+        self.text_names.append(name)
         self.size_dict += 1
+        chunks = functools.partial(self.canonical_text.iter_text_chunks, position)
+        with self.load_lock:
+            # Кэш, построенный после добавления имени текста, уже содержит этот текст.
+            if self.canonical_tokens is not None and len(self.canonical_tokens) == position:
+                tokens = self.vocabulary.encode_chunks(chunks())
+                self.canonical_tokens.append(tokens)
+                if self.canonical_shingles is not None and len(self.canonical_shingles) == position:
+                    self.canonical_shingles.append(pack_shingles(tokens, self.SHINGLE_SIZE))
+                if self.suffix_automaton is not None and self.suffix_automaton.documents_count == position:
+                    self.suffix_automaton.add_document_tokens(tokens)
+        error = None
+        for attribute_name in ("_shingle_index", "_minhash_index"):
+            with self.register_lock:
+                index = getattr(self, attribute_name)
+            if index is None:
+                continue
+            try:
+                index.add_document_chunks(name, chunks())
+            except BaseException as exception:
+                setattr(self, attribute_name, None)
+                error = error or exception
+        if error is not None:
+            raise error
 
-    def update_database_from_txt(self, txt_file_path: str) -> None:
+    def update_database_text(self, new_text: str) -> str:
+        """
+        Обновляет базу новым текстом.
+
+        Args:
+            new_text (str): Новый текст для добавления в базу.
+
+        Returns:
+            str: Идентификатор добавленного текста или такого же текста, уже имеющегося в базе.
+        """
+        return self._add_canonical_text(new_text)
+
+    def update_database_texts(self, new_texts: list) -> list:
+        """
+        Обновляет базу пакетом текстов; все тексты записываются в базу в одной транзакции.
+
+        Args:
+            new_texts (list): Новые тексты для добавления в базу.
+
+        Returns:
+            list: Идентификаторы добавленных текстов (или таких же текстов, уже
+                имеющихся в базе) в порядке new_texts.
+        """
+        return self.add_canonized_texts(self.canonize_texts(new_texts))
+
+    def canonize_texts(self, texts: list) -> list:
+        """
+        Канонизирует тексты для add_canonized_texts(), не изменяя базу, корпус и индексы.
+        Метод можно вызывать одновременно с проверками, чтобы не задерживать их на
+        время канонизации пакета.
+
+        Args:
+            texts (list): Исходные тексты.
+
+        Returns:
+            list: Тройки (исходный текст, хеш исходного текста, канонический текст) в порядке texts.
+        """
+        canonized = []
+        for text in texts:
+            content_hash = get_content_hash((text,))
+            canonized.append((text, content_hash, self._canonize(text, content_hash)[0]))
+        return canonized
+
+    def add_canonized_texts(self, canonized: list) -> list:
+        """
+        Добавляет тексты, канонизированные методом canonize_texts(), в базу (в одной
+        транзакции), корпус и индексы. Тексты, уже имеющиеся в базе или повторяющиеся
+        в пакете, повторно не добавляются.
+
+        Args:
+            canonized (list): Результат canonize_texts().
+
+        Returns:
+            list: Идентификаторы текстов в порядке canonized.
+        """
+        names = []
+        documents = []
+        batch_names = {}
+        for text, content_hash, canonical_text in canonized:
+            name = batch_names.get(content_hash) or self.database.find_text_by_hash(content_hash)
+            if name is None:
+                name = self._new_text_name(len(documents))
+                batch_names[content_hash] = name
+                documents.append((name, text, canonical_text, content_hash))
+            names.append(name)
+        self.database.add_texts(documents)
+        for name, _, canonical_text, _ in documents:
+            self.canonical_text.append(canonical_text)
+            self._register_text(name)
+        return names
+
+    def update_database_from_txt(self, txt_file_path: str, chunk_size: int = TXT_CHUNK_SIZE) -> str:
         """
         Обновляет базу из текстового файла.
 
+        Файл читается и канонизируется частями примерно по chunk_size символов,
+        поэтому объем памяти не зависит от размера файла. Файл, совпадающий
+        с текстом базы, повторно не добавляется.
+
         Args:
             txt_file_path (str): Путь к текстовому файлу.
+            chunk_size (int): Размер части в символах.
+
+        Returns:
+            str: Идентификатор добавленного текста или такого же текста, уже имеющегося в базе.
         """
-        read_txt_and_write_to_json(
-            txt_file_path, "database.json", f"text{self.size_dict + 1}")
-        self.canonical_text.append(
-            CanonicalTextClass(read_json("database.json")[0][f"text{self.size_dict + 1}"]).make_canonical())
-        write_json("canonicaldatabase.json",
-                   f"text{self.size_dict + 1}", self.canonical_text[-1])
-        self.size_dict += 1
+        duplicate_name = self.database.find_text_by_hash(
+            get_content_hash(read_txt_chunks(txt_file_path, chunk_size)))
+        if duplicate_name is not None:
+            return duplicate_name
+        return self._add_canonical_chunks(read_txt_chunks(txt_file_path, chunk_size))
+
+    def update_database_from_directory(self, directory_path: str, chunk_size: int = TXT_CHUNK_SIZE) -> dict:
+        """
+        Обновляет базу всеми файлами .txt из каталога и его подкаталогов.
+        Файлы, совпадающие с текстами базы, повторно не добавляются.
+
+        Args:
+            directory_path (str): Путь к каталогу.
+            chunk_size (int): Размер части в символах.
 
-    def search_plagiarism_RK(self) -> float:
+        Returns:
+            dict: Отчет с количеством добавленных файлов (added) и словарем
+                путь -> идентификатор для файлов, совпавших с текстами базы (duplicates).
+        """
+        report = {"added": 0, "duplicates": {}}
+        for txt_file_path in iter_txt_files(directory_path):
+            size = self.size_dict
+            name = self.update_database_from_txt(txt_file_path, chunk_size)
+            if self.size_dict == size:
+                report["duplicates"][txt_file_path] = name
+            else:
+                report["added"] += 1
+        return report
+
+    def import_files(self, paths, max_workers: int = None, batch_size: int = 500,
+                     chunk_size: int = TXT_CHUNK_SIZE, progress=None) -> dict:
+        """
+        Пакетно импортирует текстовые файлы в базу.
+
+        Файлы канонизируются в пуле процессов, в каждом из которых морфологический
+        анализатор загружается один раз. Документы получают идентификаторы textN
+        в порядке перечисления файлов и записываются в базу пакетами по batch_size
+        в одной транзакции вместе с журналом импорта. Повторный вызов после сбоя
+        пропускает файлы, уже записанные в журнал; корпус и индексы недописанных
+        документов восстанавливаются при следующем открытии базы.
+
+        Args:
+            paths (Iterable[str]): Пути к файлам.
+            max_workers (int): Количество процессов (по умолчанию - число процессоров).
+            batch_size (int): Количество документов в одной транзакции.
+            chunk_size (int): Размер части файла в символах.
+            progress (Callable[[int, int], None]): Вызывается после обработки
+                каждого файла с числом обработанных файлов и общим числом файлов.
+
+        Returns:
+            dict: Количество импортированных файлов (imported), пропущенных
+                как уже импортированные (skipped), словарь путь -> идентификатор
+                для файлов, совпавших с текстами базы (duplicates), и словарь
+                путь -> ошибка для файлов, которые не удалось прочитать (failed).
+        """
+        paths = list(dict.fromkeys(os.path.abspath(path) for path in paths))
+        imported_paths = self.database.get_imported_paths()
+        pending = [path for path in paths if path not in imported_paths]
+        report = {"imported": 0, "skipped": len(paths) - len(pending), "duplicates": {}, "failed": {}}
+        if not pending:
+            return report
+        with ProcessPoolExecutor(max_workers, initializer=_init_import_worker, initargs=(chunk_size,)) as executor:
+            results = executor.map(_canonize_file, pending, chunksize=4)
+            processed = 0
+            while processed < len(pending):
+                documents = []
+                batch_names = {}
+                for path, chunks, content_hash, error in itertools.islice(results, batch_size):
+                    processed += 1
+                    if error is not None:
+                        report["failed"][path] = error
+                    else:
+                        duplicate_name = batch_names.get(content_hash) or self.database.find_text_by_hash(content_hash)
+                        if duplicate_name is not None:
+                            report["duplicates"][path] = duplicate_name
+                            documents.append((duplicate_name, path, None, content_hash))
+                        else:
+                            name = self._new_text_name(len(batch_names))
+                            batch_names[content_hash] = name
+                            documents.append((name, path, chunks, content_hash))
+                    if progress is not None:
+                        progress(processed, len(pending))
+                self.database.add_imported_texts(documents)
+                for name, _, chunks, _ in documents:
+                    if chunks is not None:
+                        self.canonical_text.append_chunks(canonical_text for _, canonical_text in chunks)
+                        self._register_text(name)
+                report["imported"] += len(batch_names)
+        return report
+
+    def get_canonical_tokens(self) -> list:
+        """
+        Возвращает каждый текст базы в виде номеров слов из словаря self.vocabulary.
+
+        Тексты разбиваются на слова один раз, при первом обращении, и хранятся
+        компактно в массивах array('I') - по 4 байта на слово; текст по номерам
+        восстанавливается методом self.vocabulary.decode(). В список попадают и
+        тексты, добавленные во время его построения, поэтому номер текста в нем
+        совпадает с номером в self.text_names.
+
+        Returns:
+            list: Список массивов номеров слов в порядке текстов базы.
+        """
+        if self.canonical_tokens is None:
+            with self.load_lock:
+                if self.canonical_tokens is None:
+                    self.progress.add_total(len(self.text_names))
+                    canonical_tokens = []
+                    while len(canonical_tokens) < len(self.text_names):
+                        position = len(canonical_tokens)
+                        self.progress.advance()
+                        canonical_tokens.append(
+                            self.vocabulary.encode_chunks(self.canonical_text.iter_text_chunks(position)))
+                    self.canonical_tokens = canonical_tokens
+        return self.canonical_tokens
+
+    def get_canonical_shingles(self) -> list:
+        """
+        Возвращает ключи шинглов каждого текста базы (см. Vocabulary.pack_shingles()).
+
+        Ключи вычисляются по номерам слов при первом обращении, без создания строк
+        шинглов, и хранятся в массивах array('Q').
+
+        Returns:
+            list: Список массивов ключей шинглов в порядке текстов базы.
+        """
+        if self.canonical_shingles is None:
+            canonical_tokens = self.get_canonical_tokens()
+            with self.load_lock:
+                if self.canonical_shingles is None:
+                    self.canonical_shingles = [pack_shingles(tokens, self.SHINGLE_SIZE) for tokens in canonical_tokens]
+        return self.canonical_shingles
+
+    def _create_pattern_shingles(self) -> list:
+        """Создает шинглы образца, записывая в статистику время и их количество."""
+        with self.stats.timer("shingling"):
+            pattern_shingles = self.canonical_pattern_object.create_shingles()
+        self.stats.count("shingles_generated", len(pattern_shingles))
+        return pattern_shingles
+
+    def _create_pattern_fingerprints(self, window_size: int = 1) -> list:
+        """Создает отпечатки шинглов образца (просеянные при window_size > 1), записывая в статистику время и их количество."""
+        with self.stats.timer("shingling"):
+            pattern_fingerprints = [fingerprint for _, fingerprint in
+                                    winnow_fingerprints(self.pattern_fingerprints, window_size)]
+        self.stats.count("shingles_generated", len(pattern_fingerprints))
+        return pattern_fingerprints
+
+    def get_suffix_automaton(self) -> SuffixAutomatonClass:
+        """
+        Возвращает суффиксный автомат по всем текстам базы.
+
+        Автомат строится при первом обращении и дополняется при добавлении текстов.
+
+        Returns:
+            SuffixAutomatonClass: Автомат, номера текстов в котором совпадают с их порядком в базе.
+        """
+        if self.suffix_automaton is None:
+            canonical_tokens = self.get_canonical_tokens()
+            with self.load_lock:
+                if self.suffix_automaton is None:
+                    self.progress.add_total(len(canonical_tokens))
+                    suffix_automaton = SuffixAutomatonClass(self.vocabulary)
+                    for tokens in canonical_tokens:
+                        self.progress.advance()
+                        suffix_automaton.add_document_tokens(tokens)
+                    self.suffix_automaton = suffix_automaton
+        return self.suffix_automaton
+
+    def _search_plagiarism(self, method: str, presence_only: bool = False, min_uniqueness: float = None) -> float:
+        """
+        Поиск плагиата выбранным алгоритмом по всем текстам базы.
+
+        Если задан порог min_uniqueness, шингл ищется только до первого вхождения
+        (как при presence_only), а проверка прекращается, как только известно,
+        будет ли уникальность не ниже порога. Тогда возвращается граница,
+        решившая исход: нижняя оценка уникальности, если порог заведомо достигнут,
+        или верхняя, если заведомо не достигнут. Без досрочной остановки
+        возвращается точное значение.
+
+        Args:
+            method (str): Алгоритм поиска, один из SEARCH_METHODS.
+            presence_only (bool): Учитывать шингл только в первом тексте, где он
+                найден, и пропускать для него остальные тексты.
+            min_uniqueness (float): Порог уникальности в процентах.
+
+        Returns:
+            float: Процент уникальности.
+        """
+        pattern_shingles = self._create_pattern_shingles()
+        match_limit = None
+        if min_uniqueness is not None:
+            presence_only = True
+            match_limit = get_match_limit(len(pattern_shingles), min_uniqueness)
+        with self.stats.timer("preprocessing"):
+            search_function = create_search_function(method, pattern_shingles, presence_only, self.stats,
+                                                      match_limit, self.progress)
+        with self.stats.timer("search"):
+            counter, undecided, _ = search_function(self.canonical_text, range(len(self.canonical_text)))
+        if match_limit is not None and len(counter) <= match_limit:
+            return get_uniqueness(len(counter) + undecided, len(pattern_shingles)), counter
+        return get_uniqueness(len(counter), len(pattern_shingles)), counter
+
+    @instrumented
+    def search_plagiarism_RK(self, presence_only: bool = False, min_uniqueness: float = None) -> float:
         """
         Поиск плагиата с использованием алгоритма Рабина-Карпа.
 
+        Args:
+            presence_only (bool): Учитывать шингл только в первом тексте, где он найден.
+            min_uniqueness (float): Порог уникальности в процентах, после решения
+                о достижении которого проверка прекращается (см. _search_plagiarism()).
+
         Returns:
             float: Процент уникальности.
         """
-        counter = []
-        pattern_shingles = self.canonical_pattern_object.create_shingles()
-        for shingle in pattern_shingles:
-            for text in self.canonical_text:
-                search_object = RK_StringSearch(shingle)
-                search_list = search_object.get_substring_rk(text)
-                if search_list:
-                    counter.append(search_list)
-        return abs(1 - (len(counter)/len(pattern_shingles))) * 100, counter
+        return self._search_plagiarism("RK", presence_only, min_uniqueness)
 
-    def search_plagiarism_KMP(self) -> float:
+    @instrumented
+    def search_plagiarism_KMP(self, presence_only: bool = False, min_uniqueness: float = None) -> float:
         """
         Поиск плагиата с использованием алгоритма Кнута-Морриса-Пратта.
 
+        Args:
+            presence_only (bool): Учитывать шингл только в первом тексте, где он найден.
+            min_uniqueness (float): Порог уникальности в процентах, после решения
+                о достижении которого проверка прекращается (см. _search_plagiarism()).
+
         Returns:
             float: Процент уникальности.
         """
-        counter = []
-        pattern_shingles = self.canonical_pattern_object.create_shingles()
-        for shingle in pattern_shingles:
-            for text in self.canonical_text:
-                search_object = KMP_StringSearch(shingle)
-                search_list = search_object.get_substring_kmp(text)
-                if search_list:
-                    counter.append(search_list)
-        return abs(1 - (len(counter)/len(pattern_shingles))) * 100, counter
+        return self._search_plagiarism("KMP", presence_only, min_uniqueness)
 
-    def search_plagiarism_BM_bad(self) -> float:
+    @instrumented
+    def search_plagiarism_BM_bad(self, presence_only: bool = False, min_uniqueness: float = None) -> float:
         """
         Поиск плагиата с использованием алгоритма Бойера-Мура с эвристикой плохого символа.
 
+        Args:
+            presence_only (bool): Учитывать шингл только в первом тексте, где он найден.
+            min_uniqueness (float): Порог уникальности в процентах, после решения
+                о достижении которого проверка прекращается (см. _search_plagiarism()).
+
         Returns:
             float: Процент уникальности.
         """
-        counter = []
-        pattern_shingles = self.canonical_pattern_object.create_shingles()
-        for shingle in pattern_shingles:
-            for text in self.canonical_text:
-                search_object = BM_StringSearch(shingle)
-                search_list = search_object.get_substring_bm_bad_character(
-                    text)
-                if search_list:
-                    counter.append(search_list)
-        return abs(1 - (len(counter)/len(pattern_shingles))) * 100, counter
-
-    def search_plagiarism_BM_good(self) -> float:
+        return self._search_plagiarism("BM_bad", presence_only, min_uniqueness)
+
+    @instrumented
+    def search_plagiarism_BM_good(self, presence_only: bool = False, min_uniqueness: float = None) -> float:
         """
         Поиск плагиата с использованием алгоритма Бойера-Мура с эвристикой хорошего суффикса.
 
+        Args:
+            presence_only (bool): Учитывать шингл только в первом тексте, где он найден.
+            min_uniqueness (float): Порог уникальности в процентах, после решения
+                о достижении которого проверка прекращается (см. _search_plagiarism()).
+
+        Returns:
+            float: Процент уникальности.
+        """
+        return self._search_plagiarism("BM_good", presence_only, min_uniqueness)
+
+    @instrumented
+    def search_plagiarism_index(self) -> float:
+        """
+        Поиск плагиата по инвертированному индексу шинглов.
+
+        Каждый шингл образца ищется одним обращением к индексу, без просмотра
+        текстов базы. Совпадением считается вхождение шингла целыми словами.
+        Если индекс построен с просеиванием, образец просеивается с тем же окном,
+        и процент считается по отобранным отпечаткам.
+
         Returns:
             float: Процент уникальности.
         """
         counter = []
-        pattern_shingles = self.canonical_pattern_object.create_shingles()
-        for shingle in pattern_shingles:
-            for text in self.canonical_text:
-                search_object = BM_StringSearch(shingle)
-                search_list = search_object.get_substring_bm_good_suffix(text)
-                if search_list:
-                    counter.append(search_list)
-        return abs(1 - (len(counter)/len(pattern_shingles))) * 100, counter
-    
+        pattern_fingerprints = self._create_pattern_fingerprints(self.shingle_index.window_size)
+        self.progress.add_total(len(pattern_fingerprints))
+        with self.stats.timer("search"):
+            for fingerprint in pattern_fingerprints:
+                self.progress.advance()
+                for positions in self.shingle_index.lookup(fingerprint).values():
+                    counter.append(positions)
+        return get_uniqueness(len(counter), len(pattern_fingerprints)), counter
+
+    def get_matched_documents(self, limit: int = None) -> list:
+        """
+        Находит по индексу шинглов тексты базы, имеющие общие шинглы с образцом.
+
+        Args:
+            limit (int): Максимальное количество текстов (по умолчанию - все).
 
+        Returns:
+            list: Пары (идентификатор текста, количество общих различных шинглов)
+                по убыванию количества.
+        """
+        counts = {}
+        for fingerprint in set(self._create_pattern_fingerprints(self.shingle_index.window_size)):
+            for name in self.shingle_index.lookup(fingerprint):
+                counts[name] = counts.get(name, 0) + 1
+        return sorted(counts.items(), key=lambda item: (-item[1], self.text_positions[item[0]]))[:limit]
+
+    def get_winnowing_report(self, window_size: int) -> dict:
+        """
+        Сравнивает индекс с просеиванием отпечатков и индекс всех шинглов.
+
+        Размер считается по всем текстам базы, остальные показатели - по текущему
+        образцу: полнота - доля текстов, имеющих общие шинглы с образцом, которые
+        находятся и по просеянным отпечаткам; доли совпавших отпечатков образца
+        соответствуют проценту неуникальности без просеивания и с ним.
+
+        Args:
+            window_size (int): Размер окна просеивания.
+
+        Returns:
+            dict: Размеры индексов (full_size, winnowed_size, size_ratio), гарантированная
+                длина обнаруживаемого совпадения в словах (guarantee_threshold), полнота
+                по текстам (document_recall) и доли совпавших отпечатков образца
+                (full_matched_share, winnowed_matched_share).
+        """
+        pattern_set = set(self.canonical_pattern_object.create_fingerprints())
+        winnowed_pattern_set = {fingerprint for _, fingerprint in
+                                self.canonical_pattern_object.create_winnowed_fingerprints(window_size)}
+        full_size = winnowed_size = 0
+        full_documents = winnowed_documents = 0
+        full_matched = set()
+        winnowed_matched = set()
+        for position in range(len(self.canonical_text)):
+            fingerprints = array('Q', iter_text_fingerprints(self.canonical_text.iter_text_chunks(position),
+                                                             self.SHINGLE_SIZE))
+            winnowed = winnow_fingerprints(fingerprints, window_size)
+            full_size += len(fingerprints)
+            winnowed_size += len(winnowed)
+            common = pattern_set.intersection(fingerprints)
+            if common:
+                full_documents += 1
+                full_matched.update(common)
+                winnowed_common = winnowed_pattern_set.intersection(fingerprint for _, fingerprint in winnowed)
+                if winnowed_common:
+                    winnowed_documents += 1
+                    winnowed_matched.update(winnowed_common)
+        return {
+            "full_size": full_size,
+            "winnowed_size": winnowed_size,
+            "size_ratio": winnowed_size / full_size if full_size else 0.0,
+            "guarantee_threshold": window_size + self.SHINGLE_SIZE - 1,
+            "document_recall": winnowed_documents / full_documents if full_documents else 1.0,
+            "full_matched_share": len(full_matched) / len(pattern_set) if pattern_set else 0.0,
+            "winnowed_matched_share": (len(winnowed_matched) / len(winnowed_pattern_set)
+                                       if winnowed_pattern_set else 0.0),
+        }
+
+    @instrumented
+    def search_plagiarism_SAM(self, min_length: int = None) -> float:
+        """
+        Поиск плагиата по суффиксному автомату всех текстов базы.
+
+        Образец просматривается за один проход, время поиска не зависит от
+        размера базы. Длинный заимствованный фрагмент находится как одно
+        максимальное совпадение, а не как множество отдельных шинглов;
+        неуникальными считаются слова образца, покрытые совпадениями.
+
+        Args:
+            min_length (int): Минимальная длина совпадения в словах
+                (по умолчанию - размер шингла).
+
+        Returns:
+            float: Процент уникальности.
+        """
+        if min_length is None:
+            min_length = self.SHINGLE_SIZE
+        pattern_text = self.canonical_pattern_object.text
+        words_count = len(pattern_text.split())
+        with self.stats.timer("preprocessing"):
+            suffix_automaton = self.get_suffix_automaton()
+        with self.stats.timer("search"):
+            matches = suffix_automaton.find_maximal_matches(pattern_text, min_length)
+        self.stats.count("maximal_matches", len(matches))
+        covered = set()
+        counter = []
+        for pattern_start, length, document, document_start in matches:
+            covered.update(range(pattern_start, pattern_start + length))
+            counter.append((pattern_start, length, self.text_names[document], document_start))
+        return get_uniqueness(len(covered), words_count), counter
+
+    @instrumented
+    def search_plagiarism_words(self) -> float:
+        """
+        Поиск плагиата сравнением ключей шинглов на уровне слов.
+
+        Слова текстов базы и образца заменяются номерами из общего словаря, а
+        шинглы - 64-битными ключами, упакованными из номеров (см.
+        Vocabulary.pack_shingles()). Для каждого текста базы пересечение с
+        ключами образца вычисляется операцией над множеством, а позиции
+        совпадений собираются только для текстов, у которых пересечение непусто.
+        Шинглы сравниваются целыми словами, поэтому совпадения через границу
+        слов не учитываются.
+
+        Returns:
+            float: Процент уникальности.
+        """
+        counter = []
+        with self.stats.timer("preprocessing"):
+            canonical_shingles = self.get_canonical_shingles()
+        # Словарь заполнен текстами базы, поэтому слова образца, которых в нем нет, ни с чем не совпадут.
+        with self.stats.timer("shingling"):
+            pattern_shingles = pack_shingles(self.vocabulary.lookup(self.canonical_pattern_object.text),
+                                             self.SHINGLE_SIZE)
+        self.stats.count("shingles_generated", len(pattern_shingles))
+        pattern_set = set(pattern_shingles)
+        self.progress.add_total(len(canonical_shingles))
+        with self.stats.timer("search"):
+            for shingles in canonical_shingles:
+                self.progress.advance()
+                common = pattern_set.intersection(shingles)
+                if not common:
+                    continue
+                positions = {}
+                for position, shingle in enumerate(shingles):
+                    if shingle in common:
+                        positions.setdefault(shingle, []).append(position)
+                for shingle in pattern_shingles:
+                    if shingle in positions:
+                        counter.append(positions[shingle])
+        return get_uniqueness(len(counter), len(pattern_shingles)), counter
+
+    @instrumented
+    def search_plagiarism_AC(self, presence_only: bool = False, min_uniqueness: float = None) -> float:
+        """
+        Поиск плагиата с использованием алгоритма Ахо-Корасик.
+
+        Автомат строится один раз по всем шинглам образца, и каждый текст базы
+        просматривается за один проход.
+
+        Args:
+            presence_only (bool): Учитывать шингл только в первом тексте, где он найден.
+            min_uniqueness (float): Порог уникальности в процентах, после решения
+                о достижении которого проверка прекращается (см. _search_plagiarism()).
+
+        Returns:
+            float: Процент уникальности.
+        """
+        return self._search_plagiarism("AC", presence_only, min_uniqueness)
+
+    @instrumented
+    def search_plagiarism_RK_multi(self, presence_only: bool = False, min_uniqueness: float = None) -> float:
+        """
+        Поиск плагиата с использованием многошаблонного алгоритма Рабина-Карпа.
+
+        Хеши всех шинглов образца вычисляются один раз.
+
+        Args:
+            presence_only (bool): Учитывать шингл только в первом тексте, где он найден.
+            min_uniqueness (float): Порог уникальности в процентах, после решения
+                о достижении которого проверка прекращается (см. _search_plagiarism()).
+
+        Returns:
+            float: Процент уникальности.
+        """
+        return self._search_plagiarism("RK_multi", presence_only, min_uniqueness)
+
+    @instrumented
+    def search_plagiarism_RK_numpy(self, presence_only: bool = False, min_uniqueness: float = None) -> float:
+        """
+        Поиск плагиата с использованием векторизованного алгоритма Рабина-Карпа на NumPy.
+
+        Хеши всех окон текста вычисляются пакетно, без цикла по символам.
+
+        Args:
+            presence_only (bool): Учитывать шингл только в первом тексте, где он найден.
+            min_uniqueness (float): Порог уникальности в процентах, после решения
+                о достижении которого проверка прекращается (см. _search_plagiarism()).
+
+        Returns:
+            float: Процент уникальности.
+        """
+        return self._search_plagiarism("RK_numpy", presence_only, min_uniqueness)
+
+    @instrumented
+    def search_plagiarism_lsh(self, method: str, threshold: float = 0.2) -> float:
+        """
+        Поиск плагиата выбранным алгоритмом только в текстах, похожих на образец.
+
+        Кандидаты отбираются по индексу MinHash-сигнатур с LSH-разбиением на полосы:
+        точный поиск выполняется лишь в текстах, оценка коэффициента Жаккара
+        которых с образцом не ниже threshold. Время поиска зависит от числа
+        похожих текстов, а не от размера базы; совпадения в текстах, имеющих
+        с образцом мало общих шинглов, не учитываются.
+
+        Args:
+            method (str): Алгоритм поиска, один из SEARCH_METHODS.
+            threshold (float): Минимальная оценка коэффициента Жаккара.
+
+        Returns:
+            float: Процент уникальности.
+        """
+        pattern_shingles = self._create_pattern_shingles()
+        with self.stats.timer("candidates"):
+            candidates = self.minhash_index.query(self._create_pattern_fingerprints(), threshold)
+            # Сигнатуры текстов, которых нет в базе (например, после восстановления базы из копии), пропускаются.
+            indices = sorted(self.text_positions[name] for name in candidates if name in self.text_positions)
+        self.stats.count("candidate_texts", len(indices))
+        with self.stats.timer("preprocessing"):
+            search_function = create_search_function(method, pattern_shingles, stats=self.stats,
+                                                      progress=self.progress)
+        with self.stats.timer("search"):
+            counter, _, _ = search_function(self.canonical_text, indices)
+        return get_uniqueness(len(counter), len(pattern_shingles)), counter
+
+    def _get_search_executor(self, max_workers: int) -> ProcessPoolExecutor:
+        """
+        Возвращает пул процессов параллельного поиска, создавая его при первом
+        обращении или при изменении количества процессов.
+        """
+        if self.search_executor is None or self.search_executor_workers != max_workers:
+            self.close_search_executor()
+            self.search_executor = ProcessPoolExecutor(
+                max_workers, initializer=_init_search_worker,
+                initargs=(self.canonical_text.corpus_path, self.canonical_text.offsets_path))
+            self.search_executor_workers = max_workers
+        return self.search_executor
+
+    def close_search_executor(self) -> None:
+        """
+        Останавливает пул процессов параллельного поиска, если он запущен.
+        """
+        if self.search_executor is not None:
+            self.search_executor.shutdown(wait=False, cancel_futures=True)
+            self.search_executor = None
+            self.search_executor_workers = None
+
+    @instrumented
+    def search_plagiarism_parallel(self, method: str, max_workers: int = None, shard_size: int = 64,
+                                   presence_only: bool = False, min_uniqueness: float = None) -> float:
+        """
+        Параллельный поиск плагиата выбранным алгоритмом в пуле процессов.
+
+        Тексты базы делятся на части по shard_size текстов. Пул процессов
+        создается при первой проверке и используется следующими; тексты
+        процессы читают из упакованного корпуса через mmap, а поиск для образца
+        каждый процесс подготавливает один раз за проверку. Результаты частей
+        объединяются так же, как при последовательном поиске (см. _search_plagiarism()):
+        если задан порог min_uniqueness, оставшиеся части отменяются, как только
+        известно, что порог не достигнут.
+
+        Args:
+            method (str): Алгоритм поиска, один из SEARCH_METHODS.
+            max_workers (int): Количество процессов (по умолчанию - число процессоров).
+            shard_size (int): Количество текстов в одной части.
+            presence_only (bool): Учитывать шингл только в первом тексте, где он найден.
+            min_uniqueness (float): Порог уникальности в процентах.
+
+        Returns:
+            float: Процент уникальности.
+        """
+        counter = []
+        pattern_shingles = self._create_pattern_shingles()
+        match_limit = None
+        if min_uniqueness is not None:
+            presence_only = True
+            match_limit = get_match_limit(len(pattern_shingles), min_uniqueness)
+        first_matches = {}
+        starts = range(0, len(self.canonical_text), shard_size)
+        stops = [min(start + shard_size, len(self.canonical_text)) for start in starts]
+        self.progress.add_total(len(self.canonical_text))
+        with self.stats.timer("search"):
+            executor = self._get_search_executor(max_workers)
+            futures = [executor.submit(_search_shard, method, pattern_shingles, presence_only, match_limit, start, stop)
+                       for start, stop in zip(starts, stops)]
+            try:
+                for start, stop, future in zip(starts, stops, futures):
+                    while not wait((future,), timeout=0.05).done:
+                        self.progress.advance(0)
+                    shard_counter, matched = future.result()
+                    self.progress.advance(stop - start)
+                    if not presence_only:
+                        counter.extend(shard_counter)
+                        continue
+                    # Части перебираются по порядку, поэтому остается вхождение из первого текста, как при последовательном поиске.
+                    for shingle_number, search_list in zip(matched, shard_counter):
+                        first_matches.setdefault(shingle_number, search_list)
+                    if match_limit is not None and len(first_matches) > match_limit and stop < len(self.canonical_text):
+                        self.stats.count("early_exits")
+                        break
+            except BaseException as error:
+                # Части, уже выполняемые процессами, дорабатывают в фоне, а управление возвращается сразу.
+                for future in futures:
+                    future.cancel()
+                if isinstance(error, BrokenProcessPool):
+                    self.close_search_executor()
+                raise
+            for future in futures:
+                future.cancel()
+        if presence_only:
+            counter = [first_matches[shingle_number] for shingle_number in sorted(first_matches)]
+        return get_uniqueness(len(counter), len(pattern_shingles)), counter
@@ -0,0 +1,231 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+"""
+Работа с базой текстов из командной строки, без графического интерфейса.
+
+Модуль не импортирует tkinter и не требует ключа активации, поэтому
+запускается на серверах без дисплея.
+
+Пример запуска:
+    python AntiPlagiarismCLI.py import texts/ extra.txt --workers 8
+    python AntiPlagiarismCLI.py check submissions/ --method AC --min-uniqueness 80 > results.jsonl
+"""
+import argparse
+import inspect
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import freeze_support
+from AntiPlagiarism import AntiPlagiarismClass, SEARCH_METHODS
+from ReadWriteDatabase import iter_txt_files, read_txt
+
+
+def expand_paths(paths: list) -> list:
+    """
+    Заменяет каталоги в списке путей файлами .txt из них и их подкаталогов.
+
+    Args:
+        paths (list): Пути к файлам и каталогам.
+
+    Returns:
+        list: Пути к файлам в исходном порядке.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(iter_txt_files(path))
+        else:
+            files.append(path)
+    return files
+
+
+def make_progress_printer(stream=sys.stderr, interval: float = 1.0):
+    """
+    Создает функцию вывода прогресса, печатающую не чаще одного раза в interval секунд.
+
+    Args:
+        stream: Поток вывода.
+        interval (float): Минимальный интервал между строками в секундах.
+
+    Returns:
+        Callable[[int, int], None]: Функция, принимающая число обработанных и общее число элементов.
+    """
+    started = time.monotonic()
+    last_printed = 0.0
+
+    def print_progress(done: int, total: int) -> None:
+        nonlocal last_printed
+        now = time.monotonic()
+        if done < total and now - last_printed < interval:
+            return
+        last_printed = now
+        elapsed = now - started
+        remaining = elapsed / done * (total - done) if done else 0.0
+        print(f"{done}/{total} files, {elapsed:.0f} s elapsed, ~{remaining:.0f} s left", file=stream, flush=True)
+    return print_progress
+
+
+def iter_submissions(source: str):
+    """
+    Перебирает работы для проверки из каталога или файла JSON Lines.
+
+    Работы из каталога - файлы .txt из него и его подкаталогов с идентификатором,
+    равным пути относительно каталога. Каждая строка файла JSON Lines - объект
+    с полем id и полем text (текст работы) или path (путь к файлу с текстом,
+    относительный путь отсчитывается от каталога файла JSON Lines).
+
+    Args:
+        source (str): Путь к каталогу или файлу JSON Lines.
+
+    Returns:
+        Iterator[tuple]: Тройки (идентификатор, текст или None, путь к файлу или None).
+    """
+    if os.path.isdir(source):
+        for path in iter_txt_files(source):
+            yield os.path.relpath(path, source), None, path
+        return
+    with open(source, 'r', encoding='utf-8') as file:
+        for line_number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            submission = json.loads(line)
+            path = submission.get("path")
+            if path is not None:
+                path = os.path.join(os.path.dirname(source), path)
+            yield str(submission.get("id", line_number)), submission.get("text"), path
+
+
+_worker_antiplagiarism = None
+_worker_options = None
+
+
+def _init_check_worker(data_directory: str, options: dict) -> None:
+    """Открывает базу, индексы и морфологический анализатор один раз в процессе пула."""
+    global _worker_antiplagiarism, _worker_options
+    _worker_antiplagiarism = AntiPlagiarismClass(data_directory)
+    _worker_antiplagiarism.enable_instrumentation()
+    _worker_options = options
+
+
+def _check_submission(submission: tuple) -> dict:
+    """
+    Проверяет одну работу в процессе пула.
+
+    Returns:
+        dict: Результат проверки для вывода строкой JSON.
+    """
+    submission_id, text, path = submission
+    options = _worker_options
+    try:
+        if text is None:
+            text = read_txt(path)
+        return check_text(_worker_antiplagiarism, submission_id, text, options["method"],
+                          options["min_uniqueness"], options["similar_only"], options["matches"])
+    except Exception as error:
+        return {"id": submission_id, "error": f"{type(error).__name__}: {error}"}
+
+
+def check_text(antiplagiarism: AntiPlagiarismClass, submission_id: str, text: str, method: str,
+               min_uniqueness: float = None, similar_only: bool = False, matches: int = 10) -> dict:
+    """
+    Проверяет текст на плагиат.
+
+    Args:
+        antiplagiarism (AntiPlagiarismClass): База с включенным сбором статистики.
+        submission_id (str): Идентификатор работы.
+        text (str): Текст работы.
+        method (str): Суффикс метода search_plagiarism_*.
+        min_uniqueness (float): Порог уникальности в процентах для методов,
+            поддерживающих досрочную остановку.
+        similar_only (bool): Искать только в текстах, отобранных по MinHash-сигнатурам.
+        matches (int): Количество текстов базы с наибольшим числом общих шинглов в результате.
+
+    Returns:
+        dict: Идентификатор, процент уникальности, решение по порогу,
+            совпавшие тексты и время этапов проверки в секундах.
+    """
+    antiplagiarism.set_pattern(text)
+    if similar_only and method in SEARCH_METHODS:
+        uniqueness, _ = antiplagiarism.search_plagiarism_lsh(method)
+    else:
+        search_method = getattr(antiplagiarism, f"search_plagiarism_{method}")
+        if min_uniqueness is not None and "min_uniqueness" in inspect.signature(search_method).parameters:
+            uniqueness, _ = search_method(min_uniqueness=min_uniqueness)
+        else:
+            uniqueness, _ = search_method()
+    result = {"id": submission_id, "uniqueness": round(uniqueness, 4)}
+    if min_uniqueness is not None:
+        result["passed"] = uniqueness >= min_uniqueness
+    result["matched_documents"] = [{"name": name, "shared_shingles": count}
+                                   for name, count in antiplagiarism.get_matched_documents(matches)]
+    result["timings"] = {stage: round(wall, 6) for stage, (wall, _) in antiplagiarism.last_stats.timers.items()}
+    return result
+
+
+def run_check(args) -> int:
+    # Недописанный корпус и индексы синхронизируются здесь, до запуска процессов пула,
+    # чтобы процессы не дописывали файлы индексов одновременно.
+    antiplagiarism = AntiPlagiarismClass(args.data_directory)
+    antiplagiarism.shingle_index
+    antiplagiarism.minhash_index
+    options = {"method": args.method, "min_uniqueness": args.min_uniqueness,
+               "similar_only": args.similar_only, "matches": args.matches}
+    failed = 0
+    with ProcessPoolExecutor(args.workers, initializer=_init_check_worker,
+                             initargs=(args.data_directory, options)) as executor:
+        for result in executor.map(_check_submission, iter_submissions(args.source), chunksize=4):
+            failed += "error" in result
+            print(json.dumps(result, ensure_ascii=False), flush=True)
+    return 1 if failed else 0
+
+
+def run_import(args) -> int:
+    antiplagiarism = AntiPlagiarismClass(args.data_directory)
+    report = antiplagiarism.import_files(
+        expand_paths(args.paths), args.workers, args.batch_size,
+        progress=None if args.quiet else make_progress_printer())
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 1 if report["failed"] else 0
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Anti-plagiarism database tools.")
+    parser.add_argument("--data-directory", default=".", help="directory with the database and index files")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser(
+        "import", help="canonize .txt files in parallel and add them to the database",
+        description="Files already imported into the database are skipped, so an interrupted import "
+                    "can be resumed by running the same command again.")
+    import_parser.add_argument("paths", nargs="+", help=".txt files or directories to import recursively")
+    import_parser.add_argument("--workers", type=int, default=None, help="number of processes (default: CPU count)")
+    import_parser.add_argument("--batch-size", type=int, default=500, help="documents per database transaction")
+    import_parser.add_argument("--quiet", action="store_true", help="do not print progress to stderr")
+    import_parser.set_defaults(handler=run_import)
+
+    methods = sorted(name[len("search_plagiarism_"):] for name in dir(AntiPlagiarismClass)
+                     if name.startswith("search_plagiarism_")
+                     and name not in ("search_plagiarism_parallel", "search_plagiarism_lsh"))
+    check_parser = subparsers.add_parser(
+        "check", help="check submissions against the database and print one JSON line per submission",
+        description="Submissions are checked in parallel; each worker process opens the database and the "
+                    "morphological analyzer once. Results are printed in input order as they are ready.")
+    check_parser.add_argument("source", help="directory of .txt files or JSON Lines file with id and text (or path)")
+    check_parser.add_argument("--method", choices=methods, default="index", help="search method (default: index)")
+    check_parser.add_argument("--min-uniqueness", type=float, default=None,
+                              help="pass threshold in percent; methods that support it stop as soon as it is decided")
+    check_parser.add_argument("--similar-only", action="store_true",
+                              help="search only texts selected by MinHash (for " + ", ".join(SEARCH_METHODS) + ")")
+    check_parser.add_argument("--matches", type=int, default=10, help="matched documents to report per submission")
+    check_parser.add_argument("--workers", type=int, default=None, help="number of processes (default: CPU count)")
+    check_parser.set_defaults(handler=run_check)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    freeze_support()
+    sys.exit(main())
@@ -0,0 +1,589 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+"""
+Локальный HTTP-сервис проверки текстов на плагиат.
+
+Сервис один раз загружает базу, индексы и морфологический анализатор и
+держит их в памяти между запросами, поэтому проверки не платят за загрузку,
+а несколько проверяющих используют одну копию базы. Сервис слушает только
+127.0.0.1 и не требует ключа активации.
+
+Запросы (тела запросов и ответов - JSON):
+    POST /check      {"text": ..., "id": ..., "method": "index", "min_uniqueness": 80,
+                      "similar_only": false, "matches": 10} - проверка текста;
+    POST /documents  {"text": ...} или {"texts": [...]} - добавление текстов в базу;
+    GET  /metrics    - задержки, пропускная способность и размер очередей;
+    GET  /health     - состояние сервиса.
+
+Пример запуска:
+    python AntiPlagiarismServer.py --data-directory data serve --port 8765 --workers 4
+    python AntiPlagiarismServer.py loadtest submissions/ --port 8765 --concurrency 8 --requests 500
+"""
+import argparse
+import collections
+import copy
+import json
+import queue
+import random
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from AntiPlagiarism import AntiPlagiarismClass, SEARCH_METHODS
+from AntiPlagiarismCLI import check_text, iter_submissions
+from ReadWriteDatabase import read_txt
+
+HOST = "127.0.0.1"
+MAX_REQUEST_BYTES = 32 << 20
+CHECK_METHODS = tuple(sorted(name[len("search_plagiarism_"):] for name in dir(AntiPlagiarismClass)
+                             if name.startswith("search_plagiarism_")
+                             and name not in ("search_plagiarism_parallel", "search_plagiarism_lsh")))
+# Кэши базы, которые методы проверки строят при первом обращении: атрибут и метод, строящий его.
+CACHE_BUILDERS = {"words": ("canonical_shingles", "get_canonical_shingles"),
+                  "SAM": ("suffix_automaton", "get_suffix_automaton")}
+
+
+def get_percentiles(values, percentiles: tuple = (50, 95, 99)) -> dict:
+    """
+    Вычисляет перцентили значений методом ближайшего ранга.
+
+    Args:
+        values (Iterable[float]): Значения.
+        percentiles (tuple): Перцентили в процентах.
+
+    Returns:
+        dict: Словарь "p<перцентиль>" -> значение (None для пустого набора).
+    """
+    values = sorted(values)
+    result = {}
+    for percentile in percentiles:
+        if not values:
+            result[f"p{percentile}"] = None
+            continue
+        rank = max(1, -(-len(values) * percentile // 100))
+        result[f"p{percentile}"] = values[rank - 1]
+    return result
+
+
+class ReadWriteLockClass:
+    """
+    Блокировка с общим доступом для чтения и монопольным для записи.
+
+    Читатели (проверки) работают одновременно, писатель (добавление пакета
+    текстов) ждет их завершения и работает один. Ожидающий писатель не
+    пропускает вперед новых читателей, поэтому поток проверок не может
+    бесконечно откладывать добавление текстов.
+    """
+
+    def __init__(self) -> None:
+        """Инициализация класса ReadWriteLockClass."""
+        self.condition = threading.Condition()
+        self.readers = 0
+        self.writers_waiting = 0
+        self.writing = False
+
+    def acquire_read(self) -> None:
+        with self.condition:
+            while self.writing or self.writers_waiting:
+                self.condition.wait()
+            self.readers += 1
+
+    def release_read(self) -> None:
+        with self.condition:
+            self.readers -= 1
+            if not self.readers:
+                self.condition.notify_all()
+
+    def acquire_write(self) -> None:
+        with self.condition:
+            self.writers_waiting += 1
+            while self.writing or self.readers:
+                self.condition.wait()
+            self.writers_waiting -= 1
+            self.writing = True
+
+    def release_write(self) -> None:
+        with self.condition:
+            self.writing = False
+            self.condition.notify_all()
+
+
+class ServerMetricsClass:
+    """
+    Метрики сервиса: количество запросов, ошибок и задержки по каждому виду
+    запросов, а также статистика пакетов добавления текстов.
+
+    Для перцентилей задержки хранятся последние window значений каждого вида запросов.
+    """
+
+    def __init__(self, window: int = 10000) -> None:
+        """
+        Инициализация класса ServerMetricsClass.
+
+        Args:
+            window (int): Количество последних задержек для расчета перцентилей.
+        """
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.window = window
+        self.requests = collections.Counter()
+        self.errors = collections.Counter()
+        self.total_seconds = collections.Counter()
+        self.latencies = collections.defaultdict(lambda: collections.deque(maxlen=self.window))
+        self.finished = collections.defaultdict(lambda: collections.deque(maxlen=self.window))
+        self.batches = 0
+        self.batch_documents = 0
+        self.batch_seconds = 0.0
+        self.max_batch_size = 0
+
+    def record(self, endpoint: str, seconds: float, failed: bool = False) -> None:
+        """
+        Учитывает обработанный запрос.
+
+        Args:
+            endpoint (str): Вид запроса.
+            seconds (float): Время обработки в секундах.
+            failed (bool): Запрос завершился ошибкой.
+        """
+        with self.lock:
+            self.requests[endpoint] += 1
+            self.errors[endpoint] += failed
+            self.total_seconds[endpoint] += seconds
+            self.latencies[endpoint].append(seconds)
+            self.finished[endpoint].append(time.monotonic())
+
+    def record_batch(self, size: int, seconds: float) -> None:
+        """
+        Учитывает пакет добавленных текстов.
+
+        Args:
+            size (int): Количество текстов в пакете.
+            seconds (float): Время добавления пакета в секундах.
+        """
+        with self.lock:
+            self.batches += 1
+            self.batch_documents += size
+            self.batch_seconds += seconds
+            self.max_batch_size = max(self.max_batch_size, size)
+
+    def as_dict(self, recent_seconds: float = 60.0) -> dict:
+        """
+        Возвращает метрики в виде словаря, пригодного для сериализации в JSON.
+
+        Args:
+            recent_seconds (float): Интервал для расчета текущей пропускной способности.
+
+        Returns:
+            dict: Время работы, метрики по видам запросов (количество, ошибки,
+                запросы в секунду за все время и за последние recent_seconds секунд,
+                средняя задержка и ее перцентили) и статистика пакетов добавления.
+        """
+        with self.lock:
+            now = time.monotonic()
+            uptime = now - self.started
+            endpoints = {}
+            for endpoint, count in self.requests.items():
+                recent = sum(1 for finished in self.finished[endpoint] if now - finished <= recent_seconds)
+                endpoints[endpoint] = {
+                    "requests": count,
+                    "errors": self.errors[endpoint],
+                    "requests_per_second": count / uptime if uptime else 0.0,
+                    "recent_requests_per_second": recent / min(recent_seconds, uptime) if uptime else 0.0,
+                    "mean_seconds": self.total_seconds[endpoint] / count,
+                    "max_seconds": max(self.latencies[endpoint]),
+                    **{f"{name}_seconds": value for name, value in get_percentiles(self.latencies[endpoint]).items()},
+                }
+            return {
+                "uptime_seconds": uptime,
+                "endpoints": endpoints,
+                "batches": {
+                    "count": self.batches,
+                    "documents": self.batch_documents,
+                    "mean_size": self.batch_documents / self.batches if self.batches else 0.0,
+                    "max_size": self.max_batch_size,
+                    "mean_seconds": self.batch_seconds / self.batches if self.batches else 0.0,
+                },
+            }
+
+
+class CheckServiceClass:
+    """
+    Общая для всех запросов база с пулом потоков проверки и потоком,
+    добавляющим тексты пакетами.
+
+    Проверки выполняются в пуле из workers потоков, каждая - на собственной
+    поверхностной копии AntiPlagiarismClass: образец и статистика проверки у
+    копий свои, а база, корпус, индексы и кэши общие. Запросы на добавление
+    текстов копятся в очереди; поток записи забирает из нее пакет до batch_size
+    текстов, ожидая не дольше batch_delay секунд, канонизирует его параллельно
+    с проверками и добавляет в базу в одной транзакции, на это время
+    приостанавливая проверки.
+    """
+
+    def __init__(self, data_directory: str = ".", workers: int = 4, batch_size: int = 100,
+                 batch_delay: float = 0.05) -> None:
+        """
+        Инициализация класса CheckServiceClass. Загружает базу, индексы и
+        морфологический анализатор и запускает поток записи.
+
+        Args:
+            data_directory (str): Каталог с файлами базы и индекса.
+            workers (int): Количество потоков проверки.
+            batch_size (int): Максимальное количество текстов в пакете добавления.
+            batch_delay (float): Максимальное время ожидания текстов для пакета в секундах.
+        """
+        self.antiplagiarism = AntiPlagiarismClass(data_directory)
+        self.antiplagiarism.enable_instrumentation()
+        self.antiplagiarism.warm_up()
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.lock = ReadWriteLockClass()
+        self.metrics = ServerMetricsClass()
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix="CheckWorker")
+        self.pending_checks = 0
+        self.pending_checks_lock = threading.Lock()
+        self.additions = queue.Queue()
+        self.writer = threading.Thread(target=self._write_batches, name="BatchWriter", daemon=True)
+        self.writer.start()
+
+    def check(self, request: dict) -> dict:
+        """
+        Проверяет текст в пуле потоков проверки.
+
+        Args:
+            request (dict): Запрос с полями text и необязательными id, method,
+                min_uniqueness, similar_only и matches (см. AntiPlagiarismCLI.check_text()).
+
+        Returns:
+            dict: Результат проверки.
+        """
+        text = request.get("text")
+        if not isinstance(text, str):
+            raise ValueError("field 'text' must be a string")
+        method = request.get("method", "index")
+        if method not in CHECK_METHODS:
+            raise ValueError(f"unknown method {method!r}, expected one of: {', '.join(CHECK_METHODS)}")
+        with self.pending_checks_lock:
+            self.pending_checks += 1
+        return self.executor.submit(
+            self._check, str(request.get("id", "")), text, method, request.get("min_uniqueness"),
+            bool(request.get("similar_only", False) and method in SEARCH_METHODS),
+            int(request.get("matches", 10))).result()
+
+    def _check(self, submission_id: str, text: str, method: str, min_uniqueness: float, similar_only: bool,
+               matches: int) -> dict:
+        with self.pending_checks_lock:
+            self.pending_checks -= 1
+        self._build_cache(method)
+        self.lock.acquire_read()
+        try:
+            return check_text(copy.copy(self.antiplagiarism), submission_id, text, method, min_uniqueness,
+                              similar_only, matches)
+        finally:
+            self.lock.release_read()
+
+    def _build_cache(self, method: str) -> None:
+        """
+        Строит кэш базы, нужный методу проверки, под блокировкой записи. Копии базы
+        в потоках проверки получают уже построенный кэш и только читают его, а
+        добавление текстов дополняет его под той же блокировкой.
+
+        Args:
+            method (str): Суффикс метода search_plagiarism_*.
+        """
+        if method not in CACHE_BUILDERS:
+            return
+        attribute, builder = CACHE_BUILDERS[method]
+        if getattr(self.antiplagiarism, attribute) is not None:
+            return
+        self.lock.acquire_write()
+        try:
+            getattr(self.antiplagiarism, builder)()
+        finally:
+            self.lock.release_write()
+
+    def add_documents(self, texts: list) -> list:
+        """
+        Ставит тексты в очередь на добавление и ждет добавления пакета, в который они попали.
+
+        Args:
+            texts (list): Тексты для добавления в базу.
+
+        Returns:
+            list: Идентификаторы добавленных текстов (или таких же текстов, уже имеющихся в базе).
+        """
+        if not texts or not all(isinstance(text, str) for text in texts):
+            raise ValueError("field 'texts' must be a non-empty list of strings")
+        future = Future()
+        self.additions.put((texts, future))
+        return future.result()
+
+    def _write_batches(self) -> None:
+        """Забирает из очереди пакеты текстов и добавляет их в базу."""
+        while True:
+            requests = [self.additions.get()]
+            size = len(requests[0][0])
+            deadline = time.monotonic() + self.batch_delay
+            while size < self.batch_size:
+                try:
+                    request = self.additions.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                requests.append(request)
+                size += len(request[0])
+            started = time.perf_counter()
+            try:
+                canonized = self.antiplagiarism.canonize_texts([text for texts, _ in requests for text in texts])
+                self.lock.acquire_write()
+                try:
+                    names = self.antiplagiarism.add_canonized_texts(canonized)
+                finally:
+                    self.lock.release_write()
+            except Exception as error:
+                for _, future in requests:
+                    future.set_exception(error)
+                continue
+            self.metrics.record_batch(size, time.perf_counter() - started)
+            position = 0
+            for texts, future in requests:
+                future.set_result(names[position:position + len(texts)])
+                position += len(texts)
+
+    def get_metrics(self) -> dict:
+        """
+        Returns:
+            dict: Метрики запросов и пакетов, длины очередей и размер базы.
+        """
+        metrics = self.metrics.as_dict()
+        metrics["queues"] = {"checks": self.pending_checks, "additions": self.additions.qsize()}
+        metrics["documents"] = self.antiplagiarism.size_dict
+        return metrics
+
+    def close(self) -> None:
+        """Дожидается завершения начатых проверок и останавливает пул."""
+        self.executor.shutdown()
+
+
+class CheckRequestHandler(BaseHTTPRequestHandler):
+    """
+    Обработчик HTTP-запросов к CheckServiceClass (атрибут service сервера).
+    """
+
+    server_version = "AntiPlagiarism/1.0"
+
+    def _send_json(self, status: int, body: dict) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        if length > MAX_REQUEST_BYTES:
+            raise OverflowError(f"request body exceeds {MAX_REQUEST_BYTES} bytes")
+        body = json.loads(self.rfile.read(length) or b'{}')
+        if not isinstance(body, dict):
+            raise ValueError("request body must be a JSON object")
+        return body
+
+    def _handle(self, endpoint: str, handler) -> None:
+        started = time.perf_counter()
+        status = 200
+        try:
+            body = handler()
+        except OverflowError as error:
+            status, body = 413, {"error": str(error)}
+        except (ValueError, TypeError) as error:
+            status, body = 400, {"error": f"{type(error).__name__}: {error}"}
+        except Exception as error:
+            status, body = 500, {"error": f"{type(error).__name__}: {error}"}
+        try:
+            self._send_json(status, body)
+        finally:
+            self.server.service.metrics.record(endpoint, time.perf_counter() - started, status != 200)
+
+    def do_GET(self) -> None:
+        service = self.server.service
+        if self.path == "/metrics":
+            self._send_json(200, service.get_metrics())
+        elif self.path == "/health":
+            self._send_json(200, {"status": "ok", "documents": service.antiplagiarism.size_dict})
+        else:
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self) -> None:
+        service = self.server.service
+        if self.path == "/check":
+            self._handle("check", lambda: service.check(self._read_json()))
+        elif self.path == "/documents":
+            def add_documents():
+                request = self._read_json()
+                texts = [request["text"]] if "text" in request else request.get("texts")
+                return {"names": service.add_documents(texts)}
+            self._handle("documents", add_documents)
+        else:
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def create_server(service: CheckServiceClass, port: int = 8765, verbose: bool = False) -> ThreadingHTTPServer:
+    """
+    Создает HTTP-сервер сервиса проверки на 127.0.0.1.
+
+    Args:
+        service (CheckServiceClass): Сервис проверки.
+        port (int): Порт (0 - любой свободный).
+        verbose (bool): Выводить строку журнала на каждый запрос.
+
+    Returns:
+        ThreadingHTTPServer: Сервер; адрес - в атрибуте server_address.
+    """
+    server = ThreadingHTTPServer((HOST, port), CheckRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.verbose = verbose
+    return server
+
+
+def _post_json(url: str, body: dict, timeout: float) -> dict:
+    request = urllib.request.Request(url, json.dumps(body, ensure_ascii=False).encode('utf-8'),
+                                     {"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def run_load_test(base_url: str, texts: list, requests_count: int = 200, concurrency: int = 8,
+                  add_ratio: float = 0.0, method: str = "index", seed: int = 1, timeout: float = 300.0) -> dict:
+    """
+    Нагружает сервис параллельными запросами и замеряет задержки на стороне клиента.
+
+    Args:
+        base_url (str): Адрес сервиса, например http://127.0.0.1:8765.
+        texts (list): Тексты запросов; используются по кругу.
+        requests_count (int): Общее количество запросов.
+        concurrency (int): Количество одновременных клиентов.
+        add_ratio (float): Доля запросов на добавление текста вместо проверки.
+        method (str): Метод проверки.
+        seed (int): Начальное значение генератора, выбирающего вид запроса.
+        timeout (float): Тайм-аут одного запроса в секундах.
+
+    Returns:
+        dict: Параметры, время, запросы в секунду, перцентили задержки и ошибки по
+            видам запросов, а также метрики сервиса после теста.
+    """
+    rng = random.Random(seed)
+    plan = [("documents" if rng.random() < add_ratio else "check", texts[index % len(texts)])
+            for index in range(requests_count)]
+    next_request = iter(enumerate(plan))
+    plan_lock = threading.Lock()
+    latencies = collections.defaultdict(list)
+    errors = collections.Counter()
+
+    def client() -> None:
+        while True:
+            with plan_lock:
+                index, (endpoint, text) = next(next_request, (None, (None, None)))
+            if index is None:
+                return
+            body = {"text": text, "method": method} if endpoint == "check" else {"text": text}
+            if endpoint == "check":
+                body["id"] = str(index)
+            started = time.perf_counter()
+            failed = False
+            try:
+                _post_json(f"{base_url}/{endpoint}", body, timeout)
+            except (OSError, ValueError):
+                failed = True
+            with plan_lock:
+                errors[endpoint] += failed
+                latencies[endpoint].append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    clients = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    with urllib.request.urlopen(f"{base_url}/metrics", timeout=timeout) as response:
+        server_metrics = json.loads(response.read())
+    return {
+        "requests": requests_count,
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "requests_per_second": requests_count / elapsed,
+        "endpoints": {endpoint: {"requests": len(values), "errors": errors[endpoint],
+                                 "mean_seconds": sum(values) / len(values), "max_seconds": max(values),
+                                 **{f"{name}_seconds": value for name, value in get_percentiles(values).items()}}
+                      for endpoint, values in latencies.items()},
+        "server": server_metrics,
+    }
+
+
+def run_serve(args) -> int:
+    service = CheckServiceClass(args.data_directory, args.workers, args.batch_size, args.batch_delay)
+    server = create_server(service, args.port, args.verbose)
+    print(f"Serving {service.antiplagiarism.size_dict} documents on http://{HOST}:{server.server_address[1]}",
+          file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+    return 0
+
+
+def run_load_test_command(args) -> int:
+    texts = [text if text is not None else read_txt(path) for _, text, path in iter_submissions(args.source)]
+    if not texts:
+        print("No submissions found.", file=sys.stderr)
+        return 1
+    report = run_load_test(f"http://{HOST}:{args.port}", texts, args.requests, args.concurrency,
+                           args.add_ratio, args.method, args.seed)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 1 if any(endpoint["errors"] for endpoint in report["endpoints"].values()) else 0
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Local anti-plagiarism check service.")
+    parser.add_argument("--data-directory", default=".", help="directory with the database and index files")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser(
+        "serve", help=f"serve checks and additions over HTTP on {HOST}",
+        description="The database, indexes and morphological analyzer are loaded once and shared by all requests.")
+    serve_parser.add_argument("--port", type=int, default=8765, help="port to listen on (default: 8765)")
+    serve_parser.add_argument("--workers", type=int, default=4, help="check worker threads (default: 4)")
+    serve_parser.add_argument("--batch-size", type=int, default=100, help="maximum documents per addition batch")
+    serve_parser.add_argument("--batch-delay", type=float, default=0.05,
+                              help="seconds to wait for more documents before adding a batch")
+    serve_parser.add_argument("--verbose", action="store_true", help="log every request to stderr")
+    serve_parser.set_defaults(handler=run_serve)
+
+    load_test_parser = subparsers.add_parser(
+        "loadtest", help="send concurrent requests to a running service and report latency and throughput")
+    load_test_parser.add_argument("source", help="directory of .txt files or JSON Lines file with id and text (or path)")
+    load_test_parser.add_argument("--port", type=int, default=8765, help="service port (default: 8765)")
+    load_test_parser.add_argument("--requests", type=int, default=200, help="total number of requests")
+    load_test_parser.add_argument("--concurrency", type=int, default=8, help="concurrent clients")
+    load_test_parser.add_argument("--add-ratio", type=float, default=0.0,
+                                  help="fraction of requests that add the text instead of checking it")
+    load_test_parser.add_argument("--method", choices=CHECK_METHODS, default="index", help="check method")
+    load_test_parser.add_argument("--seed", type=int, default=1, help="seed for choosing request kinds")
+    load_test_parser.set_defaults(handler=run_load_test_command)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
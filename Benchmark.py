@@ -0,0 +1,309 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+"""
+Набор воспроизводимых замеров производительности канонизации и поиска плагиата.
+
+Пример запуска:
+    python Benchmark.py --corpus-sizes 20 100 --pattern-lengths 100 500 --output results.json
+    python Benchmark.py --baseline results.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from AntiPlagiarism import AntiPlagiarismClass
+from TextCanonization import CanonicalTextClass, LEMMA_CACHE_SIZE, set_lemma_cache_size
+
+
+NOUNS = (
+    "студент студенты работа работы программа программы алгоритм алгоритмы строка строки текст тексты "
+    "база базы данные поиск поиска преподаватель преподаватели кафедра кафедры университет задача задачи "
+    "решение решения метод методы система системы модель модели результат результаты исследование "
+    "исследования вычисление вычисления структура структуры память памяти процессор процессоры файл "
+    "файлы документ документы страница страницы книга книги статья статьи автор авторы вопрос вопросы"
+).split()
+VERBS = (
+    "пишет писали проверяет проверяли ищет искали находит нашли строит построили хранит хранили "
+    "сравнивает сравнивали читает прочитали использует использовали получает получили описывает "
+    "описали анализирует анализировали обрабатывает обработали"
+).split()
+ADJECTIVES = (
+    "быстрый быстрые новый новые большой большие сложный сложные простой простые точный точные "
+    "современный современные эффективный эффективные линейный линейные"
+).split()
+STOP_WORDS = "и в на по для с из что как это при где когда также или но".split()
+
+
+def generate_text(rng: random.Random, words_count: int) -> str:
+    """
+    Генерирует синтетический русский текст из предложений по 6-14 слов.
+
+    Args:
+        rng (random.Random): Генератор случайных чисел.
+        words_count (int): Количество слов.
+
+    Returns:
+        str: Текст.
+    """
+    sentences = []
+    while words_count > 0:
+        length = min(words_count, rng.randint(6, 14))
+        words = [rng.choice(rng.choice((NOUNS, NOUNS, VERBS, ADJECTIVES, STOP_WORDS))) for _ in range(length)]
+        sentences.append(words[0].capitalize() + " " + " ".join(words[1:]) + rng.choice(".,!?;"))
+        words_count -= length
+    return " ".join(sentences)
+
+
+def generate_corpus(corpus_size: int, words_per_text: int, seed: int) -> list:
+    """
+    Генерирует синтетический корпус.
+
+    Args:
+        corpus_size (int): Количество текстов.
+        words_per_text (int): Количество слов в тексте.
+        seed (int): Начальное значение генератора.
+
+    Returns:
+        list: Тексты корпуса.
+    """
+    rng = random.Random(seed)
+    return [generate_text(rng, words_per_text) for _ in range(corpus_size)]
+
+
+def load_fixture(path: str) -> list:
+    """
+    Загружает корпус из локального файла JSON формата database.json
+    или из каталога с файлами .txt.
+
+    Args:
+        path (str): Путь к файлу JSON или каталогу.
+
+    Returns:
+        list: Тексты корпуса.
+    """
+    if os.path.isdir(path):
+        texts = []
+        for file_name in sorted(os.listdir(path)):
+            if file_name.endswith(".txt"):
+                with open(os.path.join(path, file_name), 'r', encoding='utf-8') as file:
+                    texts.append(file.read())
+        return texts
+    with open(path, 'r', encoding='utf-8') as file:
+        return list(json.load(file).values())
+
+
+def make_pattern(corpus: list, pattern_length: int, seed: int) -> str:
+    """
+    Составляет образец: половина слов заимствована из текстов корпуса, половина - новый текст.
+
+    Args:
+        corpus (list): Тексты корпуса.
+        pattern_length (int): Количество слов образца.
+        seed (int): Начальное значение генератора.
+
+    Returns:
+        str: Образец.
+    """
+    rng = random.Random(seed)
+    copied = []
+    while len(copied) < pattern_length // 2:
+        words = rng.choice(corpus).split()
+        start = rng.randrange(max(len(words) - 20, 1))
+        copied.extend(words[start:start + 20])
+    return " ".join(copied[:pattern_length // 2]) + " " + generate_text(rng, pattern_length - pattern_length // 2)
+
+
+def measure(function, repeat: int, trace_memory: bool = True) -> dict:
+    """
+    Замеряет время выполнения функции и пиковый объем выделенной памяти.
+
+    Время замеряется repeat раз без трассировки памяти, пиковая память -
+    отдельным запуском под tracemalloc, который заметно замедляет
+    алгоритмы с посимвольным циклом на Python.
+
+    Args:
+        function (Callable): Замеряемая функция без аргументов.
+        repeat (int): Количество замеров времени.
+        trace_memory (bool): Замерять пиковую память.
+
+    Returns:
+        dict: Минимальное и медианное время в секундах и пиковая память в байтах
+            (None, если память не замерялась).
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    peak = None
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            function()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {"seconds": min(timings), "median_seconds": statistics.median(timings), "peak_memory_bytes": peak}
+
+
+def get_search_methods() -> list:
+    """
+    Возвращает суффиксы методов search_plagiarism_*, не требующих аргументов.
+
+    Returns:
+        list: Суффиксы методов.
+    """
+    return [name[len("search_plagiarism_"):] for name in dir(AntiPlagiarismClass)
+            if name.startswith("search_plagiarism_") and name not in
+            ("search_plagiarism_parallel", "search_plagiarism_lsh")]
+
+
+def run_benchmarks(corpus: list, corpus_sizes: list, pattern_lengths: list, shingle_sizes: list,
+                   methods: list, repeat: int, seed: int, trace_memory: bool = True) -> list:
+    """
+    Выполняет замеры по сетке размеров корпуса, длин образца и размеров шингла.
+
+    Args:
+        corpus (list): Тексты корпуса (используются первые corpus_size текстов).
+        corpus_sizes (list): Размеры корпуса.
+        pattern_lengths (list): Длины образца в словах.
+        shingle_sizes (list): Размеры шингла в словах.
+        methods (list): Суффиксы методов search_plagiarism_*.
+        repeat (int): Количество замеров времени.
+        seed (int): Начальное значение генератора образцов.
+        trace_memory (bool): Замерять пиковую память.
+
+    Returns:
+        list: Результаты замеров.
+    """
+    results = []
+    for pattern_length in pattern_lengths:
+        pattern = make_pattern(corpus, pattern_length, seed)
+        for shingle_size in shingle_sizes:
+            def canonize():
+                set_lemma_cache_size(LEMMA_CACHE_SIZE)
+                return CanonicalTextClass(pattern, shingle_size).make_canonical()
+
+            canonical_object = CanonicalTextClass(canonize(), shingle_size)
+            shingles_count = len(canonical_object.create_shingles())
+            parameters = {"corpus_size": None, "pattern_length": pattern_length, "shingle_size": shingle_size}
+            result = measure(canonize, repeat, trace_memory)
+            result.update(stage="make_canonical", method=None, chars_per_second=len(pattern) / result["seconds"],
+                          **parameters)
+            results.append(result)
+            result = measure(canonical_object.create_shingles, repeat, trace_memory)
+            result.update(stage="create_shingles", method=None,
+                          shingles_per_second=shingles_count / result["seconds"], **parameters)
+            results.append(result)
+    for corpus_size in corpus_sizes:
+        for shingle_size in shingle_sizes:
+            with tempfile.TemporaryDirectory() as data_directory:
+                antiplagiarism_class = type("BenchmarkAntiPlagiarismClass", (AntiPlagiarismClass,),
+                                            {"SHINGLE_SIZE": shingle_size})(data_directory)
+                for text in corpus[:corpus_size]:
+                    antiplagiarism_class.update_database_text(text)
+                corpus_chars = sum(len(text) for text in antiplagiarism_class.canonical_text)
+                for pattern_length in pattern_lengths:
+                    antiplagiarism_class.set_pattern(make_pattern(corpus[:corpus_size], pattern_length, seed))
+                    shingles_count = len(antiplagiarism_class.canonical_pattern_object.create_shingles())
+                    for method in methods:
+                        result = measure(getattr(antiplagiarism_class, f"search_plagiarism_{method}"), repeat, trace_memory)
+                        result.update(stage="search", method=method, corpus_size=corpus_size,
+                                      pattern_length=pattern_length, shingle_size=shingle_size,
+                                      chars_per_second=corpus_chars / result["seconds"],
+                                      shingles_per_second=shingles_count / result["seconds"])
+                        results.append(result)
+                        print(f"{method:>10} corpus={corpus_size} pattern={pattern_length} "
+                              f"shingle={shingle_size}: {result['seconds']:.4f} s", file=sys.stderr)
+                del antiplagiarism_class
+    return results
+
+
+def _result_key(result: dict) -> tuple:
+    return (result["stage"], result["method"], result["corpus_size"], result["pattern_length"],
+            result["shingle_size"])
+
+
+def compare_with_baseline(results: list, baseline: list, tolerance: float, min_seconds: float = 0.001) -> list:
+    """
+    Сравнивает результаты с сохраненными ранее и отбирает регрессии.
+
+    Args:
+        results (list): Текущие результаты.
+        baseline (list): Результаты базового запуска.
+        tolerance (float): Допустимое относительное замедление (0.2 - на 20%).
+        min_seconds (float): Замеры, занявшие в базовом запуске меньше этого времени,
+            не сравниваются из-за большой погрешности.
+
+    Returns:
+        list: Регрессии: параметры замера, базовое и текущее время и их отношение.
+    """
+    baseline_seconds = {_result_key(result): result["seconds"] for result in baseline}
+    regressions = []
+    for result in results:
+        previous = baseline_seconds.get(_result_key(result))
+        if previous and previous >= min_seconds and result["seconds"] > previous * (1 + tolerance):
+            regressions.append({"stage": result["stage"], "method": result["method"],
+                                "corpus_size": result["corpus_size"], "pattern_length": result["pattern_length"],
+                                "shingle_size": result["shingle_size"], "baseline_seconds": previous,
+                                "seconds": result["seconds"], "ratio": result["seconds"] / previous})
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks for text canonization and plagiarism search.")
+    parser.add_argument("--fixture", help="database.json-like file or directory of .txt files to use as corpus")
+    parser.add_argument("--corpus-sizes", type=int, nargs="+", default=[20, 100])
+    parser.add_argument("--words-per-text", type=int, default=300)
+    parser.add_argument("--pattern-lengths", type=int, nargs="+", default=[100, 500])
+    parser.add_argument("--shingle-sizes", type=int, nargs="+", default=[3])
+    parser.add_argument("--methods", nargs="+", default=None,
+                        help="search_plagiarism_* suffixes (default: all that take no arguments)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-memory", action="store_true", help="skip peak memory measurement under tracemalloc")
+    parser.add_argument("--output", help="write results JSON to this file instead of stdout")
+    parser.add_argument("--baseline", help="results JSON of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown relative to the baseline")
+    parser.add_argument("--min-seconds", type=float, default=0.001,
+                        help="ignore baseline timings shorter than this when comparing")
+    args = parser.parse_args()
+
+    if args.fixture:
+        corpus = load_fixture(args.fixture)
+    else:
+        corpus = generate_corpus(max(args.corpus_sizes), args.words_per_text, args.seed)
+    methods = args.methods or get_search_methods()
+    results = run_benchmarks(corpus, args.corpus_sizes, args.pattern_lengths, args.shingle_sizes,
+                             methods, args.repeat, args.seed, not args.no_memory)
+    report = {
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "parameters": {"fixture": args.fixture, "words_per_text": args.words_per_text,
+                       "repeat": args.repeat, "seed": args.seed},
+        "results": results,
+    }
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            report["regressions"] = compare_with_baseline(results, json.load(file)["results"], args.tolerance,
+                                                           args.min_seconds)
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output)
+    else:
+        print(output)
+    for regression in report.get("regressions", []):
+        print(f"REGRESSION {regression['stage']} {regression['method']} corpus={regression['corpus_size']} "
+              f"pattern={regression['pattern_length']} shingle={regression['shingle_size']}: "
+              f"{regression['baseline_seconds']:.4f} s -> {regression['seconds']:.4f} s", file=sys.stderr)
+    return 1 if report.get("regressions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import hashlib
+import sqlite3
+import threading
+from array import array
+from TextCanonization import get_canonicalization_settings
+
+
+class CanonicalCacheClass:
+    """
+    Постоянный кэш результатов канонизации в файле SQLite.
+
+    Ключ записи - хеш исходного текста (см. ReadWriteDatabase.get_content_hash()),
+    объединенный со строкой настроек канонизации, поэтому при смене правил,
+    стоп-слов или размера шингла старые записи не используются. Запись хранит
+    канонический текст и отпечатки его шинглов. Суммарный размер записей
+    ограничен max_bytes; при превышении удаляются записи, к которым дольше
+    всего не обращались. Чтение записи ничего не пишет в файл: время обращения
+    запоминается в памяти и записывается пакетом при добавлении записи или
+    после TOUCH_BATCH_SIZE обращений (см. flush()).
+    """
+
+    TOUCH_BATCH_SIZE = 256
+
+    def __init__(self, cache_path: str = "canonicalcache.sqlite", shingle_size: int = 3,
+                 max_bytes: int = 256 << 20) -> None:
+        """
+        Инициализация класса CanonicalCacheClass.
+
+        Параметры:
+        - cache_path (str): Путь к файлу кэша.
+        - shingle_size (int): Размер шингла в словах (по умолчанию 3).
+        - max_bytes (int): Предельный суммарный размер канонических текстов и отпечатков в байтах.
+        """
+        self.cache_path = cache_path
+        self.max_bytes = max_bytes
+        self.settings = get_canonicalization_settings(shingle_size).encode('utf-8')
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.touched = {}
+        self.connection = sqlite3.connect(cache_path, check_same_thread=False)
+        # Потеря последних записей кэша при сбое безопасна, поэтому запись не синхронизируется с диском.
+        self.connection.execute("PRAGMA synchronous = OFF")
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key BLOB PRIMARY KEY, "
+                "canonical_text TEXT NOT NULL, "
+                "fingerprints BLOB NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "last_used INTEGER NOT NULL)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+        self.total_bytes, self.clock = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0), COALESCE(MAX(last_used), 0) FROM entries").fetchone()
+
+    def _key(self, content_hash: str) -> bytes:
+        return hashlib.blake2b(self.settings + b'\0' + content_hash.encode('ascii'), digest_size=16).digest()
+
+    def get(self, content_hash: str) -> tuple:
+        """
+        Возвращает сохраненный результат канонизации текста.
+
+        Параметры:
+        - content_hash (str): Хеш исходного текста.
+
+        Возвращает:
+        - tuple: Канонический текст и отпечатки шинглов (array('Q')) или None, если записи нет.
+        """
+        key = self._key(content_hash)
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT canonical_text, fingerprints FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.clock += 1
+            self.touched[key] = self.clock
+            if len(self.touched) >= self.TOUCH_BATCH_SIZE:
+                with self.connection:
+                    self._write_touched()
+        fingerprints = array('Q')
+        fingerprints.frombytes(row[1])
+        return row[0], fingerprints
+
+    def put(self, content_hash: str, canonical_text: str, fingerprints) -> None:
+        """
+        Сохраняет результат канонизации текста и вытесняет давно не использованные
+        записи, если суммарный размер превысил предел.
+
+        Параметры:
+        - content_hash (str): Хеш исходного текста.
+        - canonical_text (str): Канонический текст.
+        - fingerprints (Iterable[int]): Отпечатки шинглов канонического текста.
+        """
+        fingerprints = array('Q', fingerprints).tobytes()
+        size = len(canonical_text.encode('utf-8')) + len(fingerprints)
+        if size > self.max_bytes:
+            return
+        key = self._key(content_hash)
+        with self.lock, self.connection:
+            self._write_touched()
+            row = self.connection.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self.total_bytes -= row[0]
+            self.clock += 1
+            self.connection.execute(
+                "INSERT OR REPLACE INTO entries (key, canonical_text, fingerprints, size, last_used) "
+                "VALUES (?, ?, ?, ?, ?)", (key, canonical_text, fingerprints, size, self.clock))
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                evicted_key, evicted_size = self.connection.execute(
+                    "SELECT key, size FROM entries ORDER BY last_used LIMIT 1").fetchone()
+                self.connection.execute("DELETE FROM entries WHERE key = ?", (evicted_key,))
+                self.total_bytes -= evicted_size
+
+    def flush(self) -> None:
+        """
+        Записывает в файл время обращения к записям, прочитанным после последней записи.
+        """
+        with self.lock, self.connection:
+            self._write_touched()
+
+    def _write_touched(self) -> None:
+        """Записывает запомненное время обращения к записям; вызывается под self.lock в транзакции."""
+        if self.touched:
+            self.connection.executemany(
+                "UPDATE entries SET last_used = ? WHERE key = ?",
+                [(last_used, key) for key, last_used in self.touched.items()])
+            self.touched.clear()
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
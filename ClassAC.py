@@ -0,0 +1,136 @@
+from array import array
+from collections import deque
+
+
+class AC_StringSearch:
+    """
+    Класс для одновременного поиска множества подстрок в тексте с использованием алгоритма Ахо-Корасик.
+
+    Автомат строится один раз по всем шаблонам и хранится в плоских массивах:
+    таблица переходов содержит по одной строке из alphabet_size элементов на состояние.
+    Поиск ведется по байтам UTF-8, поэтому текст можно передавать как bytes или memoryview
+    без декодирования; позиции вхождений отсчитываются в байтах (для канонических текстов,
+    состоящих из ASCII, они совпадают с позициями символов).
+    """
+
+    def __init__(self, patterns: list) -> None:
+        """
+        Инициализация класса AC_StringSearch.
+
+        Параметры:
+        - patterns (list): Шаблоны (подстроки), которые необходимо найти. Повторы игнорируются.
+        """
+        self.patterns = list(dict.fromkeys(pattern for pattern in patterns if pattern))
+        self.encoded_patterns = [pattern.encode('utf-8') for pattern in self.patterns]
+        self.alphabet, self.alphabet_size = self._build_alphabet()
+        self.transitions, self.outputs, children = self._build_trie()
+        self.matches, self.dictionary_links = self._build_automaton(children)
+
+    def _build_alphabet(self) -> tuple:
+        """
+        Сжимает алфавит шаблонов: каждому встречающемуся байту присваивается номер начиная с 1.
+        Номер 0 обозначает любой байт, отсутствующий в шаблонах.
+
+        Возвращает:
+        - tuple: Массив из 256 номеров, индексируемый значением байта, и размер сжатого алфавита.
+        """
+        alphabet = array('i', [0]) * 256
+        alphabet_size = 1
+        for pattern in self.encoded_patterns:
+            for byte in pattern:
+                if not alphabet[byte]:
+                    alphabet[byte] = alphabet_size
+                    alphabet_size += 1
+        return alphabet, alphabet_size
+
+    def _build_trie(self) -> tuple:
+        """
+        Строит бор шаблонов.
+
+        Возвращает:
+        - tuple: Таблица переходов бора, номера шаблонов, оканчивающихся в состояниях
+          (-1, если шаблон не оканчивается), и списки (символ, потомок) для каждого состояния.
+        """
+        zero_row = array('i', [0]) * self.alphabet_size
+        transitions = array('i', zero_row)
+        outputs = array('i', [-1])
+        children = [[]]
+        for pattern_index, pattern in enumerate(self.encoded_patterns):
+            state = 0
+            for byte in pattern:
+                code = self.alphabet[byte]
+                next_state = transitions[state * self.alphabet_size + code]
+                if next_state == 0:
+                    next_state = len(outputs)
+                    transitions[state * self.alphabet_size + code] = next_state
+                    transitions.extend(zero_row)
+                    outputs.append(-1)
+                    children[state].append((code, next_state))
+                    children.append([])
+                state = next_state
+            outputs[state] = pattern_index
+        return transitions, outputs, children
+
+    def _build_automaton(self, children: list) -> tuple:
+        """
+        Достраивает бор до полного автомата: обходом в ширину вычисляет суффиксные ссылки
+        и заполняет недостающие переходы переходами из состояния суффиксной ссылки.
+
+        Параметры:
+        - children (list): Списки (символ, потомок) для каждого состояния бора.
+
+        Возвращает:
+        - tuple: Массив состояний, в которых есть совпадение (0, если нет), и массив словарных
+          ссылок на ближайшее конечное состояние по цепочке суффиксных ссылок (0, если нет).
+        """
+        size = self.alphabet_size
+        failures = array('i', [0]) * len(self.outputs)
+        matches = array('i', [0]) * len(self.outputs)
+        dictionary_links = array('i', [0]) * len(self.outputs)
+        queue = deque(child for _, child in children[0])
+        while queue:
+            state = queue.popleft()
+            failure = failures[state]
+            if self.outputs[state] != -1:
+                matches[state] = state
+            else:
+                matches[state] = dictionary_links[state]
+            base = state * size
+            self.transitions[base:base + size] = self.transitions[failure * size:failure * size + size]
+            for code, child in children[state]:
+                self.transitions[base + code] = child
+                child_failure = self.transitions[failure * size + code]
+                failures[child] = child_failure
+                dictionary_links[child] = (child_failure if self.outputs[child_failure] != -1
+                                           else dictionary_links[child_failure])
+                queue.append(child)
+        return matches, dictionary_links
+
+    def get_substring_ac(self, text) -> dict:
+        """
+        Находит все вхождения всех шаблонов в тексте за один проход с использованием алгоритма Ахо-Корасик.
+
+        Параметры:
+        - text (str | bytes | memoryview): Текст, в котором ищутся подстроки.
+
+        Возвращает:
+        - dict: Словарь шаблон -> список индексов начала его вхождений в текст.
+          Шаблоны без вхождений в словарь не попадают.
+        """
+        if isinstance(text, str):
+            text = text.encode('utf-8')
+        result = {}
+        transitions = self.transitions
+        alphabet = self.alphabet
+        size = self.alphabet_size
+        matches = self.matches
+        state = 0
+        for i, byte in enumerate(text):
+            state = transitions[state * size + alphabet[byte]]
+            match = matches[state]
+            while match:
+                pattern_index = self.outputs[match]
+                result.setdefault(self.patterns[pattern_index], []).append(
+                    i - len(self.encoded_patterns[pattern_index]) + 1)
+                match = self.dictionary_links[match]
+        return result
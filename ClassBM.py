@@ -1,7 +1,14 @@
+from array import array
+
+
 class BM_StringSearch:
     """
     Класс для поиска подстроки в тексте с использованием алгоритма Бойера-Мура.
 
+    Таблицы эвристик строятся один раз при создании объекта, поэтому один объект
+    можно использовать для поиска шаблона во многих текстах. Атрибут found
+    становится True после первого поиска, нашедшего вхождение, а атрибут
+    shift_count считает сдвиги шаблона во всех поисках.
     """
 
     def __init__(self, pattern, array_size: int = 128) -> None:
@@ -16,41 +23,43 @@ class BM_StringSearch:
         self.array_size = array_size
         self.symbol_indexes = self._bad_character_heuristic()
         self.shifts = self._good_suffix_heuristic()
+        self.found = False
+        self.shift_count = 0
 
-    def _bad_character_heuristic(self) -> list:
+    def _bad_character_heuristic(self) -> array:
         """
         Вычисляет эвристику плохого символа для алгоритма Бойера-Мура.
 
         Возвращает:
-        - list: Список индексов плохих символов.
+        - array: Массив индексов плохих символов.
         """
-        result = [-1] * self.array_size
+        result = array('i', [-1]) * self.array_size
 
         for i in range(len(self.pattern)):
             result[ord(self.pattern[i]) % self.array_size] = i
 
         return result
 
-    def _good_suffix_heuristic(self) -> list:
+    def _good_suffix_heuristic(self) -> array:
         """
         Вычисляет эвристику хорошего суффикса для алгоритма Бойера-Мура.
 
         Возвращает:
-        - list: Список сдвигов для хороших суффиксов.
+        - array: Массив сдвигов для хороших суффиксов.
         """
-        shifts = [0] * (len(self.pattern) + 1)
-        border_positions = [0] * (len(self.pattern) + 1)
+        shifts = array('i', [0]) * (len(self.pattern) + 1)
+        border_positions = array('i', [0]) * (len(self.pattern) + 1)
         self._find_shifts_and_borders(shifts, border_positions)
         self._set_shifts_for_prefix(shifts, border_positions)
         return shifts
 
-    def _find_shifts_and_borders(self, shifts: list, border_positions: list) -> None:
+    def _find_shifts_and_borders(self, shifts: array, border_positions: array) -> None:
         """
         Вычисляет сдвиги и позиции границ для эвристики хорошего суффикса.
 
         Параметры:
-        - shifts (list): Список для хранения сдвигов.
-        - border_positions (list): Список для хранения позиций границ.
+        - shifts (array): Массив для хранения сдвигов.
+        - border_positions (array): Массив для хранения позиций границ.
         """
         i = len(self.pattern)
         j = len(self.pattern) + 1
@@ -64,13 +73,13 @@ class BM_StringSearch:
             j -= 1
             border_positions[i] = j
 
-    def _set_shifts_for_prefix(self, shifts: list, border_positions: list) -> None:
+    def _set_shifts_for_prefix(self, shifts: array, border_positions: array) -> None:
         """
         Устанавливает сдвиги для префиксов в эвристике хорошего суффикса.
 
         Параметры:
-        - shifts (list): Список для хранения сдвигов.
-        - border_positions (list): Список для хранения позиций границ.
+        - shifts (array): Массив для хранения сдвигов.
+        - border_positions (array): Массив для хранения позиций границ.
         """
         prefix_border = border_positions[0]
         for i in range(len(self.pattern) + 1):
@@ -92,9 +101,11 @@ class BM_StringSearch:
         """
         result = []
         shift = 0
+        shift_count = 0
 
         while shift <= (len(text) - len(self.pattern)):
             current_index = len(self.pattern) - 1
+            shift_count += 1
 
             while current_index >= 0 and self.pattern[current_index] == text[shift + current_index]:
                 current_index -= 1
@@ -110,6 +121,9 @@ class BM_StringSearch:
                     text[shift + current_index]) % self.array_size] if shift + current_index < len(text) else -1
                 shift += max(1, current_index - indent)
 
+        self.shift_count += shift_count
+        if result:
+            self.found = True
         return result
 
     def get_substring_bm_good_suffix(self, text: str) -> list:
@@ -125,9 +139,11 @@ class BM_StringSearch:
         """
         result = []
         shift = 0
+        shift_count = 0
 
         while shift <= (len(text) - len(self.pattern)):
             current_index = len(self.pattern) - 1
+            shift_count += 1
 
             while current_index >= 0 and self.pattern[current_index] == text[shift + current_index]:
                 current_index -= 1
@@ -138,4 +154,7 @@ class BM_StringSearch:
             else:
                 shift += self.shifts[current_index + 1]
 
+        self.shift_count += shift_count
+        if result:
+            self.found = True
         return result
\ No newline at end of file
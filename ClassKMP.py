@@ -1,7 +1,13 @@
+from array import array
+
+
 class KMP_StringSearch:
     """
     Класс для поиска подстроки в тексте с использованием алгоритма Кнута-Морриса-Пратта (KMP).
 
+    Массив граней строится один раз при создании объекта, поэтому один объект
+    можно использовать для поиска шаблона во многих текстах. Атрибут found
+    становится True после первого поиска, нашедшего вхождение.
     """
 
     def __init__(self, pattern: str) -> None:
@@ -13,15 +19,16 @@ class KMP_StringSearch:
         """
         self.pattern = pattern
         self.borders = self._find_borders()
+        self.found = False
 
-    def _find_borders(self) -> list:
+    def _find_borders(self) -> array:
         """
         Вычисляет массив граней (borders) для алгоритма KMP.
 
         Возвращает:
-        - list: Массив граней для заданного шаблона.
+        - array: Массив граней для заданного шаблона.
         """
-        borders = [0] * len(self.pattern)
+        borders = array('i', [0]) * len(self.pattern)
         current_index = 0
         for i in range(1, len(self.pattern)):
             while current_index > 0 and self.pattern[current_index] != self.pattern[i]:
@@ -51,4 +58,6 @@ class KMP_StringSearch:
             if compare_index == len(self.pattern):
                 result.append(i - compare_index + 1)
                 compare_index = self.borders[len(self.pattern) - 1]
+        if result:
+            self.found = True
         return result
\ No newline at end of file
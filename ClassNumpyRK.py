@@ -0,0 +1,117 @@
+import numpy as np
+
+
+class NumpyRK_StringSearch:
+    """
+    Класс для одновременного поиска множества подстрок в тексте с использованием
+    векторизованного алгоритма Рабина-Карпа на NumPy.
+
+    Текст преобразуется в массив uint8 без копирования, хеши окон длины самого
+    короткого шаблона вычисляются через префиксные суммы по модулю 2^64 блоками по
+    BLOCK_SIZE окон (соседние блоки перекрываются на длину окна без одного байта),
+    поэтому дополнительная память не зависит от длины текста. Совпадения с хешами
+    префиксов шаблонов находятся двоичным поиском по отсортированному массиву хешей.
+    Только найденные кандидаты сравниваются с текстом; атрибут collisions считает
+    настоящие совпадения хешей - кандидатов, чей префикс длины окна отличается
+    от окна текста. Позиции вхождений отсчитываются в байтах UTF-8.
+    """
+
+    BLOCK_SIZE = 1 << 20
+
+    def __init__(self, patterns: list, alphabet_size: int = 0x9E3779B97F4A7C15) -> None:
+        """
+        Инициализация класса NumpyRK_StringSearch.
+
+        Параметры:
+        - patterns (list): Шаблоны (подстроки), которые необходимо найти. Повторы игнорируются.
+        - alphabet_size (int): Нечетное основание хеша (по умолчанию 0x9E3779B97F4A7C15).
+        """
+        self.patterns = list(dict.fromkeys(pattern for pattern in patterns if pattern))
+        self.alphabet_size = alphabet_size
+        self.inverse_alphabet_size = pow(alphabet_size, -1, 1 << 64)
+        self.powers = np.ones(1, dtype=np.uint64)
+        self.inverse_powers = np.ones(1, dtype=np.uint64)
+        self.window = min((len(pattern.encode('utf-8')) for pattern in self.patterns), default=0)
+        self.hashes, self.candidates = self._hash_patterns()
+        self.collisions = 0
+
+    def _ensure_powers(self, length: int) -> None:
+        """
+        Дополняет таблицы степеней основания и обратного к нему элемента до длины length.
+        Таблицы растут не дальше длины блока с перекрытием, если большего не требуется.
+
+        Параметры:
+        - length (int): Необходимая длина таблиц.
+        """
+        if len(self.powers) >= length:
+            return
+        length = max(length, min(2 * len(self.powers), self.BLOCK_SIZE + self.window))
+        self.powers = np.cumprod(np.concatenate(
+            (np.ones(1, dtype=np.uint64), np.full(length - 1, self.alphabet_size, dtype=np.uint64))), dtype=np.uint64)
+        self.inverse_powers = np.cumprod(np.concatenate(
+            (np.ones(1, dtype=np.uint64), np.full(length - 1, self.inverse_alphabet_size, dtype=np.uint64))), dtype=np.uint64)
+
+    def _prefix_hashes(self, codes: np.ndarray) -> np.ndarray:
+        """
+        Вычисляет префиксные суммы codes[k] * B^k по модулю 2^64.
+
+        Параметры:
+        - codes (np.ndarray): Байты текста.
+
+        Возвращает:
+        - np.ndarray: Массив длины len(codes) + 1.
+        """
+        self._ensure_powers(len(codes) + 1)
+        prefix = np.zeros(len(codes) + 1, dtype=np.uint64)
+        np.cumsum(codes * self.powers[:len(codes)], dtype=np.uint64, out=prefix[1:])
+        return prefix
+
+    def _hash_patterns(self) -> tuple:
+        """
+        Вычисляет хеши префиксов шаблонов длины окна.
+
+        Возвращает:
+        - tuple: Отсортированный массив хешей и список списков троек (шаблон, шаблон в UTF-8,
+          префикс длины окна) для каждого хеша.
+        """
+        buckets = {}
+        for pattern in self.patterns:
+            encoded_pattern = pattern.encode('utf-8')
+            prefix = encoded_pattern[:self.window]
+            prefix_hashes = self._prefix_hashes(np.frombuffer(prefix, dtype=np.uint8))
+            buckets.setdefault(int(prefix_hashes[-1]), []).append((pattern, encoded_pattern, prefix))
+        hashes = sorted(buckets)
+        return np.array(hashes, dtype=np.uint64), [buckets[pattern_hash] for pattern_hash in hashes]
+
+    def get_substring_np(self, text) -> dict:
+        """
+        Находит все вхождения всех шаблонов в тексте.
+
+        Параметры:
+        - text (str | bytes | memoryview): Текст, в котором ищутся подстроки.
+
+        Возвращает:
+        - dict: Словарь шаблон -> список индексов начала его вхождений в текст.
+          Шаблоны без вхождений в словарь не попадают.
+        """
+        if isinstance(text, str):
+            text = text.encode('utf-8')
+        result = {}
+        codes = np.frombuffer(text, dtype=np.uint8)
+        windows_count = len(codes) - self.window + 1
+        if not self.patterns or windows_count <= 0:
+            return result
+        for block_start in range(0, windows_count, self.BLOCK_SIZE):
+            block_windows = min(self.BLOCK_SIZE, windows_count - block_start)
+            prefix = self._prefix_hashes(codes[block_start:block_start + block_windows + self.window - 1])
+            windows = (prefix[self.window:] - prefix[:block_windows]) * self.inverse_powers[:block_windows]
+            slots = np.minimum(np.searchsorted(self.hashes, windows), len(self.hashes) - 1)
+            positions = np.flatnonzero(self.hashes[slots] == windows)
+            for position, slot in zip((positions + block_start).tolist(), slots[positions].tolist()):
+                text_window = text[position:position + self.window]
+                for pattern, encoded_pattern, prefix in self.candidates[slot]:
+                    if prefix != text_window:
+                        self.collisions += 1
+                    elif text[position:position + len(encoded_pattern)] == encoded_pattern:
+                        result.setdefault(pattern, []).append(position)
+        return result
@@ -2,16 +2,43 @@ class RK_StringSearch:
     """
     Класс для поиска подстроки в тексте с использованием алгоритма Рабина-Карпа.
 
+    Хеш шаблона вычисляется один раз при создании объекта, поэтому один объект
+    можно использовать для поиска шаблона во многих текстах. Атрибут found
+    становится True после первого поиска, нашедшего вхождение, а атрибут
+    collisions считает совпадения хешей, не подтвердившиеся сравнением.
     """
 
-    def __init__(self, pattern: str) -> None:
+    def __init__(self, pattern: str, alphabet_size: int = 256, mod: int = 9973) -> None:
         """
         Инициализация класса RK_StringSearch.
 
         Параметры:
         - pattern (str): Шаблон (подстрока), которую необходимо найти.
+        - alphabet_size (int): Основание хеша (по умолчанию 256).
+        - mod (int): Модуль хеша (по умолчанию 9973).
         """
         self.pattern = pattern
+        self.alphabet_size = alphabet_size
+        self.mod = mod
+        self.pattern_hash = self._hash(pattern)
+        self.first_index_hash = pow(alphabet_size, len(pattern) - 1, mod) if pattern else 0
+        self.found = False
+        self.collisions = 0
+
+    def _hash(self, text: str) -> int:
+        """
+        Вычисляет полиномиальный хеш строки.
+
+        Параметры:
+        - text (str): Строка.
+
+        Возвращает:
+        - int: Хеш строки.
+        """
+        text_hash = 0
+        for char in text:
+            text_hash = (text_hash * self.alphabet_size + ord(char)) % self.mod
+        return text_hash
 
     def get_substring_rk(self, text: str) -> list:
         """
@@ -24,25 +51,27 @@ class RK_StringSearch:
         - list: Список индексов начала вхождений подстроки в текст.
         """
         result = []
-        alphabet_size = 256
-        mod = 9973
-        pattern_hash = ord(self.pattern[0]) % mod
-        text_hash = ord(text[0]) % mod
-        first_index_hash = 1
-        for i in range(1, len(self.pattern)):
-            pattern_hash = (pattern_hash * alphabet_size +
-                            ord(self.pattern[i])) % mod
-            text_hash = (text_hash * alphabet_size + ord(text[i])) % mod
-            first_index_hash = (first_index_hash * alphabet_size) % mod
+        if not self.pattern or len(text) < len(self.pattern):
+            return result
+        alphabet_size = self.alphabet_size
+        mod = self.mod
+        pattern_hash = self.pattern_hash
+        first_index_hash = self.first_index_hash
+        text_hash = self._hash(text[:len(self.pattern)])
         for i in range(len(text) - len(self.pattern) + 1):
-            if pattern_hash == text_hash and self._compare_text(text, i):
-                result.append(i)
+            if pattern_hash == text_hash:
+                if self._compare_text(text, i):
+                    result.append(i)
+                else:
+                    self.collisions += 1
             if i == len(text) - len(self.pattern):
                 break
             text_hash = (
                 text_hash - (ord(text[i]) * first_index_hash) % mod + mod) % mod
             text_hash = (text_hash * alphabet_size +
                          ord(text[i + len(self.pattern)])) % mod
+        if result:
+            self.found = True
         return result
 
     def _compare_text(self, text: str, index: int) -> bool:
@@ -59,4 +88,102 @@ class RK_StringSearch:
         for i in range(len(self.pattern)):
             if self.pattern[i] != text[index + i]:
                 return False
-        return True
\ No newline at end of file
+        return True
+
+
+class RK_MultiStringSearch:
+    """
+    Класс для одновременного поиска множества подстрок в тексте с использованием алгоритма Рабина-Карпа.
+
+    Хеши шаблонов вычисляются один раз. По тексту скользит одно окно длины самого короткого
+    шаблона, хеш окна проверяется по словарю хешей префиксов шаблонов, и только при попадании
+    кандидаты сравниваются с текстом. Модуль 2^61 - 1 делает случайные совпадения хешей редкими.
+    Поиск ведется по байтам UTF-8, поэтому текст можно передавать как bytes или memoryview;
+    позиции вхождений отсчитываются в байтах. Атрибут collisions считает настоящие
+    совпадения хешей: кандидатов, чей префикс длины окна отличается от окна текста.
+    Кандидат с совпавшим префиксом, но другим продолжением коллизией не считается.
+    """
+
+    def __init__(self, patterns: list, alphabet_size: int = 1000003, mod: int = (1 << 61) - 1) -> None:
+        """
+        Инициализация класса RK_MultiStringSearch.
+
+        Параметры:
+        - patterns (list): Шаблоны (подстроки), которые необходимо найти. Повторы игнорируются.
+        - alphabet_size (int): Основание полиномиального хеша (по умолчанию 1000003).
+        - mod (int): Модуль хеша (по умолчанию 2^61 - 1).
+        """
+        self.patterns = list(dict.fromkeys(pattern for pattern in patterns if pattern))
+        self.encoded_patterns = [pattern.encode('utf-8') for pattern in self.patterns]
+        self.alphabet_size = alphabet_size
+        self.mod = mod
+        self.window = min((len(pattern) for pattern in self.encoded_patterns), default=0)
+        self.fingerprints = self._hash_patterns()
+        self.collisions = 0
+
+    def _hash(self, text: bytes) -> int:
+        """
+        Вычисляет полиномиальный хеш строки байтов.
+
+        Параметры:
+        - text (bytes): Строка байтов.
+
+        Возвращает:
+        - int: Хеш строки.
+        """
+        text_hash = 0
+        for byte in text:
+            text_hash = (text_hash * self.alphabet_size + byte) % self.mod
+        return text_hash
+
+    def _hash_patterns(self) -> dict:
+        """
+        Вычисляет хеши префиксов шаблонов длины окна.
+
+        Возвращает:
+        - dict: Словарь хеш -> список троек (шаблон, шаблон в UTF-8, префикс длины окна)
+          с таким хешем префикса.
+        """
+        fingerprints = {}
+        for pattern, encoded_pattern in zip(self.patterns, self.encoded_patterns):
+            prefix = encoded_pattern[:self.window]
+            fingerprints.setdefault(self._hash(prefix), []).append((pattern, encoded_pattern, prefix))
+        return fingerprints
+
+    def get_substring_rk(self, text) -> dict:
+        """
+        Находит все вхождения всех шаблонов в тексте за один проход скользящего хеша.
+
+        Параметры:
+        - text (str | bytes | memoryview): Текст, в котором ищутся подстроки.
+
+        Возвращает:
+        - dict: Словарь шаблон -> список индексов начала его вхождений в текст.
+          Шаблоны без вхождений в словарь не попадают.
+        """
+        if isinstance(text, str):
+            text = text.encode('utf-8')
+        result = {}
+        window = self.window
+        if not self.patterns or len(text) < window:
+            return result
+        alphabet_size = self.alphabet_size
+        mod = self.mod
+        fingerprints = self.fingerprints
+        first_index_hash = pow(alphabet_size, window - 1, mod)
+        text_hash = self._hash(text[:window])
+        last_index = len(text) - window
+        for i in range(last_index + 1):
+            candidates = fingerprints.get(text_hash)
+            if candidates:
+                text_window = text[i:i + window]
+                for pattern, encoded_pattern, prefix in candidates:
+                    if prefix != text_window:
+                        self.collisions += 1
+                    elif text[i:i + len(encoded_pattern)] == encoded_pattern:
+                        result.setdefault(pattern, []).append(i)
+            if i == last_index:
+                break
+            text_hash = ((text_hash - text[i] * first_index_hash) * alphabet_size +
+                         text[i + window]) % mod
+        return result
@@ -0,0 +1,233 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import contextlib
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+
+
+class StatsClass:
+    """
+    Статистика одной проверки: время этапов и счетчики.
+
+    Для каждого этапа суммируются астрономическое время и процессорное время
+    процесса; счетчики - произвольные именованные целые числа.
+    """
+
+    enabled = True
+
+    def __init__(self) -> None:
+        """
+        Инициализация класса StatsClass.
+        """
+        self.timers = {}
+        self.counters = {}
+        self.peak_memory_bytes = None
+        self.profile = None
+
+    @contextlib.contextmanager
+    def timer(self, stage: str):
+        """
+        Замеряет время выполнения блока и прибавляет его к времени этапа.
+
+        Параметры:
+        - stage (str): Название этапа.
+        """
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            timer = self.timers.setdefault(stage, [0.0, 0.0])
+            timer[0] += time.perf_counter() - wall_start
+            timer[1] += time.process_time() - cpu_start
+
+    def count(self, name: str, value: int = 1) -> None:
+        """
+        Увеличивает счетчик.
+
+        Параметры:
+        - name (str): Название счетчика.
+        - value (int): Величина увеличения.
+        """
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def merge(self, other) -> None:
+        """
+        Прибавляет к статистике время этапов и счетчики другой статистики.
+
+        Параметры:
+        - other (StatsClass | NullStatsClass): Другая статистика.
+        """
+        for stage, (wall, cpu) in other.timers.items():
+            timer = self.timers.setdefault(stage, [0.0, 0.0])
+            timer[0] += wall
+            timer[1] += cpu
+        for name, value in other.counters.items():
+            self.count(name, value)
+
+    @contextlib.contextmanager
+    def capture(self, profile: bool = False, trace_memory: bool = False, profile_limit: int = 30):
+        """
+        Профилирует блок через cProfile и (или) замеряет пиковую память через tracemalloc.
+
+        Параметры:
+        - profile (bool): Сохранить в атрибут profile отчет cProfile.
+        - trace_memory (bool): Сохранить в атрибут peak_memory_bytes пиковый объем выделенной памяти.
+        - profile_limit (int): Количество функций в отчете cProfile.
+        """
+        profiler = cProfile.Profile() if profile else None
+        started_tracing = trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if trace_memory:
+            tracemalloc.reset_peak()
+        if profiler:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler:
+                profiler.disable()
+                report = io.StringIO()
+                pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(profile_limit)
+                self.profile = report.getvalue()
+            if trace_memory:
+                self.peak_memory_bytes = tracemalloc.get_traced_memory()[1]
+            if started_tracing:
+                tracemalloc.stop()
+
+    def as_dict(self) -> dict:
+        """
+        Возвращает статистику в виде словаря, пригодного для сериализации в JSON.
+
+        Возвращает:
+        - dict: Время этапов (wall_seconds, cpu_seconds), счетчики, пиковая память и отчет профилировщика.
+        """
+        return {
+            "timers": {stage: {"wall_seconds": wall, "cpu_seconds": cpu} for stage, (wall, cpu) in self.timers.items()},
+            "counters": dict(self.counters),
+            "peak_memory_bytes": self.peak_memory_bytes,
+            "profile": self.profile,
+        }
+
+
+class NullStatsClass:
+    """
+    Пустая статистика для выключенного сбора: все операции ничего не делают.
+    """
+
+    enabled = False
+    timers = {}
+    counters = {}
+
+    def timer(self, stage: str):
+        return _NULL_CONTEXT
+
+    def count(self, name: str, value: int = 1) -> None:
+        pass
+
+    def merge(self, other) -> None:
+        pass
+
+    def as_dict(self) -> dict:
+        return {}
+
+
+_NULL_CONTEXT = contextlib.nullcontext()
+NULL_STATS = NullStatsClass()
+
+
+class SearchCancelled(Exception):
+    """
+    Проверка остановлена установкой события отмены.
+    """
+
+
+class ProgressClass:
+    """
+    Ход одной проверки: количество выполненных и всех единиц работы (пар
+    шингл-текст, просмотренных текстов или отпечатков) и ее отмена.
+
+    Этапы проверки увеличивают общий объем работы методом add_total и
+    отмечают выполненную работу методом advance, который проверяет событие
+    отмены и не чаще раза в interval секунд сообщает о ходе работы.
+    """
+
+    enabled = True
+
+    def __init__(self, callback=None, cancel_event=None, interval: float = 0.1) -> None:
+        """
+        Инициализация класса ProgressClass.
+
+        Параметры:
+        - callback (Callable[[int, int], None]): Функция, получающая количество
+          выполненных и всех единиц работы.
+        - cancel_event (threading.Event): Событие, установка которого отменяет проверку.
+        - interval (float): Минимальный интервал между вызовами callback в секундах.
+        """
+        self.callback = callback
+        self.cancel_event = cancel_event
+        self.interval = interval
+        self.done = 0
+        self.total = 0
+        self.last_report = 0.0
+
+    def add_total(self, count: int) -> None:
+        """
+        Увеличивает общий объем работы.
+
+        Параметры:
+        - count (int): Количество новых единиц работы.
+        """
+        self.total += count
+
+    def advance(self, count: int = 1) -> None:
+        """
+        Отмечает выполненную работу.
+
+        Параметры:
+        - count (int): Количество выполненных единиц работы.
+
+        Исключения:
+        - SearchCancelled: Если установлено событие отмены.
+        """
+        self.done += count
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise SearchCancelled()
+        if self.callback is not None:
+            now = time.monotonic()
+            if now - self.last_report >= self.interval:
+                self.last_report = now
+                self.callback(self.done, self.total)
+
+    def finish(self) -> None:
+        """
+        Сообщает о завершении проверки: работа, пропущенная досрочной
+        остановкой, считается выполненной.
+        """
+        self.done = self.total
+        if self.callback is not None:
+            self.callback(self.done, self.total)
+
+
+class NullProgressClass:
+    """
+    Пустой ход проверки без отслеживания и отмены: все операции ничего не делают.
+    """
+
+    enabled = False
+
+    def add_total(self, count: int) -> None:
+        pass
+
+    def advance(self, count: int = 1) -> None:
+        pass
+
+    def finish(self) -> None:
+        pass
+
+
+NULL_PROGRESS = NullProgressClass()
@@ -1,12 +1,29 @@
+import queue
+import time
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from AntiPlagiarism import AntiPlagiarismClass
-from threading import Thread
+from AntiPlagiarism import AntiPlagiarismClass, SEARCH_METHODS
+from Instrumentation import SearchCancelled
+from multiprocessing import freeze_support
+from threading import Thread, Event
 
 
 class AntiPlagiarismApp(tk.Tk):
     """Графическое приложение для функционала по борьбе с плагиатом"""
 
+    SEARCH_METHOD_NAMES = {
+        "Knuth-Morris-Pratt algorithm": "KMP",
+        "Rabin-Karp algorithm": "RK",
+        "Bad Boyer-Moore algorithm": "BM_bad",
+        "Good Boyer-Moore algorithm": "BM_good",
+        "Aho-Corasick algorithm": "AC",
+        "Multi-pattern Rabin-Karp algorithm": "RK_multi",
+        "Vectorized Rabin-Karp algorithm (NumPy)": "RK_numpy",
+        "Word shingles": "words",
+        "Shingle index": "index",
+        "Suffix automaton": "SAM",
+    }
+
     def __init__(self):
         """Инициализация AntiPlagiarismApp"""
         super().__init__()
@@ -14,12 +31,12 @@ class AntiPlagiarismApp(tk.Tk):
         screen_width = self.winfo_screenwidth()
         screen_height = self.winfo_screenheight()
         window_width = 350
-        window_height = 225
+        window_height = 275
         self.x_position = (screen_width - window_width) // 2
         self.y_position = (screen_height - window_height) // 2
         self.geometry(
             f"{window_width}x{window_height}+{self.x_position}+{self.y_position}")
-        self.title("Anti-Plagiarism Application")
+        self.title("Anti-Plagiarism Application (loading...)")
         self.antiplagiarism_class = AntiPlagiarismClass()
         self.pattern_button = ttk.Button(
             self, text="Set Pattern", command=self.show_pattern_window)
@@ -27,17 +44,45 @@ class AntiPlagiarismApp(tk.Tk):
             self, text="Update Database Text", command=self.show_text_window)
         self.txt_file_button = ttk.Button(
             self, text="Update Database from TXT", command=self.update_database_from_txt)
+        self.directory_button = ttk.Button(
+            self, text="Update Database from Folder", command=self.update_database_from_directory)
         self.search_button = ttk.Button(
             self, text="Search Plagiarism", command=self.show_search_window)
         self.pattern_button.grid(row=0, column=0, padx=50, pady=10)
         self.text_button.grid(row=1, column=0, padx=50, pady=10)
         self.txt_file_button.grid(row=2, column=0, padx=50, pady=10)
-        self.search_button.grid(row=3, column=0, pady=10)
+        self.directory_button.grid(row=3, column=0, padx=50, pady=10)
+        self.search_button.grid(row=4, column=0, pady=10)
         self.columnconfigure(0, weight=1)
         self.rowconfigure(0, weight=1)
         self.rowconfigure(1, weight=1)
         self.rowconfigure(2, weight=1)
         self.rowconfigure(3, weight=1)
+        self.rowconfigure(4, weight=1)
+        self.after_idle(self.start_warm_up)
+
+    def set_database_buttons_state(self, state):
+        """Включает или отключает кнопки, изменяющие базу.
+
+        Args:
+            state (str): Состояние кнопок: "normal" или "disabled".
+        """
+        for button in (self.text_button, self.txt_file_button, self.directory_button):
+            button.config(state=state)
+
+    def start_warm_up(self):
+        """Запускает фоновую загрузку индексов и морфологического анализатора после появления окна."""
+        self.antiplagiarism_class.start_warm_up()
+        self.poll_warm_up()
+
+    def poll_warm_up(self):
+        """Убирает из заголовка окна отметку о загрузке, когда фоновая загрузка завершится."""
+        if not self.antiplagiarism_class.ready.is_set():
+            self.after(200, self.poll_warm_up)
+            return
+        self.title("Anti-Plagiarism Application")
+        if self.antiplagiarism_class.warm_up_error is not None:
+            self.show_warning(self, f"Background loading failed: {self.antiplagiarism_class.warm_up_error}")
 
     def show_pattern_window(self):
         """Отображает окно для установки паттерна."""
@@ -94,8 +139,12 @@ class AntiPlagiarismApp(tk.Tk):
             self.show_warning(
                 text_window, "Text was not updated because you did not enter anything..")
             return
-        self.antiplagiarism_class.update_database_text(new_text)
+        size = self.antiplagiarism_class.size_dict
+        name = self.antiplagiarism_class.update_database_text(new_text)
         text_window.destroy()
+        if self.antiplagiarism_class.size_dict == size:
+            self.show_message(text_window, f"This text is already in the database as {name}.")
+            return
         self.show_message(text_window, "Text updated successfully.")
 
     def update_database_from_txt(self):
@@ -103,70 +152,169 @@ class AntiPlagiarismApp(tk.Tk):
         file_path = filedialog.askopenfilename(
             title="Select TXT File", filetypes=[("TXT files", "*.txt")])
         if file_path:
-            self.antiplagiarism_class.update_database_from_txt(file_path)
+            size = self.antiplagiarism_class.size_dict
+            name = self.antiplagiarism_class.update_database_from_txt(file_path)
+            if self.antiplagiarism_class.size_dict == size:
+                self.show_message(self, f"This file is already in the database as {name}.")
+                return
             self.show_message(self, "Database updated from TXT successfully.")
 
+    def update_database_from_directory(self):
+        """Обновляет базу данных всеми файлами TXT из выбранной папки и ее подпапок."""
+        directory_path = filedialog.askdirectory(title="Select Folder with TXT Files")
+        if directory_path:
+            report = self.antiplagiarism_class.update_database_from_directory(directory_path)
+            message = f"Database updated from {report['added']} TXT files successfully."
+            if report["duplicates"]:
+                message += f" {len(report['duplicates'])} files were already in the database."
+            self.show_message(self, message)
+
     def show_search_window(self):
         """Отображает окно для поиска плагиата."""
         search_window = tk.Toplevel(self)
         search_window.title("Search Plagiarism")
-        search_window.geometry(f"300x200+{self.x_position}+{self.y_position}")
+        search_window.geometry(f"300x250+{self.x_position}+{self.y_position}")
         search_window.lift()
-        search_methods = ["Knuth-Morris-Pratt algorithm", "Rabin-Karp algorithm",
-                          "Bad Boyer-Moore algorithm", "Good Boyer-Moore algorithm"]
+        search_methods = list(self.SEARCH_METHOD_NAMES)
         selected_method = tk.StringVar()
         selected_method.set(search_methods[0])
         method_menu = ttk.Combobox(
             search_window, textvariable=selected_method, values=search_methods, state="readonly")
-        method_menu.pack(pady=30)
+        method_menu.pack(pady=(30, 10))
         method_menu.config(font=("Arial", 10))
+        parallel = tk.BooleanVar()
+        parallel_check = ttk.Checkbutton(
+            search_window, text="Parallel search", variable=parallel)
+        parallel_check.pack(pady=10)
+        similar_only = tk.BooleanVar()
+        similar_only_check = ttk.Checkbutton(
+            search_window, text="Similar texts only (MinHash)", variable=similar_only)
+        similar_only_check.pack(pady=10)
         search_button = ttk.Button(
-            search_window, text="Search", command=lambda: self.search_plagiarism(selected_method.get(), search_window))
-        search_button.pack(pady=30)
-
+            search_window, text="Search", command=lambda: self.search_plagiarism(selected_method.get(), search_window, parallel.get(), similar_only.get()))
+        search_button.pack(pady=10)
 
-    def search_plagiarism(self, method, search_window):
+    def search_plagiarism(self, method, search_window, parallel=False, similar_only=False):
         """Инициирует поиск плагиата.
 
+        Поиск выполняется в отдельном потоке, который передает ход проверки
+        и результат через очередь; окно опрашивает очередь из главного потока
+        методом after(), поэтому виджеты изменяются только в главном потоке.
+
         Args:
             method (str): Выбранный метод поиска.
             search_window (tk.Toplevel): Верхнее окно для поиска плагиата.
+            parallel (bool): Выполнять поиск в пуле процессов.
+            similar_only (bool): Искать только в текстах, отобранных по MinHash-сигнатурам.
         """
         progress_window = tk.Toplevel(search_window)
         progress_window.title("Searching Plagiarism...")
         progress_window.geometry(
-            f"300x100+{self.x_position}+{self.y_position}")
+            f"300x150+{self.x_position}+{self.y_position}")
         progress_window.lift()
         progress_bar = ttk.Progressbar(
-            progress_window, length=150, mode="determinate")
-        progress_bar.pack(pady=30)
-        progress_bar.start()
-        search_window.update_idletasks()
+            progress_window, length=250, mode="determinate")
+        progress_bar.pack(pady=(20, 5))
+        status_label = ttk.Label(progress_window, text="Preparing...")
+        status_label.pack(pady=5)
+        events = queue.Queue()
+        cancel_event = Event()
+        cancel_button = ttk.Button(
+            progress_window, text="Cancel", command=lambda: self.cancel_search(cancel_event, status_label))
+        cancel_button.pack(pady=5)
+        progress_window.protocol("WM_DELETE_WINDOW", lambda: self.cancel_search(cancel_event, status_label))
         search_thread = Thread(
-            target=self.perform_search, args=(method, progress_bar, search_window))
+            target=self.perform_search, args=(method, events, cancel_event, parallel, similar_only), daemon=True)
+        # База не изменяется, пока поток поиска читает ее.
+        self.set_database_buttons_state("disabled")
         search_thread.start()
+        self.poll_search(method, events, cancel_event, progress_bar, status_label, search_window, time.monotonic())
 
-    def perform_search(self, method, progress_bar, search_window):
-        """Выполняет поиск плагиата.
+    @staticmethod
+    def cancel_search(cancel_event, status_label):
+        """Запрашивает отмену поиска.
+
+        Args:
+            cancel_event (threading.Event): Событие отмены поиска.
+            status_label (ttk.Label): Надпись с ходом поиска.
+        """
+        cancel_event.set()
+        status_label.config(text="Cancelling...")
+
+    def poll_search(self, method, events, cancel_event, progress_bar, status_label, search_window, started):
+        """Обрабатывает сообщения потока поиска и планирует следующий опрос очереди.
 
         Args:
             method (str): Выбранный метод поиска.
+            events (queue.Queue): Очередь сообщений потока поиска.
+            cancel_event (threading.Event): Событие отмены поиска.
             progress_bar (ttk.Progressbar): Прогресс-бар, указывающий на ход поиска.
+            status_label (ttk.Label): Надпись с ходом поиска.
             search_window (tk.Toplevel): Верхнее окно для поиска плагиата.
+            started (float): Время начала поиска по time.monotonic().
+        """
+        while True:
+            try:
+                event, *values = events.get_nowait()
+            except queue.Empty:
+                break
+            if event == "progress":
+                done, total = values
+                if total and not cancel_event.is_set():
+                    elapsed = time.monotonic() - started
+                    remaining = elapsed / done * (total - done) if done else 0.0
+                    progress_bar.config(maximum=total, value=done)
+                    status_label.config(text=f"{done} / {total} processed, ~{remaining:.0f} s left")
+                continue
+            search_window.destroy()
+            self.set_database_buttons_state("normal")
+            if event == "result":
+                self.show_message(
+                    self, f"Percentage of Uniqueness ({method}): {values[0]:.2f}%")
+            elif event == "cancelled":
+                self.show_message(self, "Search cancelled.")
+            else:
+                self.show_warning(self, f"Search failed: {values[0]}")
+            return
+        self.after(50, self.poll_search, method, events, cancel_event, progress_bar, status_label, search_window,
+                   started)
+
+    def perform_search(self, method, events, cancel_event, parallel=False, similar_only=False):
+        """Выполняет поиск плагиата в потоке поиска.
+
+        Ход проверки и результат передаются в очередь events сообщениями
+        ("progress", выполнено, всего), ("result", процент уникальности),
+        ("cancelled",) или ("error", текст ошибки).
+
+        Args:
+            method (str): Выбранный метод поиска.
+            events (queue.Queue): Очередь сообщений для главного потока.
+            cancel_event (threading.Event): Событие отмены поиска.
+            parallel (bool): Выполнять поиск в пуле процессов. Для поиска по
+                индексу и по отпечаткам слов игнорируется.
+            similar_only (bool): Искать только в текстах, отобранных по
+                MinHash-сигнатурам. Имеет приоритет над parallel; для поиска
+                по индексу и по отпечаткам слов игнорируется.
         """
-        if method == "Rabin-Karp algorithm":
-            result, lst = self.antiplagiarism_class.search_plagiarism_RK()
-        elif method == "Knuth-Morris-Pratt algorithm":
-            result, lst = self.antiplagiarism_class.search_plagiarism_KMP()
-        elif method == "Bad Boyer-Moore algorithm":
-            result, lst = self.antiplagiarism_class.search_plagiarism_BM_bad()
-        elif method == "Good Boyer-Moore algorithm":
-            result, lst = self.antiplagiarism_class.search_plagiarism_BM_good()
-        progress_bar.stop()
-        progress_bar.destroy()
-        search_window.destroy()
-        self.show_message(
-            self, f"Percentage of Uniqueness ({method}): {result:.2f}%")
+        search_method = self.SEARCH_METHOD_NAMES[method]
+        monitor = {"progress": lambda done, total: events.put(("progress", done, total)),
+                   "cancel_event": cancel_event}
+        try:
+            if similar_only and search_method in SEARCH_METHODS:
+                result, lst = self.antiplagiarism_class.search_plagiarism_lsh(
+                    search_method, **monitor)
+            elif parallel and search_method in SEARCH_METHODS:
+                result, lst = self.antiplagiarism_class.search_plagiarism_parallel(
+                    search_method, **monitor)
+            else:
+                result, lst = getattr(
+                    self.antiplagiarism_class, f"search_plagiarism_{search_method}")(**monitor)
+        except SearchCancelled:
+            events.put(("cancelled",))
+        except Exception as error:
+            events.put(("error", str(error)))
+        else:
+            events.put(("result", result))
 
     @staticmethod
     def keypress(event):
@@ -244,5 +392,6 @@ class AntiPlagiarismApp(tk.Tk):
 
 
 if __name__ == "__main__":
+    freeze_support()
     app = AntiPlagiarismApp()
     app.mainloop()
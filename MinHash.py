@@ -0,0 +1,193 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import json
+import os
+from itertools import islice
+import numpy as np
+from TextCanonization import iter_text_fingerprints
+from ReadWriteDatabase import iter_json_lines
+
+
+class MinHashIndexClass:
+    """
+    Индекс MinHash-сигнатур документов с LSH-разбиением на полосы.
+
+    Сигнатура документа - минимумы num_permutations независимых хеш-функций
+    по отпечаткам его шинглов; доля совпадающих элементов двух сигнатур
+    оценивает коэффициент Жаккара множеств шинглов. Сигнатура делится на bands
+    полос, и документы с совпадающей полосой попадают в одну корзину, поэтому
+    кандидаты для образца находятся без просмотра всей базы.
+
+    Индекс хранится в файле формата JSON Lines: первая строка содержит
+    параметры индекса, каждая следующая - сигнатуру одного документа.
+    """
+
+    CHUNK_SIZE = 4096
+
+    def __init__(self, index_file_path: str = "minhash.jsonl", shingle_size: int = 3,
+                 num_permutations: int = 128, bands: int = 64, seed: int = 1) -> None:
+        """
+        Инициализация класса MinHashIndexClass.
+
+        Параметры:
+        - index_file_path (str): Путь к файлу индекса.
+        - shingle_size (int): Размер шингла в словах (по умолчанию 3).
+        - num_permutations (int): Длина сигнатуры (по умолчанию 128).
+        - bands (int): Количество полос LSH, делитель num_permutations (по умолчанию 64).
+          Чем больше полос, тем ниже порог сходства, с которого документ становится кандидатом.
+        - seed (int): Начальное значение генератора коэффициентов хеш-функций.
+        """
+        if num_permutations % bands:
+            raise ValueError("num_permutations must be divisible by bands")
+        self.index_file_path = index_file_path
+        self.shingle_size = shingle_size
+        self.num_permutations = num_permutations
+        self.bands = bands
+        self.rows = num_permutations // bands
+        self.seed = seed
+        generator = np.random.default_rng(seed)
+        self.multipliers = generator.integers(0, 1 << 63, num_permutations, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.increments = generator.integers(0, 1 << 63, num_permutations, dtype=np.uint64)
+        self.signatures = {}
+        self.buckets = [{} for _ in range(bands)]
+        self._load()
+
+    def _parameters(self) -> dict:
+        return {"shingle_size": self.shingle_size, "num_permutations": self.num_permutations,
+                "bands": self.bands, "seed": self.seed}
+
+    def _load(self) -> None:
+        """
+        Загружает индекс из файла. Если файл создан с другими параметрами,
+        он перезаписывается пустым индексом. Недописанная при сбое последняя
+        строка отрезается от файла (см. iter_json_lines()), и документ
+        индексируется заново при синхронизации.
+        """
+        if os.path.exists(self.index_file_path):
+            with open(self.index_file_path, 'rb+') as file:
+                records = iter_json_lines(file)
+                header = next(records, None)
+                if header is not None and header[1] == self._parameters():
+                    for _, record in records:
+                        self._add_signature(record["name"], np.array(record["signature"], dtype=np.uint64))
+                    return
+        with open(self.index_file_path, 'w', encoding='utf-8') as file:
+            file.write(json.dumps(self._parameters()) + "\n")
+
+    def compute_signature(self, fingerprints: list) -> np.ndarray:
+        """
+        Вычисляет MinHash-сигнатуру множества отпечатков шинглов.
+
+        Хеш-функции имеют вид (a * x + b) mod 2^64 со старшими 32 битами результата;
+        отпечатки обрабатываются блоками по CHUNK_SIZE, чтобы ограничить память.
+
+        Параметры:
+        - fingerprints (list): Отпечатки шинглов документа.
+
+        Возвращает:
+        - np.ndarray: Сигнатура длины num_permutations (uint64).
+        """
+        signature = np.full(self.num_permutations, np.iinfo(np.uint64).max, dtype=np.uint64)
+        values = np.unique(np.asarray(fingerprints, dtype=np.uint64))
+        for start in range(0, len(values), self.CHUNK_SIZE):
+            chunk = values[start:start + self.CHUNK_SIZE]
+            hashes = (self.multipliers[:, None] * chunk[None, :] + self.increments[:, None]) >> np.uint64(32)
+            np.minimum(signature, hashes.min(axis=1), out=signature)
+        return signature
+
+    def _band_keys(self, signature: np.ndarray) -> list:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def _add_signature(self, name: str, signature: np.ndarray) -> None:
+        """
+        Добавляет сигнатуру документа в индекс в памяти.
+
+        Параметры:
+        - name (str): Идентификатор документа.
+        - signature (np.ndarray): Сигнатура документа.
+        """
+        self.signatures[name] = signature
+        for buckets, key in zip(self.buckets, self._band_keys(signature)):
+            buckets.setdefault(key, []).append(name)
+
+    def add_document(self, name: str, canonical_text: str) -> None:
+        """
+        Вычисляет сигнатуру документа и дописывает ее в файл индекса.
+
+        Параметры:
+        - name (str): Идентификатор документа.
+        - canonical_text (str): Канонический текст документа.
+        """
+        self.add_document_chunks(name, (canonical_text,))
+
+    def add_document_chunks(self, name: str, canonical_chunks) -> None:
+        """
+        Вычисляет сигнатуру документа, поданного частями, и дописывает ее в файл индекса.
+        Отпечатки обрабатываются блоками, поэтому документ не собирается в памяти целиком.
+
+        Параметры:
+        - name (str): Идентификатор документа.
+        - canonical_chunks (Iterable[str]): Части канонического текста, разделенные по границам слов.
+        """
+        if name in self.signatures:
+            return
+        fingerprints = iter_text_fingerprints(canonical_chunks, self.shingle_size)
+        signature = self.compute_signature([])
+        batch = list(islice(fingerprints, self.CHUNK_SIZE * 16))
+        while batch:
+            np.minimum(signature, self.compute_signature(batch), out=signature)
+            batch = list(islice(fingerprints, self.CHUNK_SIZE * 16))
+        self._add_signature(name, signature)
+        with open(self.index_file_path, 'a', encoding='utf-8') as file:
+            file.write(json.dumps({"name": name, "signature": signature.tolist()}) + "\n")
+
+    def synchronize(self, canonical_texts) -> None:
+        """
+        Добавляет в индекс документы базы, которые еще не проиндексированы.
+
+        Параметры:
+        - canonical_texts (Iterable[tuple]): Пары (идентификатор, канонический текст).
+        """
+        for name, canonical_text in canonical_texts:
+            self.add_document(name, canonical_text)
+
+    def estimate_similarity(self, first: np.ndarray, second: np.ndarray) -> float:
+        """
+        Оценивает коэффициент Жаккара по двум сигнатурам.
+
+        Параметры:
+        - first (np.ndarray): Первая сигнатура.
+        - second (np.ndarray): Вторая сигнатура.
+
+        Возвращает:
+        - float: Доля совпадающих элементов сигнатур.
+        """
+        return int(np.count_nonzero(first == second)) / self.num_permutations
+
+    def query(self, fingerprints: list, threshold: float = 0.2) -> dict:
+        """
+        Находит документы, похожие на множество отпечатков шинглов.
+
+        Кандидатами считаются документы, у которых хотя бы одна полоса сигнатуры
+        совпадает с полосой сигнатуры образца; из них остаются те, чья оценка
+        коэффициента Жаккара не ниже threshold.
+
+        Параметры:
+        - fingerprints (list): Отпечатки шинглов образца.
+        - threshold (float): Минимальная оценка коэффициента Жаккара.
+
+        Возвращает:
+        - dict: Словарь идентификатор документа -> оценка коэффициента Жаккара.
+        """
+        if not len(fingerprints):
+            return {}
+        signature = self.compute_signature(fingerprints)
+        candidates = set()
+        for buckets, key in zip(self.buckets, self._band_keys(signature)):
+            candidates.update(buckets.get(key, ()))
+        result = {}
+        for name in candidates:
+            similarity = self.estimate_similarity(signature, self.signatures[name])
+            if similarity >= threshold:
+                result[name] = similarity
+        return result
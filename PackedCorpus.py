@@ -0,0 +1,209 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import contextlib
+import mmap
+import os
+from array import array
+
+
+class PackedCorpusClass:
+    """
+    Упакованный корпус канонических текстов, читаемый через mmap.
+
+    Тексты в кодировке UTF-8 записаны подряд в одном файле, а в отдельном файле
+    хранится таблица смещений их концов (array('Q')). Файл корпуса отображается
+    в память только для чтения, поэтому процессы, открывшие один и тот же корпус,
+    разделяют его страницы через кэш операционной системы.
+    """
+
+    def __init__(self, corpus_path: str = "canonicalcorpus.bin", offsets_path: str = "canonicalcorpus.idx",
+                 writable: bool = True) -> None:
+        """
+        Инициализация класса PackedCorpusClass.
+
+        Параметры:
+        - corpus_path (str): Путь к файлу с текстами.
+        - offsets_path (str): Путь к файлу таблицы смещений.
+        - writable (bool): Открыть корпус для записи. Только в этом режиме
+          недописанный после сбоя хвост файлов обрезается при открытии.
+        """
+        self.corpus_path = corpus_path
+        self.offsets_path = offsets_path
+        self.offsets = array('Q')
+        if os.path.exists(offsets_path):
+            with open(offsets_path, 'rb') as file:
+                data = file.read()
+            self.offsets.frombytes(data[:len(data) - len(data) % self.offsets.itemsize])
+        if writable:
+            self._truncate_tail()
+        self.mapping = self._map()
+
+    def _truncate_tail(self) -> None:
+        """
+        Обрезает данные, дописанные после последнего полностью записанного текста.
+        """
+        with open(self.offsets_path, 'ab') as file:
+            if file.tell() != len(self.offsets) * self.offsets.itemsize:
+                file.truncate(len(self.offsets) * self.offsets.itemsize)
+        end = self.offsets[-1] if self.offsets else 0
+        with open(self.corpus_path, 'ab') as file:
+            if file.tell() != end:
+                file.truncate(end)
+
+    def _map(self):
+        """
+        Отображает файл корпуса в память.
+
+        Возвращает:
+        - mmap.mmap | bytes: Отображение файла или пустая строка байтов для пустого корпуса.
+        """
+        if not self.offsets or not self.offsets[-1]:
+            return b''
+        with open(self.corpus_path, 'rb') as file:
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def prefetch(self) -> None:
+        """
+        Просит ОС заранее прочитать файл корпуса в кэш страниц, чтобы первая
+        проверка не ждала чтения с диска. На платформах без madvise ничего не делает.
+        """
+        mapping = self.mapping
+        if isinstance(mapping, mmap.mmap) and hasattr(mmap, "MADV_WILLNEED"):
+            try:
+                mapping.madvise(mmap.MADV_WILLNEED)
+            except ValueError:
+                # Отображение закрыто: корпус только что дописан или очищен в другом потоке.
+                pass
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def get_bytes(self, index: int) -> memoryview:
+        """
+        Возвращает текст корпуса без копирования.
+
+        Параметры:
+        - index (int): Номер текста.
+
+        Возвращает:
+        - memoryview: Срез отображения файла, содержащий текст в UTF-8.
+        """
+        start = self.offsets[index - 1] if index else 0
+        return memoryview(self.mapping)[start:self.offsets[index]]
+
+    def __getitem__(self, index: int) -> str:
+        """
+        Возвращает текст корпуса в виде строки.
+
+        Параметры:
+        - index (int): Номер текста.
+
+        Возвращает:
+        - str: Текст.
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("corpus index out of range")
+        return str(self.get_bytes(index), 'utf-8')
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def iter_bytes(self):
+        """
+        Перебирает тексты корпуса без копирования.
+
+        Возвращает:
+        - Iterator[memoryview]: Срезы отображения файла.
+        """
+        for index in range(len(self)):
+            yield self.get_bytes(index)
+
+    def iter_text_chunks(self, index: int, chunk_size: int = 1 << 20):
+        """
+        Перебирает текст корпуса частями примерно по chunk_size байтов,
+        разрезая его по пробелам.
+
+        Параметры:
+        - index (int): Номер текста.
+        - chunk_size (int): Размер части в байтах.
+
+        Возвращает:
+        - Iterator[str]: Части текста без разделяющих их пробелов.
+        """
+        data = self.get_bytes(index)
+        start = 0
+        while start < len(data):
+            stop = min(start + chunk_size, len(data))
+            if stop < len(data):
+                space = bytes(data[start:stop]).rfind(b' ')
+                if space > 0:
+                    stop = start + space
+                else:
+                    while stop < len(data) and data[stop] != 0x20:
+                        stop += 1
+            yield str(data[start:stop], 'utf-8')
+            start = stop + 1
+
+    def append(self, text: str) -> None:
+        """
+        Дописывает текст в конец корпуса.
+
+        Параметры:
+        - text (str): Канонический текст.
+        """
+        self.append_chunks((text,))
+
+    def append_chunks(self, chunks) -> None:
+        """
+        Дописывает в конец корпуса текст, поданный частями, склеивая непустые части через пробел.
+
+        Параметры:
+        - chunks (Iterable[str]): Части канонического текста.
+        """
+        with self.appending() as write:
+            for chunk in chunks:
+                write(chunk)
+
+    @contextlib.contextmanager
+    def appending(self):
+        """
+        Открывает корпус для дописывания одного текста частями.
+
+        Внутри блока with части передаются возвращенной функции и сразу
+        записываются в файл; текст добавляется в корпус при выходе из блока.
+        Если блок завершился исключением, записанные части удаляются.
+
+        Возвращает:
+        - Callable[[str], None]: Функция записи очередной части канонического текста.
+        """
+        separator = b''
+
+        def write(chunk: str) -> None:
+            nonlocal separator
+            if chunk:
+                file.write(separator + chunk.encode('utf-8'))
+                separator = b' '
+
+        with open(self.corpus_path, 'ab') as file:
+            start = file.tell()
+            try:
+                yield write
+            except BaseException:
+                file.truncate(start)
+                raise
+            self.offsets.append(file.tell())
+        with open(self.offsets_path, 'ab') as file:
+            file.write(self.offsets[-1:].tobytes())
+        self.mapping = self._map()
+
+    def clear(self) -> None:
+        """
+        Удаляет все тексты корпуса.
+        """
+        self.mapping = b''
+        self.offsets = array('Q')
+        open(self.corpus_path, 'wb').close()
+        open(self.offsets_path, 'wb').close()
@@ -1,6 +1,16 @@
 #!/usr/bin/python
 # -*- coding: utf8 -*-
+import hashlib
 import json
+import os
+import re
+import sqlite3
+import threading
+
+
+TXT_CHUNK_SIZE = 1 << 20
+
+_SENTENCE_END_PATTERN = re.compile(r'[.!?…]\s')
 
 
 def read_json(json_file_path: str) -> tuple:
@@ -17,10 +27,391 @@ def write_json(json_file_path: str, name_text: str, new_text: str) -> None:
         json.dump(data, file, ensure_ascii=False, indent=4)
 
 
+def iter_json_lines(file):
+    """
+    Перебирает записи файла формата JSON Lines, открытого в режиме 'rb+'.
+
+    Файлы индексов дописываются построчно, поэтому сбой во время записи
+    оставляет в конце файла недописанную строку. Строка, которую не удается
+    разобрать, и все строки после нее отрезаются от файла; к последней
+    строке без перевода строки он дописывается.
+
+    Параметры:
+    - file (BinaryIO): Файл, открытый в режиме 'rb+'.
+
+    Возвращает:
+    - Iterator[tuple[int, object]]: Пары (смещение начала строки в файле, запись).
+    """
+    while True:
+        offset = file.tell()
+        line = file.readline()
+        if not line:
+            return
+        try:
+            record = json.loads(line)
+        except ValueError:
+            file.truncate(offset)
+            return
+        if not line.endswith(b'\n'):
+            file.write(b'\n')
+        yield offset, record
+
+
+def read_txt(txt_file_path: str) -> str:
+    with open(txt_file_path, 'r', encoding='utf-8') as txt_file:
+        return txt_file.read()
+
+
+def get_content_hash(chunks) -> str:
+    """
+    Вычисляет 128-битный хеш BLAKE2b исходного текста, поданного частями.
+    Результат не зависит от того, как текст разбит на части.
+
+    Параметры:
+    - chunks (Iterable[str]): Части текста.
+
+    Возвращает:
+    - str: Хеш в шестнадцатеричной записи.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for chunk in chunks:
+        digest.update(chunk.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _find_chunk_boundary(buffer: str) -> int:
+    """
+    Находит место разреза буфера: после последнего конца предложения во второй
+    половине буфера, иначе после последнего пробельного символа. Если пробельных
+    символов в буфере нет, возвращает 0: буфер заканчивается незавершенным словом,
+    и оно переносится в следующее чтение.
+    """
+    half = len(buffer) // 2
+    boundary = 0
+    for match in _SENTENCE_END_PATTERN.finditer(buffer, half):
+        boundary = match.end()
+    if boundary:
+        return boundary
+    for index in range(len(buffer) - 1, -1, -1):
+        if buffer[index].isspace():
+            return index + 1
+    return 0
+
+
+def read_txt_chunks(txt_file_path: str, chunk_size: int = TXT_CHUNK_SIZE):
+    """
+    Читает текстовый файл частями примерно по chunk_size символов, разрезая его
+    по границам предложений или слов. Склеенные части дают исходный текст.
+
+    Параметры:
+    - txt_file_path (str): Путь к текстовому файлу.
+    - chunk_size (int): Размер читаемого блока в символах.
+
+    Возвращает:
+    - Iterator[str]: Части текста.
+    """
+    buffer = ''
+    with open(txt_file_path, 'r', encoding='utf-8') as txt_file:
+        while True:
+            data = txt_file.read(chunk_size)
+            if not data:
+                break
+            buffer += data
+            boundary = _find_chunk_boundary(buffer)
+            if boundary:
+                yield buffer[:boundary]
+                buffer = buffer[boundary:]
+    if buffer:
+        yield buffer
+
+
+def iter_txt_files(directory_path: str):
+    """
+    Перебирает файлы .txt в каталоге и всех его подкаталогах в алфавитном порядке.
+
+    Параметры:
+    - directory_path (str): Путь к каталогу.
+
+    Возвращает:
+    - Iterator[str]: Пути к файлам.
+    """
+    for root, directories, files in os.walk(directory_path):
+        directories.sort()
+        for file_name in sorted(files):
+            if file_name.lower().endswith('.txt'):
+                yield os.path.join(root, file_name)
+
+
 def read_txt_and_write_to_json(txt_file_path: str, json_file_path: str, name_text: str) -> None:
     try:
-        with open(txt_file_path, 'r', encoding='utf-8') as txt_file:
-            text_content = txt_file.read()
-        write_json(json_file_path, name_text, text_content)
+        write_json(json_file_path, name_text, read_txt(txt_file_path))
     except Exception as e:
         print(f'Error: {e}')
+
+
+class DatabaseClass:
+    """
+    Хранилище текстов базы в файле SQLite.
+
+    Каждый документ хранится одной строкой с исходным и каноническим текстом,
+    поэтому добавление документа не перезаписывает остальную базу, а отдельный
+    текст читается по идентификатору без загрузки всей базы. Большие документы,
+    добавленные потоково, хранятся частями в таблице text_chunks, а в таблице
+    texts для них записываются пустые строки. Таблица imported_files - журнал
+    пакетного импорта: пути файлов, уже добавленных в базу. Таблица text_hashes
+    хранит хеши исходных текстов (см. get_content_hash()), по которым находятся
+    повторно добавляемые документы.
+    """
+
+    def __init__(self, database_path: str = "database.sqlite") -> None:
+        """
+        Инициализация класса DatabaseClass.
+
+        Параметры:
+        - database_path (str): Путь к файлу базы SQLite.
+        """
+        self.database_path = database_path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(database_path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS texts ("
+                "id INTEGER PRIMARY KEY, "
+                "name TEXT UNIQUE NOT NULL, "
+                "text TEXT NOT NULL, "
+                "canonical_text TEXT NOT NULL)")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS text_chunks ("
+                "text_id INTEGER NOT NULL, "
+                "position INTEGER NOT NULL, "
+                "text TEXT NOT NULL, "
+                "canonical_text TEXT NOT NULL, "
+                "PRIMARY KEY (text_id, position))")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS imported_files ("
+                "path TEXT PRIMARY KEY, "
+                "name TEXT NOT NULL)")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS text_hashes ("
+                "name TEXT PRIMARY KEY, "
+                "hash TEXT NOT NULL)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS text_hashes_hash ON text_hashes (hash)")
+        self._add_missing_hashes()
+
+    def _add_missing_hashes(self) -> None:
+        """
+        Вычисляет хеши исходных текстов документов, добавленных до появления таблицы text_hashes.
+        """
+        with self.lock, self.connection:
+            rows = self.connection.execute(
+                "SELECT texts.id, texts.name, texts.text FROM texts "
+                "LEFT JOIN text_hashes ON text_hashes.name = texts.name WHERE text_hashes.hash IS NULL").fetchall()
+            for text_id, name, text in rows:
+                if not text:
+                    text = self._join_chunks(text_id, "text")
+                self.connection.execute("INSERT INTO text_hashes (name, hash) VALUES (?, ?)",
+                                        (name, get_content_hash((text,))))
+
+    def migrate_from_json(self, database_json_path: str = "database.json",
+                          canonical_json_path: str = "canonicaldatabase.json") -> int:
+        """
+        Однократно переносит тексты из файлов JSON в пустую базу SQLite.
+
+        Параметры:
+        - database_json_path (str): Путь к файлу JSON с исходными текстами.
+        - canonical_json_path (str): Путь к файлу JSON с каноническими текстами.
+
+        Возвращает:
+        - int: Количество перенесенных текстов.
+        """
+        if self.size() or not os.path.exists(canonical_json_path):
+            return 0
+        canonical_texts, _ = read_json(canonical_json_path)
+        texts = read_json(database_json_path)[0] if os.path.exists(database_json_path) else {}
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT INTO texts (name, text, canonical_text) VALUES (?, ?, ?)",
+                ((name, texts.get(name, ''), canonical_text)
+                 for name, canonical_text in canonical_texts.items()))
+        self._add_missing_hashes()
+        return len(canonical_texts)
+
+    def add_text(self, name: str, text: str, canonical_text: str, content_hash: str = None) -> None:
+        """
+        Добавляет документ в базу.
+
+        Параметры:
+        - name (str): Идентификатор документа.
+        - text (str): Исходный текст.
+        - canonical_text (str): Канонический текст.
+        - content_hash (str): Хеш исходного текста, если он уже вычислен.
+        """
+        with self.lock, self.connection:
+            self._insert_text(name, [(text, canonical_text)], content_hash)
+
+    def add_texts(self, documents) -> None:
+        """
+        Добавляет в базу пакет документов в одной транзакции.
+
+        Параметры:
+        - documents (Iterable[tuple]): Четверки (идентификатор документа, исходный текст,
+          канонический текст, хеш исходного текста).
+        """
+        with self.lock, self.connection:
+            for name, text, canonical_text, content_hash in documents:
+                self._insert_text(name, [(text, canonical_text)], content_hash)
+
+    def add_text_chunks(self, name: str, chunks) -> None:
+        """
+        Добавляет в базу документ, поданный частями, в одной транзакции.
+
+        Параметры:
+        - name (str): Идентификатор документа.
+        - chunks (Iterable[tuple]): Пары (часть исходного текста, ее каноническая форма).
+        """
+        digest = hashlib.blake2b(digest_size=16)
+
+        def hashed_chunks():
+            for text, canonical_text in chunks:
+                digest.update(text.encode('utf-8'))
+                yield text, canonical_text
+
+        with self.lock, self.connection:
+            text_id = self.connection.execute(
+                "INSERT INTO texts (name, text, canonical_text) VALUES (?, '', '')", (name,)).lastrowid
+            self._insert_chunks(text_id, hashed_chunks())
+            self.connection.execute(
+                "INSERT INTO text_hashes (name, hash) VALUES (?, ?)", (name, digest.hexdigest()))
+
+    def _insert_chunks(self, text_id: int, chunks) -> None:
+        self.connection.executemany(
+            "INSERT INTO text_chunks (text_id, position, text, canonical_text) VALUES (?, ?, ?, ?)",
+            ((text_id, position, text, canonical_text) for position, (text, canonical_text) in enumerate(chunks)))
+
+    def _insert_text(self, name: str, chunks: list, content_hash: str = None) -> None:
+        """
+        Добавляет документ в текущей транзакции. Документ из одной части хранится
+        в таблице texts, из нескольких - в таблице text_chunks.
+
+        Параметры:
+        - name (str): Идентификатор документа.
+        - chunks (list): Пары (часть исходного текста, ее каноническая форма).
+        - content_hash (str): Хеш исходного текста (по умолчанию вычисляется).
+        """
+        if len(chunks) == 1:
+            self.connection.execute(
+                "INSERT INTO texts (name, text, canonical_text) VALUES (?, ?, ?)", (name, *chunks[0]))
+        else:
+            text_id = self.connection.execute(
+                "INSERT INTO texts (name, text, canonical_text) VALUES (?, '', '')", (name,)).lastrowid
+            self._insert_chunks(text_id, chunks)
+        if content_hash is None:
+            content_hash = get_content_hash(text for text, _ in chunks)
+        self.connection.execute("INSERT INTO text_hashes (name, hash) VALUES (?, ?)", (name, content_hash))
+
+    def find_text_by_hash(self, content_hash: str) -> str:
+        """
+        Возвращает идентификатор первого документа с данным хешем исходного текста
+        или None, если такого документа нет.
+
+        Параметры:
+        - content_hash (str): Хеш исходного текста (см. get_content_hash()).
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT text_hashes.name FROM text_hashes JOIN texts ON texts.name = text_hashes.name "
+                "WHERE text_hashes.hash = ? ORDER BY texts.id LIMIT 1", (content_hash,)).fetchone()
+        return row[0] if row else None
+
+    def add_imported_texts(self, documents) -> None:
+        """
+        Добавляет в базу пакет импортированных документов в одной транзакции
+        вместе с записями журнала импорта. После сбоя пакет либо добавлен
+        целиком, либо не добавлен совсем.
+
+        Параметры:
+        - documents (Iterable[tuple]): Четверки (идентификатор документа, путь к файлу,
+          список пар (часть исходного текста, ее каноническая форма), хеш исходного текста).
+          Если список частей равен None, файл совпал с уже имеющимся документом
+          с данным идентификатором и записывается только в журнал.
+        """
+        with self.lock, self.connection:
+            for name, path, chunks, content_hash in documents:
+                if chunks is not None:
+                    self._insert_text(name, chunks, content_hash)
+                self.connection.execute("INSERT INTO imported_files (path, name) VALUES (?, ?)", (path, name))
+
+    def get_imported_paths(self) -> set:
+        """
+        Возвращает пути файлов, уже добавленных пакетным импортом.
+        """
+        with self.lock:
+            return {row[0] for row in self.connection.execute("SELECT path FROM imported_files")}
+
+    def _join_chunks(self, text_id: int, column: str) -> str:
+        """
+        Собирает текст документа, хранящегося частями. Исходные части склеиваются
+        как есть, канонические - через пробел.
+        """
+        parts = [row[0] for row in self.connection.execute(
+            f"SELECT {column} FROM text_chunks WHERE text_id = ? ORDER BY position", (text_id,))]
+        return ''.join(parts) if column == "text" else ' '.join(part for part in parts if part)
+
+    def _get_column(self, name: str, column: str) -> str:
+        with self.lock:
+            row = self.connection.execute(
+                f"SELECT id, {column} FROM texts WHERE name = ?", (name,)).fetchone()
+            if row and not row[1]:
+                return self._join_chunks(row[0], column)
+        return row[1] if row else None
+
+    def get_text(self, name: str) -> str:
+        """
+        Возвращает исходный текст документа или None, если документа нет.
+
+        Параметры:
+        - name (str): Идентификатор документа.
+        """
+        return self._get_column(name, "text")
+
+    def get_canonical_text(self, name: str) -> str:
+        """
+        Возвращает канонический текст документа или None, если документа нет.
+
+        Параметры:
+        - name (str): Идентификатор документа.
+        """
+        return self._get_column(name, "canonical_text")
+
+    def iter_canonical_texts(self, start: int = 0):
+        """
+        Перебирает канонические тексты в порядке добавления, не загружая исходные тексты.
+
+        Параметры:
+        - start (int): Номер первого текста (по умолчанию 0).
+
+        Возвращает:
+        - Iterator[tuple]: Пары (идентификатор, канонический текст).
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT id, name, canonical_text FROM texts ORDER BY id LIMIT -1 OFFSET ?", (start,)).fetchall()
+        for text_id, name, canonical_text in rows:
+            if not canonical_text:
+                with self.lock:
+                    canonical_text = self._join_chunks(text_id, "canonical_text")
+            yield name, canonical_text
+
+    def get_names(self) -> list:
+        """
+        Возвращает идентификаторы документов в порядке добавления.
+        """
+        with self.lock:
+            return [row[0] for row in self.connection.execute("SELECT name FROM texts ORDER BY id")]
+
+    def size(self) -> int:
+        """
+        Возвращает количество документов в базе.
+        """
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM texts").fetchone()[0]
@@ -0,0 +1,208 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import json
+import os
+from itertools import islice
+from TextCanonization import iter_text_fingerprints, iter_winnowed_fingerprints
+from ReadWriteDatabase import iter_json_lines
+
+
+class ShingleIndexClass:
+    """
+    Инвертированный индекс шинглов: отпечаток шингла -> документы и позиции.
+
+    Индекс хранится в файле формата JSON Lines. Первая строка содержит
+    параметры индекса, каждая следующая - отпечатки шинглов одного документа.
+    Добавление документа дописывает одну строку в конец файла.
+
+    При window_size > 1 в индекс попадают только отпечатки, отобранные
+    просеиванием (см. winnow_fingerprints()), вместе с их позициями.
+    Отпечатки большого документа записываются несколькими строками
+    по RECORD_SIZE отпечатков; у всех строк документа, кроме последней,
+    поле more равно true. Документ считается проиндексированным, только когда
+    записана его последняя строка, поэтому документ, запись которого прервал
+    сбой, при загрузке отбрасывается и индексируется заново.
+    """
+
+    RECORD_SIZE = 65536
+
+    def __init__(self, index_file_path: str = "shingleindex.jsonl", shingle_size: int = 3,
+                 window_size: int = 1) -> None:
+        """
+        Инициализация класса ShingleIndexClass.
+
+        Параметры:
+        - index_file_path (str): Путь к файлу индекса.
+        - shingle_size (int): Размер шингла в словах (по умолчанию 3).
+        - window_size (int): Размер окна просеивания (по умолчанию 1 - индексируются все шинглы).
+        """
+        self.index_file_path = index_file_path
+        self.shingle_size = shingle_size
+        self.window_size = window_size
+        self.postings = {}
+        self.documents = set()
+        self._load()
+
+    def _load(self) -> None:
+        """
+        Загружает индекс из файла. Если файл создан с другим размером шингла
+        или окна просеивания, он перезаписывается пустым индексом.
+
+        Недописанная при сбое последняя строка и строки документа без
+        завершающей строки отрезаются от файла (см. iter_json_lines()).
+        """
+        if os.path.exists(self.index_file_path):
+            with open(self.index_file_path, 'rb+') as file:
+                records = iter_json_lines(file)
+                header = next(records, None)
+                if header is not None and header[1] == self._parameters():
+                    pending = []
+                    pending_offset = 0
+                    for offset, record in records:
+                        if pending and pending[0]["name"] != record["name"]:
+                            pending = []
+                        if not pending:
+                            pending_offset = offset
+                        pending.append(record)
+                        if not record.get("more"):
+                            for pending_record in pending:
+                                self._add_record(pending_record)
+                            pending = []
+                    if pending:
+                        file.truncate(pending_offset)
+                    return
+        with open(self.index_file_path, 'w', encoding='utf-8') as file:
+            file.write(json.dumps(self._parameters()) + "\n")
+
+    def _parameters(self) -> dict:
+        if self.window_size == 1:
+            return {"shingle_size": self.shingle_size}
+        return {"shingle_size": self.shingle_size, "window_size": self.window_size}
+
+    def _add_record(self, record: dict) -> None:
+        """
+        Добавляет в индекс в памяти отпечатки из строки файла индекса.
+
+        Параметры:
+        - record (dict): Строка файла индекса.
+        """
+        positions = record.get("positions")
+        if positions is None and "start" in record:
+            positions = range(record["start"], record["start"] + len(record["fingerprints"]))
+        self._add_postings(record["name"], record["fingerprints"], positions)
+
+    def _add_postings(self, name: str, fingerprints: list, positions: list = None) -> None:
+        """
+        Добавляет отпечатки документа в индекс в памяти.
+
+        Параметры:
+        - name (str): Идентификатор документа.
+        - fingerprints (list): Отпечатки шинглов документа.
+        - positions (list): Позиции шинглов (по умолчанию - все шинглы по порядку).
+        """
+        if positions is None:
+            positions = range(len(fingerprints))
+        for position, fingerprint in zip(positions, fingerprints):
+            self.postings.setdefault(fingerprint, {}).setdefault(name, []).append(position)
+        self.documents.add(name)
+
+    def add_document(self, name: str, canonical_text: str) -> None:
+        """
+        Индексирует документ и дописывает его в файл индекса.
+
+        Параметры:
+        - name (str): Идентификатор документа.
+        - canonical_text (str): Канонический текст документа.
+        """
+        self.add_document_chunks(name, (canonical_text,))
+
+    def add_document_chunks(self, name: str, canonical_chunks) -> None:
+        """
+        Индексирует документ, поданный частями, дописывая отпечатки в файл индекса
+        по мере их вычисления. В индекс в памяти документ добавляется после записи
+        последней строки; если запись прервана исключением, записанные строки
+        документа удаляются из файла.
+
+        Параметры:
+        - name (str): Идентификатор документа.
+        - canonical_chunks (Iterable[str]): Части канонического текста, разделенные по границам слов.
+        """
+        if name in self.documents:
+            return
+        fingerprints = iter_text_fingerprints(canonical_chunks, self.shingle_size)
+        if self.window_size > 1:
+            selected = iter_winnowed_fingerprints(fingerprints, self.window_size)
+        else:
+            selected = enumerate(fingerprints)
+        records = []
+        with open(self.index_file_path, 'ab') as file:
+            start = file.tell()
+            try:
+                batch = list(islice(selected, self.RECORD_SIZE))
+                while True:
+                    next_batch = list(islice(selected, self.RECORD_SIZE)) if len(batch) == self.RECORD_SIZE else []
+                    records.append(self._write_record(file, name, batch, bool(next_batch)))
+                    if not next_batch:
+                        break
+                    batch = next_batch
+            except BaseException:
+                file.truncate(start)
+                raise
+        for record in records:
+            self._add_record(record)
+        self.documents.add(name)
+
+    def _write_record(self, file, name: str, batch: list, more: bool = False) -> dict:
+        """
+        Дописывает часть отпечатков документа строкой в файл индекса.
+
+        Параметры:
+        - file (BinaryIO): Открытый на дозапись файл индекса.
+        - name (str): Идентификатор документа.
+        - batch (list): Пары (позиция шингла, отпечаток).
+        - more (bool): За строкой следуют другие строки того же документа.
+
+        Возвращает:
+        - dict: Записанная строка.
+        """
+        positions = [position for position, _ in batch]
+        record = {"name": name, "fingerprints": [fingerprint for _, fingerprint in batch]}
+        if self.window_size > 1:
+            record["positions"] = positions
+        elif positions and positions[0]:
+            record["start"] = positions[0]
+        if more:
+            record["more"] = True
+        file.write((json.dumps(record) + "\n").encode('utf-8'))
+        return record
+
+    def synchronize(self, canonical_texts) -> None:
+        """
+        Добавляет в индекс документы базы, которые еще не проиндексированы.
+
+        Параметры:
+        - canonical_texts (Iterable[tuple]): Пары (идентификатор, канонический текст).
+        """
+        for name, canonical_text in canonical_texts:
+            self.add_document(name, canonical_text)
+
+    def lookup(self, fingerprint: int) -> dict:
+        """
+        Возвращает документы, содержащие шингл с заданным отпечатком.
+
+        Параметры:
+        - fingerprint (int): Отпечаток шингла.
+
+        Возвращает:
+        - dict: Словарь идентификатор документа -> список позиций шингла (в словах).
+        """
+        return self.postings.get(fingerprint, {})
+
+    def size(self) -> int:
+        """
+        Возвращает размер индекса.
+
+        Возвращает:
+        - int: Количество позиций шинглов во всех документах индекса.
+        """
+        return sum(len(positions) for documents in self.postings.values() for positions in documents.values())
@@ -0,0 +1,190 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+from array import array
+from Vocabulary import VocabularyClass
+
+
+class SuffixAutomatonClass:
+    """
+    Обобщенный суффиксный автомат по словам всех текстов базы.
+
+    Автомат распознает все подстроки (последовательности слов) всех добавленных
+    текстов и строится инкрементально: добавление текста из n слов занимает O(n).
+    Для каждого состояния хранится одно вхождение - номер текста и позиция
+    последнего слова, - по которому восстанавливается источник совпадения.
+    Слова заменяются номерами из словаря VocabularyClass, переходы хранятся в словарях.
+    """
+
+    def __init__(self, vocabulary: VocabularyClass = None) -> None:
+        """
+        Инициализация класса SuffixAutomatonClass. Создает автомат с одним начальным состоянием.
+
+        Параметры:
+        - vocabulary (VocabularyClass): Словарь номеров слов, общий с другими структурами
+          (по умолчанию создается собственный).
+        """
+        self.vocabulary = vocabulary if vocabulary is not None else VocabularyClass()
+        self.lengths = array('i', [0])
+        self.links = array('i', [-1])
+        self.transitions = [{}]
+        self.documents = array('i', [-1])
+        self.ends = array('i', [-1])
+        self.documents_count = 0
+
+    def _new_state(self, length: int, link: int, transitions: dict, document: int, end: int) -> int:
+        self.lengths.append(length)
+        self.links.append(link)
+        self.transitions.append(transitions)
+        self.documents.append(document)
+        self.ends.append(end)
+        return len(self.lengths) - 1
+
+    def _clone(self, state: int, length: int) -> int:
+        """
+        Расщепляет состояние: создает копию с длиной length и делает ее суффиксной ссылкой исходного.
+
+        Параметры:
+        - state (int): Расщепляемое состояние.
+        - length (int): Длина самой длинной строки копии.
+
+        Возвращает:
+        - int: Номер копии.
+        """
+        clone = self._new_state(length, self.links[state], dict(self.transitions[state]),
+                                self.documents[state], self.ends[state])
+        self.links[state] = clone
+        return clone
+
+    def _redirect(self, state: int, token: int, target: int, clone: int) -> None:
+        """
+        Перенаправляет переходы по token из state и его суффиксных предков с target на clone.
+        """
+        while state != -1 and self.transitions[state].get(token) == target:
+            self.transitions[state][token] = clone
+            state = self.links[state]
+
+    def _extend(self, last: int, token: int, document: int, end: int) -> int:
+        """
+        Добавляет к автомату слово, продолжающее текущий текст.
+
+        Параметры:
+        - last (int): Состояние, соответствующее уже добавленной части текста.
+        - token (int): Номер слова.
+        - document (int): Номер текста.
+        - end (int): Позиция слова в тексте.
+
+        Возвращает:
+        - int: Состояние, соответствующее части текста вместе с новым словом.
+        """
+        target = self.transitions[last].get(token)
+        if target is not None:
+            if self.lengths[target] == self.lengths[last] + 1:
+                return target
+            clone = self._clone(target, self.lengths[last] + 1)
+            self._redirect(last, token, target, clone)
+            return clone
+        current = self._new_state(self.lengths[last] + 1, 0, {}, document, end)
+        state = last
+        while state != -1 and token not in self.transitions[state]:
+            self.transitions[state][token] = current
+            state = self.links[state]
+        if state != -1:
+            target = self.transitions[state][token]
+            if self.lengths[target] == self.lengths[state] + 1:
+                self.links[current] = target
+            else:
+                clone = self._clone(target, self.lengths[state] + 1)
+                self._redirect(state, token, target, clone)
+                self.links[current] = clone
+        return current
+
+    def add_document(self, canonical_text: str) -> int:
+        """
+        Добавляет текст в автомат.
+
+        Параметры:
+        - canonical_text (str): Канонический текст.
+
+        Возвращает:
+        - int: Номер текста в автомате (тексты нумеруются с 0 в порядке добавления).
+        """
+        return self.add_document_chunks((canonical_text,))
+
+    def add_document_chunks(self, canonical_chunks) -> int:
+        """
+        Добавляет в автомат текст, поданный частями.
+
+        Параметры:
+        - canonical_chunks (Iterable[str]): Части канонического текста, разделенные по границам слов.
+
+        Возвращает:
+        - int: Номер текста в автомате.
+        """
+        return self.add_document_tokens(self.vocabulary.encode_chunks(canonical_chunks))
+
+    def add_document_tokens(self, tokens) -> int:
+        """
+        Добавляет в автомат текст, заданный номерами слов из словаря автомата.
+
+        Параметры:
+        - tokens (Iterable[int]): Номера слов текста (см. VocabularyClass.encode()).
+
+        Возвращает:
+        - int: Номер текста в автомате.
+        """
+        document = self.documents_count
+        last = 0
+        for end, token in enumerate(tokens):
+            last = self._extend(last, token, document, end)
+        self.documents_count += 1
+        return document
+
+    def find_longest_matches(self, words: list) -> list:
+        """
+        Для каждой позиции образца находит самую длинную подстроку, оканчивающуюся
+        в ней и встречающуюся в текстах автомата. Выполняется за один проход по образцу.
+
+        Параметры:
+        - words (list): Слова образца.
+
+        Возвращает:
+        - list: Для каждой позиции - пара (длина совпадения в словах, состояние автомата).
+        """
+        matches = []
+        state = length = 0
+        for word in words:
+            token = self.vocabulary.get(word)
+            while state and token not in self.transitions[state]:
+                state = self.links[state]
+                length = self.lengths[state]
+            if token in self.transitions[state]:
+                state = self.transitions[state][token]
+                length += 1
+            else:
+                state = length = 0
+            matches.append((length, state))
+        return matches
+
+    def find_maximal_matches(self, canonical_text: str, min_length: int = 1) -> list:
+        """
+        Находит максимальные совпадения образца с текстами автомата: для каждой
+        позиции образца - самое длинное совпадение, оканчивающееся в ней, если его
+        нельзя продлить вправо.
+
+        Параметры:
+        - canonical_text (str): Канонический текст образца.
+        - min_length (int): Минимальная длина совпадения в словах.
+
+        Возвращает:
+        - list: Кортежи (позиция начала в образце, длина в словах, номер текста,
+          позиция начала в тексте) в порядке позиций образца.
+        """
+        matches = self.find_longest_matches(canonical_text.split())
+        result = []
+        for end, (length, state) in enumerate(matches):
+            if length < min_length:
+                continue
+            if end + 1 < len(matches) and matches[end + 1][0] == length + 1:
+                continue
+            result.append((end - length + 1, length, self.documents[state], self.ends[state] - length + 1))
+        return result
@@ -1,7 +1,246 @@
 import re
-import pymorphy2
+import hashlib
+import functools
+import threading
+from collections import deque
 import string
+from typing import TYPE_CHECKING
 from unidecode import unidecode
+from Instrumentation import NULL_STATS
+
+if TYPE_CHECKING:
+    import pymorphy2
+
+
+LEMMA_CACHE_SIZE = 200000
+# Увеличивается при любом изменении правил канонизации, чтобы сохраненные
+# результаты (см. CanonicalCache) перестали использоваться.
+CANONICALIZATION_VERSION = 1
+
+_morph_analyzer = None
+_morph_analyzer_lock = threading.Lock()
+
+_REMOVED_PARTS_OF_SPEECH = frozenset({'ADJF', 'ADJS', 'PRTF', 'PRTS', 'GRND', 'ADVB'})
+_PUNCTUATION_TABLE = str.maketrans('', '', string.punctuation)
+_QUOTES_AND_DASHES_TABLE = str.maketrans('', '', '"“”„«»’‘<…>\'-—–―')
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+_NON_PRINTABLE_PATTERN = re.compile(r'[^\x20-\x7E\n]+')
+
+
+def get_morph_analyzer() -> "pymorphy2.MorphAnalyzer":
+    """
+    Возвращает общий для процесса морфологический анализатор.
+
+    Модуль pymorphy2 импортируется и его словари загружаются один раз, при первом вызове.
+
+    Возвращает:
+    - pymorphy2.MorphAnalyzer: Морфологический анализатор.
+    """
+    global _morph_analyzer
+    if _morph_analyzer is None:
+        with _morph_analyzer_lock:
+            if _morph_analyzer is None:
+                import pymorphy2
+                _morph_analyzer = pymorphy2.MorphAnalyzer()
+    return _morph_analyzer
+
+
+def _parse_word(word: str) -> tuple:
+    """
+    Разбирает слово морфологическим анализатором.
+
+    Параметры:
+    - word (str): Слово.
+
+    Возвращает:
+    - tuple: Часть речи слова и его форма для канонического текста: именительный падеж
+      единственного числа для существительных, начальная форма для глаголов,
+      исходное слово для остальных частей речи.
+    """
+    parsed_word = get_morph_analyzer().parse(word)[0]
+    if parsed_word.tag.POS in {'NOUN'}:
+        try:
+            return parsed_word.tag.POS, parsed_word.inflect({'nomn', 'sing'}).word
+        except Exception:
+            return parsed_word.tag.POS, word
+    elif parsed_word.tag.POS in {'VERB'}:
+        try:
+            return parsed_word.tag.POS, parsed_word.normal_form
+        except Exception:
+            return parsed_word.tag.POS, word
+    return parsed_word.tag.POS, word
+
+
+_cached_parse_word = functools.lru_cache(maxsize=LEMMA_CACHE_SIZE)(_parse_word)
+
+
+def parse_word(word: str) -> tuple:
+    """
+    Разбирает слово с использованием ограниченного LRU-кэша результатов разбора.
+
+    Параметры:
+    - word (str): Слово.
+
+    Возвращает:
+    - tuple: Часть речи слова и его форма для канонического текста.
+    """
+    return _cached_parse_word(word)
+
+
+def get_lemma_cache_info() -> tuple:
+    """
+    Возвращает статистику кэша разбора слов.
+
+    Возвращает:
+    - tuple: Именованный кортеж (hits, misses, maxsize, currsize).
+    """
+    return _cached_parse_word.cache_info()
+
+
+def set_lemma_cache_size(maxsize: int) -> None:
+    """
+    Задает размер кэша разбора слов. Текущее содержимое и счетчики кэша сбрасываются.
+
+    Параметры:
+    - maxsize (int): Максимальное число слов в кэше.
+    """
+    global _cached_parse_word
+    _cached_parse_word = functools.lru_cache(maxsize=maxsize)(_parse_word)
+
+
+def get_canonicalization_settings(shingle_size: int) -> str:
+    """
+    Возвращает строку, однозначно описывающую настройки канонизации:
+    версию правил, набор стоп-слов, отбрасываемые части речи и размер шингла.
+
+    Параметры:
+    - shingle_size (int): Размер шингла в словах.
+
+    Возвращает:
+    - str: Строка настроек.
+    """
+    stop_words = hashlib.blake2b(' '.join(sorted(CanonicalTextClass.STOP_WORDS)).encode('utf-8'),
+                                 digest_size=8).hexdigest()
+    return (f"version={CANONICALIZATION_VERSION};stop_words={stop_words};"
+            f"removed={','.join(sorted(_REMOVED_PARTS_OF_SPEECH))};shingle_size={shingle_size}")
+
+
+def get_shingle_fingerprint(shingle: str) -> int:
+    """
+    Вычисляет устойчивый 64-битный отпечаток шингла.
+
+    В отличие от встроенной hash(), значение не зависит от процесса,
+    поэтому отпечатки можно сохранять на диск.
+
+    Параметры:
+    - shingle (str): Шингл.
+
+    Возвращает:
+    - int: Отпечаток шингла.
+    """
+    return int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def get_text_fingerprints(text: str, shingle_size: int) -> list[int]:
+    """
+    Вычисляет отпечатки всех шинглов канонического текста по порядку.
+
+    Параметры:
+    - text (str): Канонический текст.
+    - shingle_size (int): Размер шингла в словах.
+
+    Возвращает:
+    - list[int]: Список отпечатков, i-й элемент соответствует шинглу, начинающемуся с i-го слова.
+    """
+    words = text.split()
+    return [get_shingle_fingerprint(' '.join(words[i:i + shingle_size]))
+            for i in range(len(words) - shingle_size + 1)]
+
+
+def iter_text_fingerprints(canonical_chunks, shingle_size: int):
+    """
+    Вычисляет отпечатки шинглов канонического текста, поданного частями.
+
+    Части должны разделяться по границам слов; шинглы, пересекающие границу
+    частей, учитываются, поэтому результат совпадает с get_text_fingerprints()
+    для склеенного через пробел текста.
+
+    Параметры:
+    - canonical_chunks (Iterable[str]): Части канонического текста.
+    - shingle_size (int): Размер шингла в словах.
+
+    Возвращает:
+    - Iterator[int]: Отпечатки шинглов по порядку.
+    """
+    carry = []
+    for chunk in canonical_chunks:
+        words = carry + chunk.split()
+        for i in range(len(words) - shingle_size + 1):
+            yield get_shingle_fingerprint(' '.join(words[i:i + shingle_size]))
+        carry = words[max(len(words) - shingle_size + 1, 0):]
+
+
+def iter_winnowed_fingerprints(fingerprints, window_size: int):
+    """
+    Отбирает отпечатки методом просеивания (winnowing) по мере их поступления.
+
+    Параметры:
+    - fingerprints (Iterable[int]): Отпечатки шинглов текста по порядку.
+    - window_size (int): Размер окна; при 1 отбираются все отпечатки.
+
+    Возвращает:
+    - Iterator[tuple[int, int]]: Пары (позиция шингла, отпечаток) в порядке позиций,
+      см. winnow_fingerprints().
+    """
+    window = deque()
+    last_selected = -1
+    for position, fingerprint in enumerate(fingerprints):
+        while window and window[-1][1] > fingerprint:
+            window.pop()
+        window.append((position, fingerprint))
+        if window[0][0] <= position - window_size:
+            window.popleft()
+        if position >= window_size - 1 and last_selected != window[0][0]:
+            last_selected = window[0][0]
+            yield window[0]
+    if window and last_selected == -1:
+        yield window[0]
+
+
+def winnow_fingerprints(fingerprints: list[int], window_size: int) -> list[tuple[int, int]]:
+    """
+    Отбирает отпечатки методом просеивания (winnowing): из каждого окна
+    window_size последовательных отпечатков остается минимальный.
+
+    Соседние окна обычно имеют общий минимум, поэтому остается примерно
+    2 / (window_size + 1) всех отпечатков. Любое совпадение двух текстов длиной
+    не менее window_size + shingle_size - 1 слов содержит целое окно
+    и поэтому обнаруживается по общему отобранному отпечатку.
+
+    Параметры:
+    - fingerprints (list[int]): Отпечатки шинглов текста по порядку.
+    - window_size (int): Размер окна; при 1 отбираются все отпечатки.
+
+    Возвращает:
+    - list[tuple[int, int]]: Пары (позиция шингла, отпечаток) в порядке позиций.
+    """
+    return list(iter_winnowed_fingerprints(fingerprints, window_size))
+
+
+def canonize_chunks(chunks):
+    """
+    Канонизирует текст, поданный частями, не собирая его целиком в памяти.
+
+    Части должны разделяться по границам слов (см. ReadWriteDatabase.read_txt_chunks()).
+
+    Параметры:
+    - chunks (Iterable[str]): Части исходного текста.
+
+    Возвращает:
+    - Iterator[tuple[str, str]]: Пары (часть исходного текста, ее каноническая форма).
+    """
+    for chunk in chunks:
+        yield chunk, CanonicalTextClass(chunk).make_canonical()
 
 
 class CanonicalTextClass:
@@ -18,14 +257,14 @@ class CanonicalTextClass:
         - text (str): Входной текст для обработки.
         - shingle_size (int): Размер шингла для создания (по умолчанию 5).
         """
-        self.morph = pymorphy2.MorphAnalyzer()
+        self.morph = get_morph_analyzer()
         self.text = text
         self.shingles = []
         self.shingle_size = shingle_size
 
     def _clear_garbage(self, text: str) -> str:
         """
-        Удаляет шум, приводит к нижнему регистру и очищает текст.
+        Транслитерирует текст и удаляет кавычки, тире и непечатаемые символы.
 
         Параметры:
         - text (str): Входной текст.
@@ -33,64 +272,30 @@ class CanonicalTextClass:
         Возвращает:
         - str: Очищенный текст.
         """
-        words = text.split()
-        words = [word for word in words if word.lower() not in self.STOP_WORDS]
-        text = ' '.join(words)
         text = unidecode(text)
-        text = re.sub(r'["“”„”«»’‘<…>\'\"]', '', text)
-        text = re.sub(r'[-—–―]+', '', text)
-        text = re.sub(r"''", '', text)
-        text = re.sub(r'\s+', ' ', text)
-        text = re.sub(r'[^\x00-\x7F]+', '', text)
-        text = re.sub(r'[^\x20-\x7E\n]+', '', text)
-        return text
-
-    def _remove_unnecessary(self, text: str) -> str:
-        """
-        Удаляет прилагательные, причастия, наречия и предлоги из текста.
-
-        Параметры:
-        - text (str): Входной текст.
+        text = text.translate(_QUOTES_AND_DASHES_TABLE)
+        text = _WHITESPACE_PATTERN.sub(' ', text)
+        return _NON_PRINTABLE_PATTERN.sub('', text)
 
-        Возвращает:
-        - str: Текст с удаленными прилагательными, причастиями, наречиями и предлогами.
-        """
-        sentence_without_punctuation = ''.join(char if char not in string.punctuation else '' for char in text)
-        words = sentence_without_punctuation.split()
-        filtered_words = [word for word in words if self.morph.parse(word)[0].tag.POS not in {'ADJF', 'ADJS', 'PRTF', 'PRTS', 'GRND', 'ADVB'} and not any(char.isdigit() for char in word)]
-        return ' '.join(filtered_words)
-
-    def _singularize_nouns_and_verbs(self, text: str) -> str:
+    def _canonize_word(self, word: str) -> str:
         """
-        Приводит существительные и глаголы в русском тексте к форме единственного числа.
+        Приводит слово к канонической форме: удаляет знаки препинания, отбрасывает слова
+        с цифрами, прилагательные, причастия, деепричастия, наречия и стоп-слова,
+        приводит существительные к единственному числу, а глаголы - к начальной форме.
 
         Параметры:
-        - text (str): Входной текст.
+        - word (str): Слово входного текста.
 
         Возвращает:
-        - str: Текст с приведенными к единственному числу существительными и глаголами.
+        - str: Каноническая форма слова или пустая строка, если слово отбрасывается.
         """
-        words = text.split()
-        singularized_words = []
-        for word in words:
-            parsed_word = self.morph.parse(word)[0]
-            if parsed_word.tag.POS in {'NOUN'}:
-                try:
-                    singularized_word = parsed_word.inflect({'nomn', 'sing'}).word
-                    singularized_words.append(singularized_word)
-                except Exception:
-                    singularized_words.append(word)
-                    continue
-            elif parsed_word.tag.POS in {'VERB'}:
-                try:
-                    singularized_word = parsed_word.normal_form
-                    singularized_words.append(singularized_word)
-                except Exception:
-                    singularized_words.append(word)
-                    continue
-            else:
-                singularized_words.append(word)
-        return ' '.join(singularized_words)
+        word = word.translate(_PUNCTUATION_TABLE)
+        if not word or any(char.isdigit() for char in word):
+            return ''
+        part_of_speech, canonical_word = parse_word(word)
+        if part_of_speech in _REMOVED_PARTS_OF_SPEECH or canonical_word.lower() in self.STOP_WORDS:
+            return ''
+        return canonical_word
 
     def create_shingles(self) -> list[str]:
         """
@@ -105,18 +310,44 @@ class CanonicalTextClass:
                     for i in range(len(words) - self.shingle_size + 1)]
         return [' '.join(shingle) for shingle in shingles]
 
-    def make_canonical(self) -> str:
+    def create_fingerprints(self) -> list[int]:
+        """
+        Создает отпечатки шинглов канонического текста.
+
+        Возвращает:
+        - list[int]: Список отпечатков в том же порядке, что и create_shingles().
+        """
+        return [get_shingle_fingerprint(shingle) for shingle in self.create_shingles()]
+
+    def create_winnowed_fingerprints(self, window_size: int) -> list[tuple[int, int]]:
+        """
+        Создает отпечатки шинглов канонического текста, отобранные просеиванием.
+
+        Параметры:
+        - window_size (int): Размер окна просеивания.
+
+        Возвращает:
+        - list[tuple[int, int]]: Пары (позиция шингла, отпечаток), см. winnow_fingerprints().
+        """
+        return winnow_fingerprints(self.create_fingerprints(), window_size)
+
+    def make_canonical(self, stats=NULL_STATS) -> str:
         """
         Создает каноническую форму входного текста.
 
+        Параметры:
+        - stats (StatsClass): Статистика, в которую записывается время разбора слов
+          (parsing) и очистки текста (cleanup) и число разобранных слов.
+
         Возвращает:
         - str: Каноническая форма текста.
         """
-        without_adjectives = self._remove_unnecessary(
-            self.text)
-        singularized_sentence = self._singularize_nouns_and_verbs(
-            without_adjectives)
-        self.text = self._clear_garbage(singularized_sentence)
+        with stats.timer("parsing"):
+            words = self.text.split()
+            canonical_words = [word for word in map(self._canonize_word, words) if word]
+        stats.count("words_parsed", len(words))
+        with stats.timer("cleanup"):
+            self.text = self._clear_garbage(' '.join(canonical_words))
         return self.text
 
     STOP_WORDS = {'и', 'в', 'не', 'на', 'с', 'по', 'за', 'к',
@@ -0,0 +1,166 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+from array import array
+
+# Номер слова, которого нет в словаре (см. VocabularyClass.lookup()).
+UNKNOWN_TOKEN = 0xFFFFFFFF
+_HASHED_KEY_FLAG = 1 << 63
+_HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+_MASK64 = (1 << 64) - 1
+
+
+class VocabularyClass:
+    """
+    Словарь канонических слов: каждому слову сопоставляется целочисленный номер.
+
+    Номера выдаются подряд с 0 в порядке первого появления слова и не меняются,
+    поэтому текст хранится компактно как массив номеров array('I') и
+    восстанавливается по нему методом decode().
+    """
+
+    def __init__(self) -> None:
+        """
+        Инициализация класса VocabularyClass. Создает пустой словарь.
+        """
+        self.ids = {}
+        self.words = []
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def get(self, word: str) -> int:
+        """
+        Возвращает номер слова или None, если слова нет в словаре.
+
+        Параметры:
+        - word (str): Слово.
+        """
+        return self.ids.get(word)
+
+    def intern(self, word: str) -> int:
+        """
+        Возвращает номер слова, добавляя слово в словарь, если его там нет.
+
+        Параметры:
+        - word (str): Слово.
+
+        Возвращает:
+        - int: Номер слова.
+        """
+        token = self.ids.get(word)
+        if token is None:
+            token = self.ids[word] = len(self.words)
+            self.words.append(word)
+        return token
+
+    def encode(self, canonical_text: str) -> array:
+        """
+        Преобразует канонический текст в массив номеров слов, добавляя новые слова в словарь.
+
+        Параметры:
+        - canonical_text (str): Канонический текст.
+
+        Возвращает:
+        - array: Номера слов текста (array('I')).
+        """
+        return self.encode_chunks((canonical_text,))
+
+    def encode_chunks(self, canonical_chunks) -> array:
+        """
+        Преобразует в массив номеров слов канонический текст, поданный частями.
+
+        Параметры:
+        - canonical_chunks (Iterable[str]): Части канонического текста, разделенные по границам слов.
+
+        Возвращает:
+        - array: Номера слов текста (array('I')).
+        """
+        tokens = array('I')
+        intern = self.intern
+        for chunk in canonical_chunks:
+            tokens.extend(map(intern, chunk.split()))
+        return tokens
+
+    def lookup(self, canonical_text: str) -> array:
+        """
+        Преобразует канонический текст в массив номеров слов, не изменяя словарь.
+        Слова, которых нет в словаре, заменяются номером UNKNOWN_TOKEN, поэтому
+        шинглы с ними не совпадают ни с одним шинглом текстов словаря.
+
+        Параметры:
+        - canonical_text (str): Канонический текст.
+
+        Возвращает:
+        - array: Номера слов текста (array('I')).
+        """
+        get = self.ids.get
+        return array('I', (get(word, UNKNOWN_TOKEN) for word in canonical_text.split()))
+
+    def decode(self, tokens) -> str:
+        """
+        Восстанавливает канонический текст по номерам слов.
+
+        Параметры:
+        - tokens (Iterable[int]): Номера слов.
+
+        Возвращает:
+        - str: Слова, разделенные пробелами.
+        """
+        words = self.words
+        return ' '.join(words[token] for token in tokens)
+
+    def decode_shingle(self, key: int, shingle_size: int) -> str:
+        """
+        Восстанавливает шингл по ключу, вычисленному pack_shingles().
+
+        Параметры:
+        - key (int): Ключ шингла.
+        - shingle_size (int): Размер шингла в словах.
+
+        Возвращает:
+        - str: Шингл или None, если ключ хешированный и слова по нему не восстанавливаются.
+        """
+        if key & _HASHED_KEY_FLAG:
+            return None
+        bits = 63 // shingle_size
+        limit = (1 << bits) - 1
+        return self.decode(reversed([(key >> (bits * shift)) & limit for shift in range(shingle_size)]))
+
+
+def _hash_shingle(tokens, start: int, shingle_size: int) -> int:
+    key = shingle_size
+    for token in tokens[start:start + shingle_size]:
+        key = ((key ^ token) * _HASH_MULTIPLIER) & _MASK64
+    return key | _HASHED_KEY_FLAG
+
+
+def pack_shingles(tokens, shingle_size: int) -> array:
+    """
+    Вычисляет 64-битные ключи всех шинглов текста по номерам его слов, не
+    создавая строк. Ключ шингла, номера слов которого меньше 2^(63 // shingle_size),
+    - эти номера, упакованные по 63 // shingle_size бит (для шингла из 3 слов -
+    словарь до 2 097 152 слов), и совпадает у двух шинглов, только если совпадают
+    их слова. Ключи остальных шинглов - хеши номеров с установленным старшим битом.
+
+    Параметры:
+    - tokens (Sequence[int]): Номера слов текста по порядку.
+    - shingle_size (int): Размер шингла в словах.
+
+    Возвращает:
+    - array: Ключи шинглов (array('Q')), i-й элемент соответствует шинглу, начинающемуся с i-го слова.
+    """
+    bits = 63 // shingle_size
+    limit = 1 << bits
+    mask = (1 << (bits * shingle_size)) - 1
+    keys = array('Q')
+    key = 0
+    wide = 0
+    for position, token in enumerate(tokens):
+        key = ((key << bits) | (token & (limit - 1))) & mask
+        if token >= limit:
+            wide += 1
+        if position >= shingle_size and tokens[position - shingle_size] >= limit:
+            wide -= 1
+        if position >= shingle_size - 1:
+            keys.append(_hash_shingle(tokens, position - shingle_size + 1, shingle_size) if wide else key)
+    return keys
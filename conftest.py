@@ -0,0 +1,50 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import pytest
+from AntiPlagiarism import AntiPlagiarismClass
+
+TEXTS = [
+    "Весной река вышла из берегов и затопила луга возле старой мельницы. Рыбаки перенесли лодки "
+    "на холм, а мельник до вечера укладывал мешки с мукой на чердак. Вода стояла почти неделю, "
+    "потом медленно ушла, оставив на траве ил и обломки веток.",
+    "Программа читает журнал событий сервера, группирует записи по адресу клиента и считает "
+    "количество ошибок за каждый час. Отчет сохраняется в таблицу, которую администратор "
+    "просматривает утром, чтобы заметить всплески нагрузки и сбои оборудования.",
+    "Экспедиция поднималась к перевалу третий день. Проводник шел впереди и проверял снег "
+    "палкой, опасаясь трещин. Вечером путники разбили лагерь у скалы, растопили снег для чая "
+    "и долго спорили о маршруте спуска в долину.",
+    "Библиотека получила в подарок коллекцию старинных карт побережья. Реставраторы очистили "
+    "пожелтевшую бумагу, укрепили сгибы и поместили листы в прозрачные папки. Выставка карт "
+    "открылась осенью и привлекла много школьников и историков.",
+    "Повар нарезал морковь тонкими полосками, обжарил лук на сливочном масле и добавил грибы. "
+    "Когда соус загустел, он выложил овощи на тарелку рядом с рисом и украсил блюдо зеленью. "
+    "Гости попросили рецепт и записали его в блокнот.",
+]
+NEW_SENTENCE = "Космический телескоп сфотографировал далекую галактику спиральной формы"
+
+
+@pytest.fixture
+def texts() -> list:
+    """Тексты небольшой базы для проверок."""
+    return list(TEXTS)
+
+
+@pytest.fixture
+def new_sentence() -> str:
+    """Предложение, которого нет в текстах базы."""
+    return NEW_SENTENCE
+
+
+@pytest.fixture
+def make_antiplagiarism(tmp_path):
+    """
+    Возвращает функцию, создающую AntiPlagiarismClass с базой из текстов
+    во временном каталоге (по умолчанию - из TEXTS).
+    """
+    def make(texts: list = TEXTS, winnow_window: int = 1) -> AntiPlagiarismClass:
+        antiplagiarism = AntiPlagiarismClass(str(tmp_path), winnow_window)
+        for text in texts:
+            antiplagiarism.update_database_text(text)
+        return antiplagiarism
+
+    return make
@@ -0,0 +1,85 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import json
+import sys
+import pytest
+import Benchmark
+
+
+def test_generated_corpus_is_reproducible():
+    corpus = Benchmark.generate_corpus(3, 40, seed=5)
+    assert corpus == Benchmark.generate_corpus(3, 40, seed=5)
+    assert len(corpus) == 3
+    assert corpus != Benchmark.generate_corpus(3, 40, seed=6)
+
+
+def test_fixture_is_loaded_from_json_and_directory(tmp_path, texts):
+    (tmp_path / "database.json").write_text(
+        json.dumps({"text1": texts[0], "text2": texts[1]}, ensure_ascii=False), encoding="utf-8")
+    assert Benchmark.load_fixture(str(tmp_path / "database.json")) == texts[:2]
+    directory = tmp_path / "texts"
+    directory.mkdir()
+    (directory / "b.txt").write_text(texts[1], encoding="utf-8")
+    (directory / "a.txt").write_text(texts[0], encoding="utf-8")
+    (directory / "notes.md").write_text("не текст", encoding="utf-8")
+    assert Benchmark.load_fixture(str(directory)) == texts[:2]
+
+
+def test_pattern_is_half_copied(texts):
+    pattern = Benchmark.make_pattern(texts, 20, seed=1)
+    words = pattern.split()
+    assert len(words) >= 20
+    assert " ".join(words[:10]) in " ".join(" ".join(text.split()) for text in texts)
+
+
+def test_run_benchmarks_reports_every_stage(texts):
+    results = Benchmark.run_benchmarks(texts, [3], [30], [3], ["KMP", "words"], repeat=1, seed=1,
+                                       trace_memory=False)
+    stages = [(result["stage"], result["method"]) for result in results]
+    assert stages == [("make_canonical", None), ("create_shingles", None), ("search", "KMP"), ("search", "words")]
+    for result in results:
+        assert result["seconds"] > 0
+        assert result["median_seconds"] >= result["seconds"]
+        assert result["peak_memory_bytes"] is None
+    assert results[2]["corpus_size"] == 3
+
+
+def test_measure_traces_memory():
+    result = Benchmark.measure(lambda: bytearray(1 << 20), repeat=2)
+    assert result["peak_memory_bytes"] >= 1 << 20
+
+
+def test_search_methods_take_no_arguments():
+    methods = Benchmark.get_search_methods()
+    assert "KMP" in methods and "SAM" in methods
+    assert "parallel" not in methods and "lsh" not in methods
+
+
+def test_regressions_are_reported():
+    def result(method: str, seconds: float) -> dict:
+        return {"stage": "search", "method": method, "corpus_size": 10, "pattern_length": 100,
+                "shingle_size": 3, "seconds": seconds}
+
+    baseline = [result("KMP", 0.1), result("AC", 0.1), result("RK", 0.0001)]
+    regressions = Benchmark.compare_with_baseline(
+        [result("KMP", 0.15), result("AC", 0.11), result("RK", 0.01)], baseline, tolerance=0.2)
+    assert [(regression["method"], regression["ratio"]) for regression in regressions] == [
+        ("KMP", pytest.approx(1.5))]
+
+
+def test_main_writes_report_and_fails_on_regression(tmp_path, monkeypatch):
+    output = tmp_path / "results.json"
+    arguments = ["Benchmark.py", "--corpus-sizes", "2", "--words-per-text", "40", "--pattern-lengths", "20",
+                 "--methods", "KMP", "--repeat", "1", "--no-memory", "--output", str(output)]
+    monkeypatch.setattr(sys, "argv", arguments)
+    assert Benchmark.main() == 0
+    report = json.loads(output.read_text(encoding="utf-8"))
+    assert [result["stage"] for result in report["results"]] == ["make_canonical", "create_shingles", "search"]
+    for result in report["results"]:
+        result["seconds"] = 1e-9 if result["stage"] == "search" else result["seconds"] * 1000
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(report), encoding="utf-8")
+    monkeypatch.setattr(sys, "argv", arguments + ["--baseline", str(baseline), "--min-seconds", "0"])
+    assert Benchmark.main() == 1
+    assert [regression["stage"] for regression in json.loads(output.read_text(encoding="utf-8"))["regressions"]] == [
+        "search"]
@@ -0,0 +1,84 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+from CanonicalCache import CanonicalCacheClass
+from ReadWriteDatabase import get_content_hash
+
+
+def open_cache(tmp_path, **kwargs) -> CanonicalCacheClass:
+    return CanonicalCacheClass(str(tmp_path / "cache.sqlite"), **kwargs)
+
+
+def test_entries_are_read_back(tmp_path):
+    cache = open_cache(tmp_path)
+    assert cache.get("a" * 32) is None
+    cache.put("a" * 32, "kit plyt sever", [3, 1, 2])
+    canonical_text, fingerprints = cache.get("a" * 32)
+    assert canonical_text == "kit plyt sever"
+    assert fingerprints.typecode == "Q" and fingerprints.tolist() == [3, 1, 2]
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert open_cache(tmp_path).get("a" * 32)[0] == "kit plyt sever"
+
+
+def test_other_settings_do_not_share_entries(tmp_path):
+    open_cache(tmp_path).put("a" * 32, "kit plyt sever", [1])
+    assert open_cache(tmp_path, shingle_size=4).get("a" * 32) is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = open_cache(tmp_path, max_bytes=44)
+    for key in "abc":
+        cache.put(key * 32, key * 4, [1])
+        if key == "b":
+            cache.get("a" * 32)
+    assert len(cache) == 3
+    cache.put("d" * 32, "dddd", [1, 2])
+    assert cache.get("b" * 32) is None
+    assert all(cache.get(key * 32) is not None for key in "acd")
+    cache.put("e" * 32, "e" * 100, [])
+    assert cache.get("e" * 32) is None
+    assert open_cache(tmp_path, max_bytes=44).total_bytes == cache.total_bytes <= 44
+
+
+def test_reads_are_recorded_in_batches(tmp_path, monkeypatch):
+    cache = open_cache(tmp_path)
+    for key in "ab":
+        cache.put(key * 32, key * 4, [1])
+    changes = cache.connection.total_changes
+    for _ in range(3):
+        assert cache.get("a" * 32) is not None
+    assert cache.connection.total_changes == changes
+    cache.flush()
+    assert cache.connection.total_changes == changes + 1
+    monkeypatch.setattr(CanonicalCacheClass, "TOUCH_BATCH_SIZE", 2)
+    cache.get("a" * 32)
+    assert cache.connection.total_changes == changes + 1
+    cache.get("b" * 32)
+    assert cache.connection.total_changes == changes + 3 and not cache.touched
+
+
+def test_content_hash_does_not_depend_on_chunks():
+    assert get_content_hash(["Кит плывет", " на север"]) == get_content_hash(["Кит плывет на север"])
+    assert get_content_hash(["Кит"]) != get_content_hash(["Скит"])
+
+
+def test_repeated_pattern_is_not_canonized_again(make_antiplagiarism, texts):
+    antiplagiarism = make_antiplagiarism(texts[:2])
+    antiplagiarism.enable_instrumentation()
+    antiplagiarism.set_pattern(texts[3])
+    first = antiplagiarism.canonical_pattern_object.text
+    assert antiplagiarism.pattern_stats.counters["canonical_cache_hits"] == 0
+    antiplagiarism.set_pattern(texts[3])
+    assert antiplagiarism.pattern_stats.counters["canonical_cache_hits"] == 1
+    assert "words_parsed" not in antiplagiarism.pattern_stats.counters
+    assert antiplagiarism.canonical_pattern_object.text == first
+    assert antiplagiarism.search_plagiarism_index()[0] == antiplagiarism.search_plagiarism_KMP()[0] == 100.0
+
+
+def test_only_checked_texts_are_cached(make_antiplagiarism, texts):
+    antiplagiarism = make_antiplagiarism(texts[:2])
+    assert len(antiplagiarism.canonical_cache) == 0
+    antiplagiarism.set_pattern(texts[3])
+    assert len(antiplagiarism.canonical_cache) == 1
+    antiplagiarism.update_database_text(texts[3])
+    assert antiplagiarism.canonical_cache.hits == 1
+    assert len(antiplagiarism.canonical_cache) == 1
@@ -0,0 +1,96 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import io
+import json
+import os
+import subprocess
+import sys
+import AntiPlagiarismCLI
+from AntiPlagiarism import AntiPlagiarismClass
+
+
+def test_directories_are_expanded(tmp_path):
+    (tmp_path / "texts" / "inner").mkdir(parents=True)
+    for path in ("texts/b.txt", "texts/inner/a.txt", "texts/notes.md", "extra.txt"):
+        (tmp_path / path).write_text("текст", encoding="utf-8")
+    assert AntiPlagiarismCLI.expand_paths([str(tmp_path / "extra.txt"), str(tmp_path / "texts")]) == [
+        str(tmp_path / "extra.txt"), str(tmp_path / "texts" / "b.txt"), str(tmp_path / "texts" / "inner" / "a.txt")]
+
+
+def test_progress_is_throttled():
+    stream = io.StringIO()
+    print_progress = AntiPlagiarismCLI.make_progress_printer(stream, interval=3600)
+    for done in range(1, 4):
+        print_progress(done, 3)
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 2
+    assert lines[0].startswith("1/3 files") and lines[1].startswith("3/3 files")
+
+
+def test_import_command(tmp_path, texts, capsys):
+    (tmp_path / "texts").mkdir()
+    for number, text in enumerate(texts[:3]):
+        (tmp_path / "texts" / f"{number}.txt").write_text(text, encoding="utf-8")
+    arguments = ["--data-directory", str(tmp_path), "import", str(tmp_path / "texts"), "--workers", "1", "--quiet"]
+    assert AntiPlagiarismCLI.main(arguments) == 0
+    assert json.loads(capsys.readouterr().out) == {"imported": 3, "skipped": 0, "duplicates": {}, "failed": {}}
+    (tmp_path / "texts" / "broken.txt").write_bytes(b"\xff\xfe\xfa")
+    assert AntiPlagiarismCLI.main(arguments) == 1
+    report = json.loads(capsys.readouterr().out)
+    assert (report["imported"], report["skipped"], list(report["failed"])) == (
+        0, 3, [str(tmp_path / "texts" / "broken.txt")])
+    assert AntiPlagiarismClass(str(tmp_path)).size_dict == 3
+
+
+def test_submissions_are_read_from_jsonl(tmp_path):
+    (tmp_path / "work.txt").write_text("текст", encoding="utf-8")
+    lines = [{"id": "a", "text": "Кит"}, {"path": "work.txt"}]
+    (tmp_path / "submissions.jsonl").write_text(
+        "\n".join(json.dumps(line, ensure_ascii=False) for line in lines) + "\n\n", encoding="utf-8")
+    assert list(AntiPlagiarismCLI.iter_submissions(str(tmp_path / "submissions.jsonl"))) == [
+        ("a", "Кит", None), ("2", None, str(tmp_path / "work.txt"))]
+
+
+def test_check_text(make_antiplagiarism, texts, new_sentence):
+    antiplagiarism = make_antiplagiarism()
+    antiplagiarism.enable_instrumentation()
+    result = AntiPlagiarismCLI.check_text(antiplagiarism, "work", texts[1] + " " + new_sentence, "KMP",
+                                          min_uniqueness=50.0, matches=3)
+    assert result["id"] == "work"
+    assert result["passed"] is False
+    assert result["matched_documents"][0]["name"] == "text2"
+    assert {"check", "search"} <= set(result["timings"])
+    result = AntiPlagiarismCLI.check_text(antiplagiarism, "new", new_sentence, "index")
+    assert (result["uniqueness"], result["matched_documents"]) == (100.0, [])
+    assert "passed" not in result
+
+
+def test_matched_documents_are_ranked(make_antiplagiarism, texts):
+    antiplagiarism = make_antiplagiarism()
+    antiplagiarism.set_pattern(texts[3] + " " + texts[0][:60])
+    matched = antiplagiarism.get_matched_documents()
+    assert [name for name, _ in matched] == ["text4", "text1"]
+    assert matched[0][1] > matched[1][1]
+    assert antiplagiarism.get_matched_documents(1) == matched[:1]
+
+
+def test_check_command(make_antiplagiarism, texts, new_sentence, tmp_path, capsys):
+    make_antiplagiarism()
+    lines = [{"id": "copy", "text": texts[2]}, {"id": "new", "text": new_sentence}, {"id": "lost", "path": "no.txt"}]
+    (tmp_path / "submissions.jsonl").write_text(
+        "\n".join(json.dumps(line, ensure_ascii=False) for line in lines), encoding="utf-8")
+    exit_code = AntiPlagiarismCLI.main(["--data-directory", str(tmp_path), "check", str(tmp_path / "submissions.jsonl"),
+                                        "--method", "AC", "--min-uniqueness", "80", "--workers", "1"])
+    assert exit_code == 1
+    results = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [result["id"] for result in results] == ["copy", "new", "lost"]
+    assert (results[0]["uniqueness"], results[0]["passed"]) == (0.0, False)
+    assert (results[1]["uniqueness"], results[1]["passed"]) == (100.0, True)
+    assert results[2]["error"].startswith("FileNotFoundError")
+
+
+def test_cli_does_not_import_tkinter():
+    code = "import sys, AntiPlagiarismCLI; print('tkinter' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(AntiPlagiarismCLI.__file__)))
+    assert result.stdout == "False\n"
@@ -0,0 +1,88 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import pytest
+
+
+def write_texts(directory, texts: list) -> list:
+    directory.mkdir(exist_ok=True)
+    paths = []
+    for number, text in enumerate(texts):
+        path = directory / f"{number}.txt"
+        path.write_text(text, encoding="utf-8")
+        paths.append(str(path))
+    return paths
+
+
+def test_files_are_imported_in_order(make_antiplagiarism, texts, tmp_path):
+    antiplagiarism = make_antiplagiarism(texts[:1])
+    paths = write_texts(tmp_path / "texts", texts[1:4])
+    progress = []
+    report = antiplagiarism.import_files(paths, max_workers=2, batch_size=2,
+                                         progress=lambda done, total: progress.append((done, total)))
+    assert report == {"imported": 3, "skipped": 0, "duplicates": {}, "failed": {}}
+    assert progress == [(1, 3), (2, 3), (3, 3)]
+    assert antiplagiarism.text_names == ["text1", "text2", "text3", "text4"]
+    assert [antiplagiarism.database.get_text(name) for name in antiplagiarism.text_names] == texts[:4]
+    assert antiplagiarism.database.get_imported_paths() == set(paths)
+    antiplagiarism.set_pattern(texts[3])
+    assert antiplagiarism.search_plagiarism_index()[0] == 0.0
+
+
+def test_imported_files_are_skipped(make_antiplagiarism, texts, tmp_path):
+    antiplagiarism = make_antiplagiarism([])
+    paths = write_texts(tmp_path / "texts", texts[:3])
+    antiplagiarism.import_files(paths[:2], max_workers=1)
+    report = antiplagiarism.import_files(paths + paths[:1], max_workers=1)
+    assert report == {"imported": 1, "skipped": 2, "duplicates": {}, "failed": {}}
+    assert antiplagiarism.size_dict == 3
+
+
+def test_unreadable_files_are_reported(make_antiplagiarism, texts, tmp_path):
+    antiplagiarism = make_antiplagiarism([])
+    paths = write_texts(tmp_path / "texts", texts[:2])
+    broken = tmp_path / "texts" / "broken.txt"
+    broken.write_bytes(b"\xff\xfe\xfa")
+    missing = str(tmp_path / "texts" / "missing.txt")
+    report = antiplagiarism.import_files([paths[0], str(broken), missing, paths[1]], max_workers=1)
+    assert report["imported"] == 2
+    assert set(report["failed"]) == {str(broken), missing}
+    assert antiplagiarism.text_names == ["text1", "text2"]
+    assert antiplagiarism.database.get_imported_paths() == set(paths)
+
+
+def test_interrupted_import_is_resumed(make_antiplagiarism, texts, tmp_path, monkeypatch):
+    antiplagiarism = make_antiplagiarism([])
+    paths = write_texts(tmp_path / "texts", texts)
+    appended = []
+
+    def append_chunks(chunks):
+        if len(appended) == 2:
+            raise KeyboardInterrupt
+        appended.append(list(chunks))
+        original_append_chunks(appended[-1])
+
+    original_append_chunks = antiplagiarism.canonical_text.append_chunks
+    monkeypatch.setattr(antiplagiarism.canonical_text, "append_chunks", append_chunks)
+    with pytest.raises(KeyboardInterrupt):
+        antiplagiarism.import_files(paths, max_workers=1, batch_size=3)
+    monkeypatch.undo()
+
+    reopened = make_antiplagiarism([])
+    assert len(reopened.canonical_text) == 3
+    report = reopened.import_files(paths, max_workers=1, batch_size=3)
+    assert report == {"imported": 2, "skipped": 3, "duplicates": {}, "failed": {}}
+    assert [reopened.database.get_text(name) for name in reopened.text_names] == texts
+    for text in texts:
+        reopened.set_pattern(text)
+        assert reopened.search_plagiarism_index()[0] == 0.0
+        assert reopened.search_plagiarism_KMP(presence_only=True)[0] == 0.0
+
+
+def test_duplicates_are_reported_and_journaled(make_antiplagiarism, texts, tmp_path):
+    antiplagiarism = make_antiplagiarism(texts[:1])
+    paths = write_texts(tmp_path / "texts", [texts[1], texts[0], texts[1]])
+    report = antiplagiarism.import_files(paths, max_workers=1)
+    assert report == {"imported": 1, "skipped": 0, "duplicates": {paths[1]: "text1", paths[2]: "text2"},
+                      "failed": {}}
+    assert antiplagiarism.text_names == ["text1", "text2"]
+    assert antiplagiarism.import_files(paths, max_workers=1)["skipped"] == 3
@@ -0,0 +1,100 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import pytest
+from AntiPlagiarism import AntiPlagiarismClass
+
+
+def write_txt(path, text: str) -> str:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def open_antiplagiarism(path) -> AntiPlagiarismClass:
+    path.mkdir(exist_ok=True)
+    return AntiPlagiarismClass(str(path))
+
+
+def test_chunked_ingestion_matches_whole(tmp_path, texts, new_sentence):
+    text = " ".join(texts)
+    txt_file_path = write_txt(tmp_path / "text.txt", text)
+    whole = open_antiplagiarism(tmp_path / "whole")
+    whole.update_database_text(text)
+    chunked = open_antiplagiarism(tmp_path / "chunked")
+    chunked.update_database_from_txt(txt_file_path, chunk_size=64)
+    assert chunked.canonical_text[0] == whole.canonical_text[0]
+    assert chunked.database.get_text("text1") == text
+    assert "text1" in chunked.shingle_index.documents
+    assert "text1" in chunked.minhash_index.signatures
+    for antiplagiarism in (whole, chunked):
+        antiplagiarism.set_pattern(texts[2] + " " + new_sentence)
+    for method in ("KMP", "AC", "index", "words", "SAM"):
+        assert getattr(chunked, f"search_plagiarism_{method}")()[0] == pytest.approx(
+            getattr(whole, f"search_plagiarism_{method}")()[0])
+
+
+def test_chunked_text_survives_restart(tmp_path, texts):
+    txt_file_path = write_txt(tmp_path / "text.txt", " ".join(texts))
+    antiplagiarism = open_antiplagiarism(tmp_path / "data")
+    antiplagiarism.update_database_from_txt(txt_file_path, chunk_size=64)
+    reopened = open_antiplagiarism(tmp_path / "data")
+    reopened.set_pattern(texts[3])
+    assert reopened.search_plagiarism_index()[0] == 0.0
+    assert reopened.search_plagiarism_KMP()[0] == 0.0
+
+
+def test_directory_is_ingested(tmp_path, texts):
+    for number, text in enumerate(texts[:3]):
+        write_txt(tmp_path / "texts" / f"part{number // 2}" / f"{number}.txt", text)
+    antiplagiarism = AntiPlagiarismClass(str(tmp_path))
+    report = antiplagiarism.update_database_from_directory(str(tmp_path / "texts"), chunk_size=64)
+    assert report == {"added": 3, "duplicates": {}}
+    assert [antiplagiarism.database.get_text(name) for name in antiplagiarism.text_names] == texts[:3]
+    copy_path = write_txt(tmp_path / "texts" / "part1" / "copy.txt", texts[0])
+    report = antiplagiarism.update_database_from_directory(str(tmp_path / "texts"), chunk_size=64)
+    assert report["added"] == 0
+    assert report["duplicates"][copy_path] == "text1"
+    assert len(report["duplicates"]) == 4
+    assert len(antiplagiarism.text_names) == 3
+
+
+def test_duplicate_texts_are_not_stored_twice(tmp_path, texts):
+    antiplagiarism = open_antiplagiarism(tmp_path / "data")
+    assert antiplagiarism.update_database_text(texts[0]) == "text1"
+    assert antiplagiarism.update_database_text(texts[1]) == "text2"
+    assert antiplagiarism.update_database_text(texts[0]) == "text1"
+    txt_file_path = write_txt(tmp_path / "text.txt", texts[1])
+    assert antiplagiarism.update_database_from_txt(txt_file_path, chunk_size=64) == "text2"
+    long_file_path = write_txt(tmp_path / "long.txt", " ".join(texts))
+    assert antiplagiarism.update_database_from_txt(long_file_path, chunk_size=64) == "text3"
+    assert antiplagiarism.update_database_from_txt(long_file_path, chunk_size=32) == "text3"
+    assert antiplagiarism.update_database_text(" ".join(texts)) == "text3"
+    assert antiplagiarism.size_dict == 3
+    assert open_antiplagiarism(tmp_path / "data").text_names == ["text1", "text2", "text3"]
+
+
+def test_text_hashes_are_backfilled(tmp_path, texts):
+    antiplagiarism = open_antiplagiarism(tmp_path / "data")
+    antiplagiarism.update_database_text(texts[0])
+    with antiplagiarism.database.connection:
+        antiplagiarism.database.connection.execute("DELETE FROM text_hashes")
+    reopened = open_antiplagiarism(tmp_path / "data")
+    assert reopened.update_database_text(texts[0]) == "text1"
+
+
+def test_failed_index_update_keeps_names_unique(tmp_path, texts, monkeypatch):
+    antiplagiarism = open_antiplagiarism(tmp_path / "data")
+    antiplagiarism.update_database_text(texts[0])
+    shingle_index = antiplagiarism.shingle_index
+
+    def fail(name, chunks):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(shingle_index, "add_document_chunks", fail)
+    with pytest.raises(OSError):
+        antiplagiarism.update_database_text(texts[1])
+    assert antiplagiarism.text_names == ["text1", "text2"]
+    assert "text2" in antiplagiarism.minhash_index.signatures
+    assert antiplagiarism.update_database_text(texts[2]) == "text3"
+    assert antiplagiarism.shingle_index is not shingle_index
+    assert set(antiplagiarism.shingle_index.documents) == {"text1", "text2", "text3"}
@@ -0,0 +1,186 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import random
+import threading
+import pytest
+from ClassBM import BM_StringSearch
+from ClassNumpyRK import NumpyRK_StringSearch
+from ClassRK import RK_MultiStringSearch, RK_StringSearch
+from Instrumentation import NULL_STATS, ProgressClass, SearchCancelled, StatsClass
+
+
+def test_stats_accumulate_and_merge():
+    stats = StatsClass()
+    with stats.timer("search"):
+        sum(range(1000))
+    with stats.timer("search"):
+        pass
+    stats.count("texts_scanned")
+    stats.count("texts_scanned", 4)
+    other = StatsClass()
+    other.count("texts_scanned", 2)
+    with other.timer("parsing"):
+        pass
+    stats.merge(other)
+    result = stats.as_dict()
+    assert result["counters"] == {"texts_scanned": 7}
+    assert set(result["timers"]) == {"search", "parsing"}
+    assert result["timers"]["search"]["wall_seconds"] > 0
+    assert result["peak_memory_bytes"] is None and result["profile"] is None
+
+
+def test_capture_profiles_and_traces_memory():
+    stats = StatsClass()
+    with stats.capture(profile=True, trace_memory=True):
+        bytearray(1 << 20)
+    assert stats.peak_memory_bytes >= 1 << 20
+    assert "function calls" in stats.profile
+
+
+def test_null_stats_collect_nothing():
+    with NULL_STATS.timer("search"):
+        NULL_STATS.count("texts_scanned")
+    NULL_STATS.merge(StatsClass())
+    assert NULL_STATS.counters == {} and NULL_STATS.timers == {}
+    assert NULL_STATS.as_dict() == {}
+
+
+def test_rk_counts_only_failed_verifications():
+    rng = random.Random(5)
+    text = "".join(rng.choice("abcdef") for _ in range(3000))
+    search_object = RK_StringSearch("abc", mod=7)
+    positions = search_object.get_substring_rk(text)
+    hash_hits = sum(search_object._hash(text[index:index + 3]) == search_object.pattern_hash
+                    for index in range(len(text) - 2))
+    assert search_object.collisions == hash_hits - len(positions) > 0
+
+
+def test_rk_multi_counts_only_hash_collisions():
+    search_object = RK_MultiStringSearch(["ab", "abcd"])
+    assert search_object.get_substring_rk("abxxab") == {"ab": [0, 4]}
+    assert search_object.collisions == 0
+    rng = random.Random(5)
+    text = "".join(rng.choice("abcdef") for _ in range(3000)).encode()
+    patterns = ["abc", "fedc", "ab"]
+    search_object = RK_MultiStringSearch(patterns, mod=7)
+    search_object.get_substring_rk(text)
+    prefixes = [pattern[:2].encode() for pattern in patterns]
+    hash_collisions = sum(search_object._hash(text[index:index + 2]) == search_object._hash(prefix)
+                          and text[index:index + 2] != prefix
+                          for index in range(len(text) - 1) for prefix in prefixes)
+    assert search_object.collisions == hash_collisions > 0
+
+
+def test_numpy_rk_does_not_count_prefix_matches():
+    search_object = NumpyRK_StringSearch(["ab", "abcd"])
+    assert search_object.get_substring_np("abxxab") == {"ab": [0, 4]}
+    assert search_object.collisions == 0
+
+
+def test_bm_counts_shifts():
+    search_object = BM_StringSearch("abc")
+    search_object.get_substring_bm_bad_character("xxxxxxxxxabc")
+    assert search_object.shift_count > 0
+
+
+def test_checks_are_not_recorded_by_default(make_antiplagiarism, texts):
+    antiplagiarism = make_antiplagiarism(texts[:2])
+    antiplagiarism.set_pattern(texts[0])
+    antiplagiarism.search_plagiarism_KMP()
+    assert antiplagiarism.last_stats is None
+
+
+@pytest.mark.parametrize("method, scans_texts", [("KMP", False), ("AC", True), ("RK_multi", True)])
+def test_check_counters(make_antiplagiarism, texts, new_sentence, method, scans_texts):
+    antiplagiarism = make_antiplagiarism()
+    exported = []
+    antiplagiarism.enable_instrumentation(exported.append)
+    antiplagiarism.set_pattern(texts[1] + " " + new_sentence)
+    shingles_count = len(antiplagiarism.canonical_pattern_object.create_shingles())
+    result = getattr(antiplagiarism, f"search_plagiarism_{method}")()
+    antiplagiarism.disable_instrumentation()
+    assert result == getattr(antiplagiarism, f"search_plagiarism_{method}")()
+    assert exported == [antiplagiarism.last_stats]
+    stats = exported[0]
+    assert {"parsing", "shingling", "preprocessing", "search", "check"} <= set(stats.timers)
+    assert stats.counters["words_parsed"] == len((texts[1] + " " + new_sentence).split())
+    assert stats.counters["shingles_generated"] == shingles_count
+    assert stats.counters["shingle_text_searches"] == shingles_count * len(texts)
+    assert stats.counters.get("texts_scanned") == (len(texts) if scans_texts else None)
+
+
+def test_candidate_and_match_counters(make_antiplagiarism, texts, new_sentence):
+    antiplagiarism = make_antiplagiarism()
+    antiplagiarism.enable_instrumentation()
+    antiplagiarism.set_pattern(texts[1] + " " + new_sentence)
+    antiplagiarism.search_plagiarism_lsh("KMP")
+    assert antiplagiarism.last_stats.counters["candidate_texts"] == 1
+    antiplagiarism.search_plagiarism_SAM()
+    assert antiplagiarism.last_stats.counters["maximal_matches"] == 1
+
+
+def test_progress_is_throttled_and_finished():
+    reports = []
+    progress = ProgressClass(lambda done, total: reports.append((done, total)), interval=3600)
+    progress.add_total(10)
+    for _ in range(4):
+        progress.advance()
+    progress.finish()
+    assert reports == [(1, 10), (10, 10)]
+
+
+def test_progress_raises_when_cancelled():
+    cancel_event = threading.Event()
+    progress = ProgressClass(cancel_event=cancel_event)
+    progress.advance()
+    cancel_event.set()
+    with pytest.raises(SearchCancelled):
+        progress.advance()
+
+
+@pytest.mark.parametrize("method, units", [("KMP", "pairs"), ("AC", "texts"), ("words", "texts")])
+def test_check_reports_progress(make_antiplagiarism, texts, method, units):
+    antiplagiarism = make_antiplagiarism()
+    antiplagiarism.set_pattern(texts[2])
+    shingles_count = len(antiplagiarism.canonical_pattern_object.create_shingles())
+    expected = getattr(antiplagiarism, f"search_plagiarism_{method}")()
+    reports = []
+    assert getattr(antiplagiarism, f"search_plagiarism_{method}")(
+        progress=lambda done, total: reports.append((done, total))) == expected
+    total = shingles_count * len(texts) if units == "pairs" else len(texts)
+    assert reports[-1] == (total, total)
+    assert [done for done, _ in reports] == sorted(done for done, _ in reports)
+
+
+@pytest.mark.parametrize("method", ["KMP", "RK_multi", "words", "index", "SAM"])
+def test_cancelled_check_raises(make_antiplagiarism, texts, method):
+    antiplagiarism = make_antiplagiarism()
+    antiplagiarism.set_pattern(texts[2])
+    cancel_event = threading.Event()
+    cancel_event.set()
+    with pytest.raises(SearchCancelled):
+        getattr(antiplagiarism, f"search_plagiarism_{method}")(cancel_event=cancel_event)
+
+
+def test_cancelled_build_leaves_no_cache(make_antiplagiarism, texts):
+    antiplagiarism = make_antiplagiarism()
+    antiplagiarism.set_pattern(texts[2])
+    cancel_event = threading.Event()
+
+    def cancel(done, total):
+        if done:
+            cancel_event.set()
+
+    with pytest.raises(SearchCancelled):
+        antiplagiarism.search_plagiarism_words(progress=cancel, cancel_event=cancel_event)
+    assert antiplagiarism.canonical_tokens is None and antiplagiarism.canonical_shingles is None
+    assert antiplagiarism.search_plagiarism_words()[0] == 0.0
+
+
+def test_parallel_search_is_cancelled(make_antiplagiarism, texts):
+    antiplagiarism = make_antiplagiarism()
+    antiplagiarism.set_pattern(texts[2])
+    cancel_event = threading.Event()
+    cancel_event.set()
+    with pytest.raises(SearchCancelled):
+        antiplagiarism.search_plagiarism_parallel("KMP", max_workers=1, shard_size=1, cancel_event=cancel_event)
@@ -0,0 +1,76 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import pytest
+from MinHash import MinHashIndexClass
+from TextCanonization import CanonicalTextClass, get_text_fingerprints
+
+
+def canonical(text: str) -> str:
+    return CanonicalTextClass(text).make_canonical()
+
+
+def test_identical_documents_have_equal_signatures(tmp_path, texts):
+    index = MinHashIndexClass(str(tmp_path / "minhash.jsonl"))
+    fingerprints = get_text_fingerprints(canonical(texts[0]), 3)
+    first = index.compute_signature(fingerprints)
+    assert index.estimate_similarity(first, index.compute_signature(list(reversed(fingerprints)))) == 1.0
+    other = index.compute_signature(get_text_fingerprints(canonical(texts[1]), 3))
+    assert index.estimate_similarity(first, other) < 0.2
+
+
+def test_query_finds_similar_documents(tmp_path, texts, new_sentence):
+    index = MinHashIndexClass(str(tmp_path / "minhash.jsonl"))
+    index.synchronize((f"text{number}", canonical(text)) for number, text in enumerate(texts, 1))
+    similar = index.query(get_text_fingerprints(canonical(texts[2]), 3))
+    assert similar == {"text3": 1.0}
+    assert index.query(get_text_fingerprints(canonical(new_sentence), 3)) == {}
+    assert index.query([]) == {}
+
+
+def test_index_is_loaded_from_file(tmp_path, texts):
+    path = str(tmp_path / "minhash.jsonl")
+    index = MinHashIndexClass(path)
+    index.add_document("text1", canonical(texts[0]))
+    reopened = MinHashIndexClass(path)
+    assert set(reopened.signatures) == {"text1"}
+    assert (reopened.signatures["text1"] == index.signatures["text1"]).all()
+    assert set(MinHashIndexClass(path, bands=32).signatures) == set()
+
+
+def test_bands_must_divide_signature():
+    with pytest.raises(ValueError):
+        MinHashIndexClass("unused.jsonl", num_permutations=128, bands=48)
+
+
+@pytest.mark.parametrize("method", ["KMP", "AC"])
+def test_lsh_search_limits_candidates(make_antiplagiarism, texts, new_sentence, method):
+    antiplagiarism = make_antiplagiarism()
+    antiplagiarism.set_pattern(texts[3] + " " + new_sentence)
+    uniqueness, counter = antiplagiarism.search_plagiarism_lsh(method)
+    assert uniqueness == pytest.approx(antiplagiarism.search_plagiarism_KMP()[0])
+    assert len(counter) == len(antiplagiarism.search_plagiarism_KMP()[1])
+    antiplagiarism.set_pattern(new_sentence)
+    assert antiplagiarism.search_plagiarism_lsh(method) == (100.0, [])
+
+
+def test_torn_last_line_is_cut(tmp_path, texts):
+    path = tmp_path / "minhash.jsonl"
+    index = MinHashIndexClass(str(path))
+    index.add_document("text1", canonical(texts[0]))
+    size = path.stat().st_size
+    with open(path, "ab") as file:
+        file.write(b'{"name": "text2", "signature": [1, 2')
+    reopened = MinHashIndexClass(str(path))
+    assert set(reopened.signatures) == {"text1"}
+    assert path.stat().st_size == size
+    reopened.add_document("text2", canonical(texts[1]))
+    assert set(MinHashIndexClass(str(path)).signatures) == {"text1", "text2"}
+
+
+def test_lsh_search_skips_unknown_documents(make_antiplagiarism, texts):
+    antiplagiarism = make_antiplagiarism(texts[:2])
+    antiplagiarism.minhash_index.add_document("text99", canonical(texts[3]))
+    antiplagiarism.set_pattern(texts[3])
+    assert antiplagiarism.search_plagiarism_lsh("KMP") == (100.0, [])
+    antiplagiarism.set_pattern(texts[0])
+    assert antiplagiarism.search_plagiarism_lsh("KMP")[0] == 0.0
@@ -0,0 +1,87 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import pytest
+from PackedCorpus import PackedCorpusClass
+
+
+def open_corpus(tmp_path) -> PackedCorpusClass:
+    return PackedCorpusClass(str(tmp_path / "corpus.bin"), str(tmp_path / "corpus.idx"))
+
+
+def test_texts_are_read_back(tmp_path):
+    corpus = open_corpus(tmp_path)
+    for text in ("kit plyt sever", "", "reka"):
+        corpus.append(text)
+    assert len(corpus) == 3
+    assert list(corpus) == ["kit plyt sever", "", "reka"]
+    assert corpus[-1] == "reka"
+    assert bytes(corpus.get_bytes(0)) == b"kit plyt sever"
+    assert [bytes(text) for text in corpus.iter_bytes()] == [b"kit plyt sever", b"", b"reka"]
+    with pytest.raises(IndexError):
+        corpus[3]
+
+
+def test_corpus_is_reopened(tmp_path):
+    corpus = open_corpus(tmp_path)
+    corpus.append("pervyi")
+    corpus.append("vtoroi")
+    assert list(open_corpus(tmp_path)) == ["pervyi", "vtoroi"]
+
+
+def test_torn_tail_is_truncated(tmp_path):
+    corpus = open_corpus(tmp_path)
+    corpus.append("pervyi")
+    corpus.append("vtoroi")
+    with open(tmp_path / "corpus.bin", "ab") as file:
+        file.write(b"nedopisannyi")
+    with open(tmp_path / "corpus.idx", "ab") as file:
+        file.write(b"\x01\x02\x03")
+    reopened = open_corpus(tmp_path)
+    assert list(reopened) == ["pervyi", "vtoroi"]
+    reopened.append("tretii")
+    assert list(open_corpus(tmp_path)) == ["pervyi", "vtoroi", "tretii"]
+
+
+def test_text_is_appended_in_chunks(tmp_path):
+    corpus = open_corpus(tmp_path)
+    corpus.append_chunks(["kit plyt", "", "sever bystro"])
+    assert list(corpus) == ["kit plyt sever bystro"]
+    assert list(corpus.iter_text_chunks(0, chunk_size=6)) == ["kit", "plyt", "sever", "bystro"]
+    assert list(corpus.iter_text_chunks(0, chunk_size=2)) == ["kit", "plyt", "sever", "bystro"]
+
+
+def test_failed_append_is_rolled_back(tmp_path):
+    corpus = open_corpus(tmp_path)
+    corpus.append("pervyi")
+    with pytest.raises(RuntimeError):
+        with corpus.appending() as write:
+            write("nedopisannyi")
+            raise RuntimeError
+    corpus.append("vtoroi")
+    assert list(open_corpus(tmp_path)) == ["pervyi", "vtoroi"]
+
+
+def test_clear(tmp_path):
+    corpus = open_corpus(tmp_path)
+    corpus.append("pervyi")
+    corpus.clear()
+    assert len(corpus) == 0
+    assert len(open_corpus(tmp_path)) == 0
+
+
+def test_missing_documents_are_appended_on_start(make_antiplagiarism, texts, tmp_path):
+    antiplagiarism = make_antiplagiarism(texts[:2])
+    antiplagiarism.canonical_text.clear()
+    reopened = make_antiplagiarism([])
+    assert list(reopened.canonical_text) == [
+        reopened.database.get_canonical_text(name) for name in ("text1", "text2")]
+
+
+def test_reader_does_not_truncate(tmp_path):
+    corpus = open_corpus(tmp_path)
+    corpus.append("pervyi")
+    with open(tmp_path / "corpus.bin", "ab") as file:
+        file.write(b"dopisyvaetsia")
+    reader = PackedCorpusClass(str(tmp_path / "corpus.bin"), str(tmp_path / "corpus.idx"), writable=False)
+    assert list(reader) == ["pervyi"]
+    assert (tmp_path / "corpus.bin").read_bytes() == b"pervyidopisyvaetsia"
@@ -0,0 +1,116 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import json
+import sqlite3
+import pytest
+from AntiPlagiarism import AntiPlagiarismClass
+from ReadWriteDatabase import DatabaseClass, iter_json_lines, iter_txt_files, read_txt_chunks
+
+
+def test_texts_are_read_back_by_name(tmp_path):
+    database = DatabaseClass(str(tmp_path / "database.sqlite"))
+    database.add_text("text1", "Исходный текст", "iskhodnyi tekst")
+    database.add_text("text2", "Второй текст", "vtoroi tekst")
+    assert database.size() == 2
+    assert database.get_text("text2") == "Второй текст"
+    assert database.get_canonical_text("text1") == "iskhodnyi tekst"
+    assert database.get_text("text3") is None
+    assert list(database.iter_canonical_texts()) == [
+        ("text1", "iskhodnyi tekst"), ("text2", "vtoroi tekst")]
+
+
+def test_names_are_unique(tmp_path):
+    database = DatabaseClass(str(tmp_path / "database.sqlite"))
+    database.add_text("text1", "a", "a")
+    with pytest.raises(sqlite3.IntegrityError):
+        database.add_text("text1", "b", "b")
+    assert database.size() == 1
+
+
+def test_json_files_are_migrated_once(tmp_path):
+    (tmp_path / "database.json").write_text(
+        json.dumps({"text1": "Первый", "text2": "Второй"}), encoding="utf-8")
+    (tmp_path / "canonicaldatabase.json").write_text(
+        json.dumps({"text1": "pervyi", "text2": "vtoroi"}), encoding="utf-8")
+    database = DatabaseClass(str(tmp_path / "database.sqlite"))
+    assert database.migrate_from_json(
+        str(tmp_path / "database.json"), str(tmp_path / "canonicaldatabase.json")) == 2
+    assert database.migrate_from_json(
+        str(tmp_path / "database.json"), str(tmp_path / "canonicaldatabase.json")) == 0
+    assert database.get_text("text2") == "Второй"
+    assert database.get_canonical_text("text1") == "pervyi"
+
+
+def test_missing_json_is_not_migrated(tmp_path):
+    database = DatabaseClass(str(tmp_path / "database.sqlite"))
+    assert database.migrate_from_json(
+        str(tmp_path / "database.json"), str(tmp_path / "canonicaldatabase.json")) == 0
+    assert database.size() == 0
+
+
+def test_antiplagiarism_reopens_database(make_antiplagiarism, texts, tmp_path):
+    antiplagiarism = make_antiplagiarism(texts[:2])
+    assert antiplagiarism.text_names == ["text1", "text2"]
+    assert antiplagiarism.database.get_text("text2") == texts[1]
+    reopened = AntiPlagiarismClass(str(tmp_path))
+    assert reopened.size_dict == 2
+    assert list(reopened.canonical_text) == list(antiplagiarism.canonical_text)
+    reopened.set_pattern(texts[1])
+    assert reopened.search_plagiarism_KMP()[0] == 0.0
+
+
+def test_canonical_texts_from_offset(tmp_path):
+    database = DatabaseClass(str(tmp_path / "database.sqlite"))
+    for number in range(1, 4):
+        database.add_text(f"text{number}", "", f"tekst {number}")
+    assert list(database.iter_canonical_texts(2)) == [("text3", "tekst 3")]
+    assert database.get_names() == ["text1", "text2", "text3"]
+
+
+def test_txt_chunks_join_to_file(tmp_path, texts):
+    text = "\n".join(texts)
+    txt_file_path = tmp_path / "text.txt"
+    txt_file_path.write_text(text, encoding="utf-8")
+    chunks = list(read_txt_chunks(str(txt_file_path), chunk_size=64))
+    assert "".join(chunks) == text
+    assert len(chunks) > 1
+    for chunk in chunks[:-1]:
+        assert chunk[-1].isspace()
+
+
+def test_long_words_are_not_split(tmp_path):
+    text = "а" * 150 + " " + "б" * 70 + " в"
+    txt_file_path = tmp_path / "text.txt"
+    txt_file_path.write_text(text, encoding="utf-8")
+    chunks = list(read_txt_chunks(str(txt_file_path), chunk_size=64))
+    assert chunks == ["а" * 150 + " ", "б" * 70 + " ", "в"]
+
+
+def test_txt_files_are_found_recursively(tmp_path):
+    for path in ("b.txt", "a.TXT", "notes.md", "inner/c.txt"):
+        (tmp_path / path).parent.mkdir(exist_ok=True)
+        (tmp_path / path).write_text("текст", encoding="utf-8")
+    assert [path[len(str(tmp_path)) + 1:] for path in iter_txt_files(str(tmp_path))] == [
+        "a.TXT", "b.txt", "inner/c.txt"]
+
+
+def test_chunked_text_is_joined_on_read(tmp_path):
+    database = DatabaseClass(str(tmp_path / "database.sqlite"))
+    database.add_text("text1", "Кит", "kit")
+    database.add_text_chunks("text2", [("Первая часть. ", "pervyi chast"), ("Вторая.", "vtoroi")])
+    assert database.get_text("text2") == "Первая часть. Вторая."
+    assert database.get_canonical_text("text2") == "pervyi chast vtoroi"
+    assert list(database.iter_canonical_texts()) == [("text1", "kit"), ("text2", "pervyi chast vtoroi")]
+
+
+def test_json_lines_recover_from_torn_tail(tmp_path):
+    path = tmp_path / "records.jsonl"
+    path.write_bytes(b'{"a": 1}\n{"b": 2}\n{"c": ')
+    with open(path, "rb+") as file:
+        assert list(iter_json_lines(file)) == [(0, {"a": 1}), (9, {"b": 2})]
+    assert path.read_bytes() == b'{"a": 1}\n{"b": 2}\n'
+    path.write_bytes(b'{"a": 1}\n{"b": 2}')
+    with open(path, "rb+") as file:
+        assert [record for _, record in iter_json_lines(file)] == [{"a": 1}, {"b": 2}]
+        file.write(b'{"c": 3}\n')
+    assert path.read_bytes() == b'{"a": 1}\n{"b": 2}\n{"c": 3}\n'
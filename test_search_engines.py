@@ -0,0 +1,225 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import random
+import pytest
+from AntiPlagiarism import SEARCH_METHODS, get_match_limit, get_uniqueness
+from ClassAC import AC_StringSearch
+from ClassBM import BM_StringSearch
+from ClassKMP import KMP_StringSearch
+from ClassNumpyRK import NumpyRK_StringSearch
+from ClassRK import RK_MultiStringSearch, RK_StringSearch
+
+SINGLE_PATTERN_SEARCHES = [
+    (KMP_StringSearch, "get_substring_kmp"),
+    (BM_StringSearch, "get_substring_bm_bad_character"),
+    (BM_StringSearch, "get_substring_bm_good_suffix"),
+    (RK_StringSearch, "get_substring_rk"),
+]
+MULTI_PATTERN_SEARCHES = [
+    (AC_StringSearch, "get_substring_ac"),
+    (RK_MultiStringSearch, "get_substring_rk"),
+    (NumpyRK_StringSearch, "get_substring_np"),
+]
+
+
+def make_patterns(texts: list, new_sentence: str) -> list:
+    return [
+        texts[0],
+        texts[1] + " " + new_sentence,
+        texts[2][:150] + " " + new_sentence + " " + texts[4][-120:],
+        new_sentence,
+    ]
+
+
+def test_ac_reports_overlapping_patterns():
+    search_object = AC_StringSearch(["he", "she", "his", "hers", "he"])
+    assert search_object.get_substring_ac("ushers") == {"she": [1], "he": [2], "hers": [2]}
+    assert search_object.get_substring_ac("") == {}
+
+
+def find_all(pattern: str, text: str) -> list:
+    return [index for index in range(len(text) - len(pattern) + 1) if text.startswith(pattern, index)]
+
+
+@pytest.mark.parametrize("search_class, method_name", SINGLE_PATTERN_SEARCHES)
+def test_searcher_is_reused_across_texts(search_class, method_name):
+    rng = random.Random(3)
+    for _ in range(100):
+        pattern = "".join(rng.choice("ab") for _ in range(rng.randint(1, 4)))
+        search_object = search_class(pattern)
+        search = getattr(search_object, method_name)
+        found = False
+        for _ in range(5):
+            text = "".join(rng.choice("ab") for _ in range(rng.randint(0, 12)))
+            assert search(text) == find_all(pattern, text)
+            found = found or bool(find_all(pattern, text))
+            assert search_object.found == found
+
+
+@pytest.mark.parametrize("search_class, method_name", MULTI_PATTERN_SEARCHES)
+def test_multi_pattern_search_agrees_with_kmp(search_class, method_name):
+    rng = random.Random(7)
+    for _ in range(200):
+        patterns = ["".join(rng.choice("abc ") for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 6))]
+        text = "".join(rng.choice("abcd ") for _ in range(rng.randint(0, 60)))
+        expected = {pattern: KMP_StringSearch(pattern).get_substring_kmp(text) for pattern in patterns}
+        assert getattr(search_class(patterns), method_name)(text) == {
+            pattern: positions for pattern, positions in expected.items() if positions}
+
+
+def test_rk_multi_finds_patterns_of_different_lengths():
+    search_object = RK_MultiStringSearch(["ab", "abcd", "bcd", "d"])
+    assert search_object.get_substring_rk("abcdab") == {"ab": [0, 4], "abcd": [0], "bcd": [1], "d": [3]}
+    assert RK_MultiStringSearch([]).get_substring_rk("abc") == {}
+
+
+def test_numpy_rk_reads_memoryview():
+    search_object = NumpyRK_StringSearch(["ab", "abcd", "bcd", "d"])
+    assert search_object.get_substring_np(memoryview(b"abcdab")) == {"ab": [0, 4], "abcd": [0], "bcd": [1], "d": [3]}
+    assert search_object.get_substring_np(b"") == {}
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 3, 7])
+def test_numpy_rk_blocks_agree_with_kmp(monkeypatch, block_size):
+    monkeypatch.setattr(NumpyRK_StringSearch, "BLOCK_SIZE", block_size)
+    rng = random.Random(block_size)
+    for _ in range(50):
+        patterns = ["".join(rng.choice("ab") for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 4))]
+        text = "".join(rng.choice("ab") for _ in range(rng.randint(0, 40)))
+        expected = {pattern: KMP_StringSearch(pattern).get_substring_kmp(text) for pattern in patterns}
+        assert NumpyRK_StringSearch(patterns).get_substring_np(text) == {
+            pattern: positions for pattern, positions in expected.items() if positions}
+
+
+@pytest.mark.parametrize("method", SEARCH_METHODS + ("words",))
+def test_search_methods_agree(make_antiplagiarism, texts, new_sentence, method):
+    antiplagiarism = make_antiplagiarism()
+    for pattern in make_patterns(texts, new_sentence):
+        antiplagiarism.set_pattern(pattern)
+        uniqueness, counter = getattr(antiplagiarism, f"search_plagiarism_{method}")()
+        expected_uniqueness, expected_counter = antiplagiarism.search_plagiarism_KMP()
+        assert uniqueness == pytest.approx(expected_uniqueness)
+        assert len(counter) == len(expected_counter)
+
+
+def test_known_uniqueness(make_antiplagiarism, texts, new_sentence):
+    antiplagiarism = make_antiplagiarism()
+    antiplagiarism.set_pattern(texts[3])
+    assert antiplagiarism.search_plagiarism_AC()[0] == 0.0
+    antiplagiarism.set_pattern(new_sentence)
+    assert antiplagiarism.search_plagiarism_AC()[0] == 100.0
+
+
+def test_words_match_whole_words_only(make_antiplagiarism):
+    antiplagiarism = make_antiplagiarism(["Скит плывет быстро на север"])
+    antiplagiarism.set_pattern("Кит плывет быстро на север")
+    assert antiplagiarism.search_plagiarism_KMP()[0] == 0.0
+    assert antiplagiarism.search_plagiarism_words()[0] == 100.0
+
+
+def test_words_see_texts_added_after_first_search(make_antiplagiarism, texts):
+    antiplagiarism = make_antiplagiarism(texts[:2])
+    antiplagiarism.set_pattern(texts[4])
+    assert antiplagiarism.search_plagiarism_words()[0] == 100.0
+    antiplagiarism.update_database_text(texts[4])
+    assert antiplagiarism.search_plagiarism_words()[0] == 0.0
+
+
+@pytest.mark.parametrize("method", ["KMP", "AC"])
+def test_parallel_search_agrees(make_antiplagiarism, texts, new_sentence, method):
+    antiplagiarism = make_antiplagiarism()
+    try:
+        for pattern in make_patterns(texts, new_sentence):
+            antiplagiarism.set_pattern(pattern)
+            uniqueness, counter = antiplagiarism.search_plagiarism_parallel(method, max_workers=2, shard_size=2)
+            expected_uniqueness, expected_counter = getattr(antiplagiarism, f"search_plagiarism_{method}")()
+            assert uniqueness == pytest.approx(expected_uniqueness)
+            assert sorted(counter) == sorted(expected_counter)
+    finally:
+        antiplagiarism.close_search_executor()
+
+
+def test_parallel_search_options_and_pool_reuse(make_antiplagiarism, texts, new_sentence):
+    antiplagiarism = make_antiplagiarism(texts + texts[:2])
+    try:
+        for pattern in make_patterns(texts, new_sentence):
+            antiplagiarism.set_pattern(pattern)
+            expected = antiplagiarism.search_plagiarism_KMP(presence_only=True)[0]
+            assert antiplagiarism.search_plagiarism_parallel(
+                "KMP", max_workers=2, shard_size=2, presence_only=True)[0] == pytest.approx(expected)
+            for min_uniqueness in (10.0, 50.0, 90.0):
+                bound = antiplagiarism.search_plagiarism_parallel(
+                    "KMP", max_workers=2, shard_size=2, min_uniqueness=min_uniqueness)[0]
+                assert (bound >= min_uniqueness) == (expected >= min_uniqueness)
+        executor = antiplagiarism.search_executor
+        antiplagiarism.search_plagiarism_parallel("AC", max_workers=2, shard_size=2)
+        assert antiplagiarism.search_executor is executor
+        antiplagiarism.search_plagiarism_parallel("AC", max_workers=1, shard_size=2)
+        assert antiplagiarism.search_executor is not executor
+    finally:
+        antiplagiarism.close_search_executor()
+    assert antiplagiarism.search_executor is None
+
+
+@pytest.mark.parametrize("method", SEARCH_METHODS)
+def test_presence_only_counts_each_shingle_once(make_antiplagiarism, texts, new_sentence, method):
+    antiplagiarism = make_antiplagiarism(texts + texts[:2])
+    for pattern in make_patterns(texts, new_sentence):
+        antiplagiarism.set_pattern(pattern)
+        uniqueness, counter = getattr(antiplagiarism, f"search_plagiarism_{method}")(presence_only=True)
+        assert uniqueness == pytest.approx(antiplagiarism.search_plagiarism_KMP(presence_only=True)[0])
+        assert len(counter) <= len(antiplagiarism.canonical_pattern_object.create_shingles())
+    antiplagiarism.set_pattern(texts[0])
+    assert getattr(antiplagiarism, f"search_plagiarism_{method}")(presence_only=True)[0] == 0.0
+
+
+def test_uniqueness_is_clamped():
+    assert get_uniqueness(0, 4) == 100.0
+    assert get_uniqueness(3, 4) == 25.0
+    assert get_uniqueness(9, 4) == 0.0
+
+
+@pytest.mark.parametrize("text", ["Студент", "", "Студент пишет"])
+def test_pattern_without_shingles_is_unique(make_antiplagiarism, text):
+    antiplagiarism = make_antiplagiarism()
+    antiplagiarism.set_pattern(text)
+    for method in SEARCH_METHODS + ("index", "words", "SAM"):
+        assert getattr(antiplagiarism, f"search_plagiarism_{method}")()[0] == 100.0
+    assert antiplagiarism.search_plagiarism_lsh("KMP")[0] == 100.0
+    for method in SEARCH_METHODS:
+        assert getattr(antiplagiarism, f"search_plagiarism_{method}")(min_uniqueness=50.0)[0] == 100.0
+    assert get_uniqueness(0, 0) == 100.0
+    assert get_match_limit(0, 50.0) == 0
+
+
+@pytest.mark.parametrize("shingles_count", [1, 3, 7, 26, 100])
+def test_match_limit_agrees_with_uniqueness(shingles_count):
+    for min_uniqueness in (0.0, 100 / 3, 50.0, 70.0, 99.9, 100.0, 101.0):
+        match_limit = get_match_limit(shingles_count, min_uniqueness)
+        for matches_count in range(shingles_count + 1):
+            assert (matches_count <= match_limit) == (get_uniqueness(matches_count, shingles_count) >= min_uniqueness)
+
+
+@pytest.mark.parametrize("method", SEARCH_METHODS)
+def test_early_exit_bound(make_antiplagiarism, texts, new_sentence, method):
+    antiplagiarism = make_antiplagiarism()
+    for pattern in make_patterns(texts, new_sentence):
+        antiplagiarism.set_pattern(pattern)
+        exact = antiplagiarism.search_plagiarism_KMP(presence_only=True)[0]
+        for min_uniqueness in (0.0, 10.0, 50.0, 90.0, 100.0):
+            bound = getattr(antiplagiarism, f"search_plagiarism_{method}")(min_uniqueness=min_uniqueness)[0]
+            assert (bound >= min_uniqueness) == (exact >= min_uniqueness)
+            if bound >= min_uniqueness:
+                assert bound <= exact + 1e-9
+            else:
+                assert bound >= exact - 1e-9
+
+
+def test_early_exit_searches_less(make_antiplagiarism, texts):
+    antiplagiarism = make_antiplagiarism()
+    antiplagiarism.enable_instrumentation()
+    antiplagiarism.set_pattern(texts[4])
+    assert antiplagiarism.search_plagiarism_KMP(presence_only=True)[0] == 0.0
+    full_searches = antiplagiarism.last_stats.counters["shingle_text_searches"]
+    assert antiplagiarism.search_plagiarism_KMP(min_uniqueness=50.0)[0] < 50.0
+    assert antiplagiarism.last_stats.counters["shingle_text_searches"] < full_searches
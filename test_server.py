@@ -0,0 +1,186 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import http.client
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+import pytest
+from AntiPlagiarismServer import (MAX_REQUEST_BYTES, CheckServiceClass, ReadWriteLockClass, ServerMetricsClass,
+                                  create_server, get_percentiles, run_load_test)
+
+
+@pytest.fixture
+def service(make_antiplagiarism, texts, tmp_path):
+    """Сервис проверки над базой из первых трех текстов."""
+    make_antiplagiarism(texts[:3])
+    service = CheckServiceClass(str(tmp_path), workers=2, batch_size=10, batch_delay=0.2)
+    yield service
+    service.close()
+
+
+@pytest.fixture
+def base_url(service):
+    """Адрес HTTP-сервера сервиса на свободном порту."""
+    server = create_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def request_json(url: str, body: dict = None, data: bytes = None) -> tuple:
+    if body is not None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data), timeout=30) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        return error.code, json.loads(error.read())
+
+
+def test_percentiles():
+    assert get_percentiles(range(1, 101)) == {"p50": 50, "p95": 95, "p99": 99}
+    assert get_percentiles([3.0]) == {"p50": 3.0, "p95": 3.0, "p99": 3.0}
+    assert get_percentiles([]) == {"p50": None, "p95": None, "p99": None}
+
+
+def test_waiting_writer_blocks_new_readers():
+    lock = ReadWriteLockClass()
+    events = []
+    lock.acquire_read()
+    lock.acquire_read()
+
+    def write():
+        lock.acquire_write()
+        events.append("write")
+        lock.release_write()
+
+    def read():
+        lock.acquire_read()
+        events.append("read")
+        lock.release_read()
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    while not lock.writers_waiting:
+        time.sleep(0.001)
+    reader = threading.Thread(target=read)
+    reader.start()
+    time.sleep(0.05)
+    assert events == []
+    lock.release_read()
+    lock.release_read()
+    writer.join()
+    reader.join()
+    assert events == ["write", "read"]
+
+
+def test_metrics():
+    metrics = ServerMetricsClass()
+    metrics.record("check", 0.5)
+    metrics.record("check", 1.5, failed=True)
+    metrics.record_batch(3, 0.25)
+    metrics.record_batch(1, 0.75)
+    result = metrics.as_dict()
+    check = result["endpoints"]["check"]
+    assert (check["requests"], check["errors"], check["mean_seconds"], check["max_seconds"]) == (2, 1, 1.0, 1.5)
+    assert check["p50_seconds"] == 0.5
+    assert result["batches"] == {"count": 2, "documents": 4, "mean_size": 2.0, "max_size": 3, "mean_seconds": 0.5}
+
+
+def test_batch_addition(make_antiplagiarism, texts):
+    antiplagiarism = make_antiplagiarism(texts[:1])
+    names = antiplagiarism.update_database_texts([texts[1], texts[0], texts[2], texts[1]])
+    assert names == ["text2", "text1", "text3", "text2"]
+    assert antiplagiarism.size_dict == 3
+    reopened = make_antiplagiarism([])
+    assert [reopened.database.get_text(name) for name in reopened.text_names] == texts[:3]
+    reopened.set_pattern(texts[2])
+    assert reopened.search_plagiarism_index()[0] == 0.0
+
+
+def test_service_checks_and_adds(service, texts, new_sentence):
+    result = service.check({"id": "work", "text": texts[4], "method": "KMP", "min_uniqueness": 50})
+    assert (result["id"], result["passed"]) == ("work", True)
+    assert 50.0 <= result["uniqueness"] <= 100.0
+    names = []
+    adders = [threading.Thread(target=lambda text=text: names.append(service.add_documents([text])))
+              for text in (texts[3], texts[4])]
+    for thread in adders:
+        thread.start()
+    for thread in adders:
+        thread.join()
+    assert sorted(names) == [["text4"], ["text5"]]
+    assert service.metrics.as_dict()["batches"]["count"] == 1
+    for method in ("KMP", "index", "words", "SAM"):
+        assert service.check({"text": texts[4], "method": method})["uniqueness"] == 0.0
+    assert service.check({"text": new_sentence})["uniqueness"] == 100.0
+    with pytest.raises(ValueError):
+        service.check({"text": texts[0], "method": "parallel"})
+    with pytest.raises(ValueError):
+        service.add_documents([])
+
+
+def test_http_endpoints(base_url, texts):
+    assert request_json(f"{base_url}/health") == (200, {"status": "ok", "documents": 3})
+    status, result = request_json(f"{base_url}/check", {"id": "a", "text": texts[1]})
+    assert (status, result["uniqueness"], result["matched_documents"][0]["name"]) == (200, 0.0, "text2")
+    assert request_json(f"{base_url}/documents", {"texts": [texts[3], texts[1]]}) == (
+        200, {"names": ["text4", "text2"]})
+    assert request_json(f"{base_url}/check", {"text": 5})[0] == 400
+    assert request_json(f"{base_url}/check", data=b"[1, 2]")[0] == 400
+    connection = http.client.HTTPConnection(base_url[len("http://"):], timeout=30)
+    connection.request("POST", "/check", headers={"Content-Length": str(MAX_REQUEST_BYTES + 1)})
+    assert connection.getresponse().status == 413
+    connection.close()
+    assert request_json(f"{base_url}/unknown", {})[0] == 404
+    metrics = request_json(f"{base_url}/metrics")[1]
+    assert metrics["documents"] == 4
+    assert (metrics["endpoints"]["check"]["requests"], metrics["endpoints"]["check"]["errors"]) == (4, 3)
+    assert metrics["queues"] == {"checks": 0, "additions": 0}
+
+
+def test_load_test(base_url, texts, new_sentence):
+    report = run_load_test(base_url, [texts[0], new_sentence], requests_count=12, concurrency=3, add_ratio=0.25,
+                           seed=3)
+    endpoints = report["endpoints"]
+    assert sum(endpoint["requests"] for endpoint in endpoints.values()) == 12
+    assert all(endpoint["errors"] == 0 for endpoint in endpoints.values())
+    assert endpoints["check"]["p50_seconds"] <= endpoints["check"]["max_seconds"]
+    assert report["server"]["endpoints"]["check"]["requests"] == endpoints["check"]["requests"]
+    assert report["server"]["documents"] == 3 + ("documents" in endpoints)
+
+
+def test_pattern_without_shingles_is_checked(service):
+    for method in ("KMP", "index", "words", "SAM"):
+        assert service.check({"text": "Студент", "method": method})["uniqueness"] == 100.0
+
+
+@pytest.mark.parametrize("method, attribute", [("words", "canonical_shingles"), ("SAM", "suffix_automaton")])
+def test_caches_are_built_once_under_write_lock(service, texts, new_sentence, method, attribute):
+    antiplagiarism = service.antiplagiarism
+    encode_chunks = antiplagiarism.vocabulary.encode_chunks
+    encoded = []
+    antiplagiarism.vocabulary.encode_chunks = lambda chunks: encoded.append(1) or encode_chunks(chunks)
+    barrier = threading.Barrier(4)
+    results = []
+
+    def check():
+        barrier.wait()
+        results.append(service.check({"text": texts[1], "method": method})["uniqueness"])
+
+    threads = [threading.Thread(target=check) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(30)
+    assert results == [0.0] * 4
+    assert len(encoded) == 3
+    cache = getattr(antiplagiarism, attribute)
+    assert cache is not None
+    service.add_documents([new_sentence])
+    assert getattr(antiplagiarism, attribute) is cache
+    assert service.check({"text": new_sentence, "method": method})["uniqueness"] == 0.0
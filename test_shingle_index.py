@@ -0,0 +1,104 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import json
+from ShingleIndex import ShingleIndexClass
+from TextCanonization import get_text_fingerprints
+
+
+def test_index_agrees_with_string_search(make_antiplagiarism, texts, new_sentence):
+    antiplagiarism = make_antiplagiarism()
+    for pattern in (texts[0], texts[1] + " " + new_sentence, texts[2][:150] + " " + texts[4][-120:], new_sentence):
+        antiplagiarism.set_pattern(pattern)
+        assert antiplagiarism.search_plagiarism_index()[0] == antiplagiarism.search_plagiarism_KMP()[0]
+
+
+def test_index_matches_whole_words_only(make_antiplagiarism):
+    # Строковые алгоритмы находят шингл "kit plyt sever" внутри "skit plyt sever",
+    # индекс сравнивает шинглы целиком, как и поиск по словам.
+    antiplagiarism = make_antiplagiarism(["Скит плывет быстро на север"])
+    antiplagiarism.set_pattern("Кит плывет быстро на север")
+    assert antiplagiarism.search_plagiarism_KMP()[0] == 0.0
+    assert antiplagiarism.search_plagiarism_index()[0] == antiplagiarism.search_plagiarism_words()[0] == 100.0
+
+
+def test_lookup_returns_word_positions(tmp_path):
+    index = ShingleIndexClass(str(tmp_path / "index.jsonl"), 2)
+    index.add_document("text1", "a b c a b")
+    index.add_document("text2", "c a b")
+    fingerprint = get_text_fingerprints("a b", 2)[0]
+    assert index.lookup(fingerprint) == {"text1": [0, 3], "text2": [1]}
+    assert index.lookup(get_text_fingerprints("b a", 2)[0]) == {}
+
+
+def test_index_is_loaded_from_file(tmp_path):
+    path = str(tmp_path / "index.jsonl")
+    index = ShingleIndexClass(path, 2)
+    index.add_document("text1", "a b c a b")
+    index.add_document("text1", "x y z")
+    reopened = ShingleIndexClass(path, 2)
+    assert reopened.documents == {"text1"}
+    assert reopened.postings == index.postings
+
+
+def test_index_is_reset_when_shingle_size_changes(tmp_path):
+    path = str(tmp_path / "index.jsonl")
+    ShingleIndexClass(path, 2).add_document("text1", "a b c a b")
+    reopened = ShingleIndexClass(path, 3)
+    assert reopened.documents == set()
+    assert reopened.postings == {}
+
+
+def test_synchronize_adds_only_missing_documents(tmp_path):
+    index = ShingleIndexClass(str(tmp_path / "index.jsonl"), 2)
+    index.add_document("text1", "a b c")
+    index.synchronize([("text1", "x y z"), ("text2", "d e f")])
+    assert index.documents == {"text1", "text2"}
+    assert index.lookup(get_text_fingerprints("x y", 2)[0]) == {}
+    assert index.lookup(get_text_fingerprints("e f", 2)[0]) == {"text2": [1]}
+
+
+def test_database_additions_are_indexed(make_antiplagiarism, texts):
+    antiplagiarism = make_antiplagiarism(texts[:2])
+    antiplagiarism.update_database_text(texts[2])
+    antiplagiarism.set_pattern(texts[2])
+    assert antiplagiarism.search_plagiarism_index()[0] == 0.0
+    reopened = make_antiplagiarism([])
+    assert reopened.shingle_index.documents == {"text1", "text2", "text3"}
+
+
+def test_winnowed_index_detects_copied_passages(make_antiplagiarism, texts, new_sentence):
+    antiplagiarism = make_antiplagiarism(winnow_window=4)
+    assert antiplagiarism.shingle_index.window_size == 4
+    antiplagiarism.set_pattern(texts[3])
+    assert antiplagiarism.search_plagiarism_index()[0] == 0.0
+    antiplagiarism.set_pattern(new_sentence)
+    assert antiplagiarism.search_plagiarism_index()[0] == 100.0
+    antiplagiarism.set_pattern(texts[1] + " " + new_sentence)
+    assert 0.0 < antiplagiarism.search_plagiarism_index()[0] < 100.0
+
+
+def test_winnowing_report(make_antiplagiarism, texts):
+    antiplagiarism = make_antiplagiarism()
+    antiplagiarism.set_pattern(texts[2])
+    report = antiplagiarism.get_winnowing_report(4)
+    assert report["winnowed_size"] < report["full_size"]
+    assert report["guarantee_threshold"] == 6
+    assert report["document_recall"] == 1.0
+    assert report["full_matched_share"] == 1.0
+    assert antiplagiarism.get_winnowing_report(1)["size_ratio"] == 1.0
+
+
+def test_unfinished_document_is_cut_on_load(tmp_path):
+    path = tmp_path / "index.jsonl"
+    index = ShingleIndexClass(str(path), 2)
+    index.add_document("text1", "a b c")
+    size = path.stat().st_size
+    with open(path, "a", encoding="utf-8") as file:
+        file.write(json.dumps({"name": "text2", "fingerprints": [1, 2], "start": 0, "more": True}) + "\n")
+        file.write('{"name": "text2", "fingerp')
+    reopened = ShingleIndexClass(str(path), 2)
+    assert reopened.documents == {"text1"}
+    assert reopened.postings == index.postings
+    assert path.stat().st_size == size
+    reopened.add_document("text2", "d e f")
+    assert ShingleIndexClass(str(path), 2).documents == {"text1", "text2"}
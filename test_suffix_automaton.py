@@ -0,0 +1,61 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import random
+import pytest
+from SuffixAutomaton import SuffixAutomatonClass
+
+
+def longest_match(documents: list, words: list, end: int) -> int:
+    """Длина самого длинного совпадения, оканчивающегося в позиции end, перебором."""
+    best = 0
+    for length in range(1, end + 2):
+        piece = words[end - length + 1:end + 1]
+        if any(document[start:start + length] == piece
+               for document in documents for start in range(len(document) - length + 1)):
+            best = length
+    return best
+
+
+def test_longest_matches_agree_with_brute_force():
+    rng = random.Random(11)
+    for _ in range(100):
+        documents = [[rng.choice("abc") for _ in range(rng.randint(0, 12))] for _ in range(rng.randint(1, 3))]
+        automaton = SuffixAutomatonClass()
+        for document in documents:
+            automaton.add_document(" ".join(document))
+        words = [rng.choice("abcd") for _ in range(rng.randint(0, 10))]
+        lengths = [length for length, _ in automaton.find_longest_matches(words)]
+        assert lengths == [longest_match(documents, words, end) for end in range(len(words))]
+
+
+def test_maximal_matches_report_source():
+    automaton = SuffixAutomatonClass()
+    assert automaton.add_document("kit plyt sever bystro") == 0
+    assert automaton.add_document("reka vyiti bereg zatopit lug") == 1
+    assert automaton.find_maximal_matches("novyi kit plyt sever reka vyiti bereg") == [
+        (1, 3, 0, 0), (4, 3, 1, 0)]
+    assert automaton.find_maximal_matches("novyi kit plyt sever reka vyiti bereg", 4) == []
+    assert automaton.find_maximal_matches("") == []
+
+
+def test_sam_counts_uncovered_words(make_antiplagiarism, texts, new_sentence):
+    antiplagiarism = make_antiplagiarism()
+    antiplagiarism.set_pattern(texts[3])
+    assert antiplagiarism.search_plagiarism_SAM()[0] == 0.0
+    assert len(antiplagiarism.search_plagiarism_SAM()[1]) == 1
+    antiplagiarism.set_pattern(new_sentence)
+    assert antiplagiarism.search_plagiarism_SAM() == (100.0, [])
+    new_words = len(antiplagiarism.canonical_pattern_object.text.split())
+    antiplagiarism.set_pattern(texts[1] + " " + new_sentence)
+    words = len(antiplagiarism.canonical_pattern_object.text.split())
+    uniqueness, counter = antiplagiarism.search_plagiarism_SAM()
+    assert uniqueness == pytest.approx(new_words / words * 100)
+    assert [(start, name) for start, _, name, _ in counter] == [(0, "text2")]
+
+
+def test_automaton_is_extended_with_added_texts(make_antiplagiarism, texts):
+    antiplagiarism = make_antiplagiarism(texts[:2])
+    antiplagiarism.set_pattern(texts[4])
+    assert antiplagiarism.search_plagiarism_SAM()[0] == 100.0
+    antiplagiarism.update_database_text(texts[4])
+    assert antiplagiarism.search_plagiarism_SAM()[0] == 0.0
@@ -0,0 +1,95 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import threading
+import pytest
+import TextCanonization
+from TextCanonization import (CanonicalTextClass, get_morph_analyzer, get_lemma_cache_info, get_text_fingerprints,
+                              iter_text_fingerprints, iter_winnowed_fingerprints, set_lemma_cache_size,
+                              winnow_fingerprints)
+
+
+@pytest.fixture
+def lemma_cache_size():
+    """Возвращает функцию, меняющую размер кэша разбора слов до конца теста."""
+    yield set_lemma_cache_size
+    set_lemma_cache_size(TextCanonization.LEMMA_CACHE_SIZE)
+
+
+def test_canonical_text(texts):
+    assert CanonicalTextClass(texts[0], 3).make_canonical() == (
+        "vesna reka vyiti bereg zatopit lug vozle melnitsa rybak perenesti lodka kholm a melnik vecher "
+        "ukladyvat meshok muka cherdak voda stoiat nedelia uiti trava il oblomok vetka")
+    canonical_text = CanonicalTextClass("Кит плывет быстро на север", 3)
+    assert canonical_text.make_canonical() == "kit plyt sever"
+    assert canonical_text.create_shingles() == ["kit plyt sever"]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Мама мыла раму, а кошки сидели на окнах! Студенты писали 3 курсовые работы — «быстро» и „качественно“…",
+     "mama mylo rama a koshka sidet okno student pisat rabota bystro ,,kachestvenno..."),
+    ("— Привет, – сказал он. ‘Да’ “нет” 'тест' \"кавычки\" <тег> Hello world 2023 год.",
+     " privet skazat Da net test kavychka teg Hello world god"),
+    ("Большие зеленые деревья росли в саду; красиво бегущие дети смеялись.\nНовая строка\tтаб  двойной пробел",
+     "derevo rasti sad rebionok smeiatsia stroka tab probel"),
+    ("Точь-в-точь всё-таки КАЖДЫЙ сам другой Иной ИСКЛЮЧИТЕЛЬНО Ёлки ёжик ²³ ①", "tochvtochit vsiotaki iolka iozhik"),
+    ("   ведущие пробелы и хвостовые   ", "probel"),
+    ("!!! ... ,,, ; :", ""),
+])
+def test_canonical_text_edge_cases(text, expected):
+    # Канонические тексты хранятся в базе, поэтому вывод не должен меняться вместе с реализацией.
+    assert CanonicalTextClass(text).make_canonical() == expected
+
+
+def test_morph_analyzer_is_shared():
+    analyzers = []
+    threads = [threading.Thread(target=lambda: analyzers.append(get_morph_analyzer())) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(analyzer is get_morph_analyzer() for analyzer in analyzers)
+
+
+def test_lemma_cache_is_bounded(texts, lemma_cache_size):
+    lemma_cache_size(8)
+    CanonicalTextClass(texts[1], 3).make_canonical()
+    first = get_lemma_cache_info()
+    assert first.maxsize == 8
+    assert first.currsize == 8
+    CanonicalTextClass("журнал журнал журнал", 3).make_canonical()
+    second = get_lemma_cache_info()
+    assert second.hits > first.hits
+    assert second.currsize == 8
+
+
+def test_cached_canonical_text_is_unchanged(texts, lemma_cache_size):
+    lemma_cache_size(0)
+    uncached = [CanonicalTextClass(text, 3).make_canonical() for text in texts]
+    lemma_cache_size(16)
+    assert [CanonicalTextClass(text, 3).make_canonical() for text in texts] == uncached
+
+
+def test_winnowing_keeps_window_minimums():
+    fingerprints = [77, 72, 42, 17, 98, 50, 17, 98, 8, 88, 67, 39, 77, 72, 42, 17, 98]
+    assert winnow_fingerprints(fingerprints, 4) == [
+        (3, 17), (6, 17), (8, 8), (11, 39), (15, 17)]
+    assert winnow_fingerprints(fingerprints, 1) == list(enumerate(fingerprints))
+    assert winnow_fingerprints([5, 3], 4) == [(1, 3)]
+    assert winnow_fingerprints([], 4) == []
+
+
+def test_winnowing_selects_from_every_window():
+    fingerprints = list(range(40, 0, -3)) + list(range(7, 60, 5))
+    selected = {position for position, _ in winnow_fingerprints(fingerprints, 5)}
+    for start in range(len(fingerprints) - 4):
+        assert selected.intersection(range(start, start + 5))
+
+
+def test_chunked_fingerprints_match_whole_text():
+    text = "a b c d e f g h a b c"
+    fingerprints = get_text_fingerprints(text, 3)
+    for chunks in (["a b", "c d e f", "", "g", "h a b c"], [text], ["a", "b"]):
+        assert list(iter_text_fingerprints(chunks, 3)) == get_text_fingerprints(" ".join(filter(None, chunks)), 3)
+    for window_size in (1, 2, 4, 20):
+        assert list(iter_winnowed_fingerprints(iter(fingerprints), window_size)) == winnow_fingerprints(
+            fingerprints, window_size)
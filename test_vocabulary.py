@@ -0,0 +1,49 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+from Vocabulary import UNKNOWN_TOKEN, VocabularyClass, pack_shingles
+
+
+def test_words_are_interned():
+    vocabulary = VocabularyClass()
+    tokens = vocabulary.encode("kit plyt sever kit")
+    assert tokens.typecode == "I" and tokens.tolist() == [0, 1, 2, 0]
+    assert vocabulary.encode_chunks(["sever", "", "reka kit"]).tolist() == [2, 3, 0]
+    assert len(vocabulary) == 4
+    assert vocabulary.get("reka") == 3 and vocabulary.get("more") is None
+    assert vocabulary.decode(tokens) == "kit plyt sever kit"
+
+
+def test_lookup_does_not_grow_vocabulary():
+    vocabulary = VocabularyClass()
+    vocabulary.encode("kit plyt sever")
+    assert vocabulary.lookup("plyt more kit").tolist() == [1, UNKNOWN_TOKEN, 0]
+    assert len(vocabulary) == 3
+
+
+def test_keys_match_shingles():
+    vocabulary = VocabularyClass()
+    tokens = vocabulary.encode("а б в г а б в д")
+    keys = pack_shingles(tokens, 3)
+    assert len(keys) == len(tokens) - 2
+    assert keys[0] == keys[4]
+    assert len(set(keys)) == 5
+    assert [vocabulary.decode_shingle(key, 3) for key in keys[:2]] == ["а б в", "б в г"]
+
+
+def test_wide_tokens_are_hashed():
+    limit = 1 << (63 // 3)
+    tokens = [1, limit + 5, 2, 1, limit + 5, 2, 3]
+    keys = pack_shingles(tokens, 3)
+    assert keys[0] == keys[3]
+    assert keys[0] != keys[1]
+    assert VocabularyClass().decode_shingle(keys[0], 3) is None
+    assert pack_shingles([1, 2], 3).tolist() == []
+
+
+def test_unknown_words_do_not_match(make_antiplagiarism, texts, new_sentence):
+    antiplagiarism = make_antiplagiarism(texts[:2])
+    antiplagiarism.set_pattern(texts[1] + " " + new_sentence)
+    uniqueness = antiplagiarism.search_plagiarism_words()[0]
+    assert 0.0 < uniqueness < 100.0
+    assert uniqueness == antiplagiarism.search_plagiarism_KMP()[0]
+    assert len(antiplagiarism.vocabulary) == len(set(" ".join(antiplagiarism.canonical_text).split()))
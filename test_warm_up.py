@@ -0,0 +1,118 @@
+#!/usr/bin/python
+# -*- coding: utf8 -*-
+import os
+import subprocess
+import sys
+import threading
+import AntiPlagiarism
+
+
+def test_indexes_are_loaded_on_first_access(make_antiplagiarism, texts, tmp_path):
+    make_antiplagiarism(texts[:3])
+    assert not os.path.exists(tmp_path / "shingleindex.jsonl")
+    antiplagiarism = make_antiplagiarism([])
+    assert antiplagiarism._shingle_index is None and antiplagiarism._minhash_index is None
+    assert antiplagiarism.shingle_index.documents == {"text1", "text2", "text3"}
+    assert set(antiplagiarism.minhash_index.signatures) == {"text1", "text2", "text3"}
+    assert antiplagiarism.shingle_index is antiplagiarism._shingle_index
+
+
+def test_warm_up_in_background(make_antiplagiarism, texts):
+    make_antiplagiarism(texts)
+    antiplagiarism = make_antiplagiarism([])
+    assert not antiplagiarism.ready.is_set()
+    thread = antiplagiarism.start_warm_up()
+    assert thread.daemon
+    assert antiplagiarism.wait_until_ready(30)
+    assert antiplagiarism.warm_up_error is None
+    assert antiplagiarism._shingle_index is not None and antiplagiarism._minhash_index is not None
+    antiplagiarism.set_pattern(texts[1])
+    assert antiplagiarism.search_plagiarism_index()[0] == 0.0
+
+
+def test_index_is_loaded_once_from_several_threads(make_antiplagiarism, texts):
+    make_antiplagiarism(texts)
+    antiplagiarism = make_antiplagiarism([])
+    barrier = threading.Barrier(4)
+    indexes = []
+
+    def load():
+        barrier.wait()
+        indexes.append(antiplagiarism.shingle_index)
+
+    threads = [threading.Thread(target=load) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(index) for index in indexes}) == 1
+
+
+def test_warm_up_error_is_kept(make_antiplagiarism, monkeypatch):
+    antiplagiarism = make_antiplagiarism([])
+
+    def fail():
+        raise OSError("disk")
+
+    monkeypatch.setattr(antiplagiarism.canonical_text, "prefetch", fail)
+    antiplagiarism.warm_up()
+    assert antiplagiarism.ready.is_set()
+    assert isinstance(antiplagiarism.warm_up_error, OSError)
+
+
+def test_heavy_modules_are_imported_lazily():
+    code = "import sys, AntiPlagiarism; print(sorted({'numpy', 'pymorphy2'} & set(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(AntiPlagiarism.__file__)))
+    assert result.stdout == "[]\n"
+
+
+def test_addition_does_not_wait_for_index_load(make_antiplagiarism, texts, monkeypatch):
+    make_antiplagiarism(texts[:3])
+    antiplagiarism = make_antiplagiarism([])
+    loading, release = threading.Event(), threading.Event()
+    synchronize = AntiPlagiarism.ShingleIndexClass.synchronize
+
+    def slow_synchronize(index, documents):
+        if not loading.is_set():
+            loading.set()
+            assert release.wait(30)
+        synchronize(index, documents)
+
+    monkeypatch.setattr(AntiPlagiarism.ShingleIndexClass, "synchronize", slow_synchronize)
+    loader = threading.Thread(target=lambda: antiplagiarism.shingle_index)
+    loader.start()
+    assert loading.wait(30)
+    assert antiplagiarism.update_database_text(texts[3]) == "text4"
+    assert antiplagiarism._shingle_index is None
+    release.set()
+    loader.join(30)
+    assert antiplagiarism.shingle_index.documents == {"text1", "text2", "text3", "text4"}
+
+
+def test_text_added_during_token_build_is_cached(make_antiplagiarism, texts, monkeypatch):
+    antiplagiarism = make_antiplagiarism(texts[:3])
+    building, release = threading.Event(), threading.Event()
+    encode_chunks = antiplagiarism.vocabulary.encode_chunks
+
+    def slow_encode_chunks(chunks):
+        if not building.is_set():
+            building.set()
+            assert release.wait(30)
+        return encode_chunks(chunks)
+
+    monkeypatch.setattr(antiplagiarism.vocabulary, "encode_chunks", slow_encode_chunks)
+    builder = threading.Thread(target=antiplagiarism.get_suffix_automaton)
+    builder.start()
+    assert building.wait(30)
+    adder = threading.Thread(target=antiplagiarism.update_database_text, args=(texts[3],))
+    adder.start()
+    adder.join(0.2)
+    release.set()
+    builder.join(30)
+    adder.join(30)
+    assert len(antiplagiarism.canonical_tokens) == len(antiplagiarism.text_names) == 4
+    assert antiplagiarism.suffix_automaton.documents_count == 4
+    antiplagiarism.set_pattern(texts[3])
+    for method in ("words", "SAM"):
+        assert getattr(antiplagiarism, f"search_plagiarism_{method}")()[0] == 0.0